@@ -1,12 +1,20 @@
+import asyncio
+import json
 import logging
 from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException
-from pydantic import BaseModel
-
-from app.services.embeddings import get_or_create_collection
-from app.services.rag import (generate_rag_response, load_prompts,
-                              update_vector_store)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.services.embeddings import (find_similar_chunks_batch_async,
+                                     get_collection_count,
+                                     get_or_create_collection)
+from app.services.jobs import get_reindex_job, start_reindex_job
+from app.services.prompt_metrics import get_prompt_metrics
+from app.services.rag import (generate_rag_response_async, load_prompts,
+                              stream_rag_response)
 
 # 라우터 정의
 router = APIRouter(
@@ -27,10 +35,19 @@ class QueryResponse(BaseModel):
     source_chunks: Optional[List[Dict]] = None
 
 
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+    top_k: int = Field(3, ge=1, le=settings.QUERY_BATCH_MAX_TOP_K)
+
+
+class BatchQueryResponse(BaseModel):
+    results: List[List[Dict]]
+
+
 # ChromaDB 컬렉션 확인 함수
 def check_chromadb():
     collection = get_or_create_collection()
-    if collection.count() == 0:
+    if get_collection_count() == 0:
         raise HTTPException(
             status_code=500,
             detail="ChromaDB 컬렉션이 비어있습니다. 데이터를 추가해주세요.",
@@ -48,7 +65,7 @@ async def query_rag(
     사용자 쿼리에 대한 RAG 응답을 생성합니다.
     """
     try:
-        answer = generate_rag_response(
+        answer = await generate_rag_response_async(
             query=request.text,
             system_key=request.system_key,
         )
@@ -62,12 +79,42 @@ async def query_rag(
         )
 
 
+# 다중 질의 검색 엔드포인트
+@router.post("/query/batch", response_model=BatchQueryResponse)
+async def query_batch(
+    request: BatchQueryRequest,
+    collection: any = Depends(check_chromadb),
+):
+    """
+    여러 질의에 대해 유사한 문서 청크를 한 번에 검색합니다. (응답 생성 없이 검색만 수행)
+    질의 임베딩은 한 번의 요청으로 만들고, 결과는 질의 순서대로 반환합니다.
+    """
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="질의 목록이 비어있습니다")
+    if len(request.queries) > settings.QUERY_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.QUERY_BATCH_MAX_SIZE}개의 질의만 검색할 수 있습니다",
+        )
+
+    results = await find_similar_chunks_batch_async(request.queries, request.top_k)
+    return BatchQueryResponse(results=results)
+
+
 @router.get("/health")
 async def health_check():
     """상태 확인 엔드포인트"""
     return {"status": "ok"}
 
 
+@router.get("/metrics")
+async def metrics():
+    """
+    시스템 프롬프트별 LLM 호출 토큰 사용량과 프롬프트 캐시 적중 통계를 반환하는 엔드포인트
+    """
+    return {"prompts": get_prompt_metrics().snapshot()}
+
+
 @router.post("/chat")
 async def chat(message: dict = Body(...)):
     """
@@ -79,15 +126,11 @@ async def chat(message: dict = Body(...)):
         if not query:
             raise HTTPException(status_code=400, detail="메시지 내용이 없습니다")
 
-        # ChromaDB 확인
-        collection = get_or_create_collection()
-        if collection.count() == 0:
-            raise HTTPException(
-                status_code=500, detail="ChromaDB 컬렉션이 비어있습니다"
-            )
+        # ChromaDB 확인 (동기 API이므로 워커 스레드에서 실행)
+        await asyncio.to_thread(check_chromadb)
 
         # RAG 응답 생성
-        response = generate_rag_response(query)
+        response = await generate_rag_response_async(query)
 
         return {"response": response}
     except Exception as e:
@@ -95,24 +138,78 @@ async def chat(message: dict = Body(...)):
         raise HTTPException(status_code=500, detail=f"응답 생성 중 오류 발생: {str(e)}")
 
 
-@router.post("/update-vector-store")
-@router.get("/update-vector-store")
-async def update_vector_store_endpoint():
+def format_sse(event: str, data) -> str:
+    """Server-Sent Events 형식의 메시지 문자열을 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(message: dict = Body(...)):
+    """
+    채팅 메시지에 대한 RAG 응답을 Server-Sent Events로 스트리밍하는 엔드포인트
+
+    이벤트 순서: sources(검색된 문서 제목) → delta(응답 조각, 여러 번) → done(사용량/소요 시간)
+    """
+    query = message.get("message", "")
+    if not query:
+        raise HTTPException(status_code=400, detail="메시지 내용이 없습니다")
+
+    # ChromaDB 확인 (동기 API이므로 워커 스레드에서 실행)
+    await asyncio.to_thread(check_chromadb)
+
+    async def event_stream():
+        async for event in stream_rag_response(query):
+            yield format_sse(event["event"], event["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx 프록시가 응답을 버퍼링하지 않도록 설정
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.post("/update-vector-store", status_code=202)
+async def update_vector_store_endpoint(full_rebuild: bool = False):
     """
-    벡터 저장소를 업데이트하는 엔드포인트
-    GET 또는 POST 요청을 통해 호출 가능합니다.
+    벡터 저장소 업데이트(재색인) 작업을 백그라운드에서 시작하는 엔드포인트
+    즉시 작업 ID를 반환하며, 진행 상황은 GET /api/update-vector-store/{job_id}로 확인합니다.
+    새 버전의 컬렉션을 만든 뒤 교체하므로 업데이트 중에도 검색은 계속 동작합니다.
+    링크 클릭이나 크롤러로 실행되지 않도록 POST 요청만 허용합니다.
     """
     try:
-        success = update_vector_store()
-        if success:
-            return {
-                "status": "success",
-                "message": "벡터 저장소가 성공적으로 업데이트되었습니다.",
-            }
-        else:
-            raise HTTPException(status_code=500, detail="벡터 저장소 업데이트 실패")
-    except Exception as e:
-        logging.error(f"벡터 저장소 업데이트 중 오류 발생: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail=f"벡터 저장소 업데이트 중 오류 발생: {str(e)}"
-        )
+        job = start_reindex_job(full_rebuild=full_rebuild)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return job.to_dict()
+
+
+@router.get("/update-vector-store/{job_id}")
+async def get_update_vector_store_status(job_id: str):
+    """
+    재색인 작업의 상태와 진행 상황(파싱한 파일 수, 임베딩한 청크 수, 사용 토큰 수)을 반환합니다.
+    """
+    job = get_reindex_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="재색인 작업을 찾을 수 없습니다")
+    return job.to_dict()
+
+
+@router.delete("/update-vector-store/{job_id}")
+async def cancel_update_vector_store(job_id: str):
+    """
+    실행 중인 재색인 작업을 취소합니다. 진행 중인 배치가 끝나는 대로 중단되며,
+    서빙 중인 컬렉션은 그대로 유지됩니다.
+    """
+    job = get_reindex_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="재색인 작업을 찾을 수 없습니다")
+    if job.is_finished:
+        raise HTTPException(status_code=409, detail="이미 종료된 작업입니다")
+
+    job.cancel()
+    return job.to_dict()
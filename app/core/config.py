@@ -1,6 +1,8 @@
 import os
+from typing import List, Optional
 
 from dotenv import load_dotenv
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 # 환경 변수 로드
@@ -19,18 +21,101 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
 
     # 파일 경로
+    # 레거시 벡터 저장소 경로 (바이너리 형식은 .<세대>.vectors.npy/.<세대>.contents.bin/.meta.json으로 저장)
     VECTOR_STORE_PATH: str = "data/vector_store.json"
+    # 레거시 벡터 저장소의 임베딩 저장 형식 ("float32" 또는 "float16")
+    VECTOR_STORE_DTYPE: str = "float32"
     DOCS_DIR: str = "data/docs"
+    # 마지막 색인의 원본 파일별 크기/수정 시각/해시/청크 ID (바뀌지 않은 파일은 재색인 시 건너뜀)
+    DOCUMENT_MANIFEST_PATH: str = "data/chroma_db/document_manifest.json"
+    # 청크당 최대 토큰 수. 넘는 섹션은 하위 헤딩, 문단 순으로 나눔 (0이면 '##' 섹션 그대로 사용)
+    CHUNK_MAX_TOKENS: int = 600
+    # 문단 단위로 나눌 때 이전 청크의 끝 문단을 겹쳐 넣을 최대 토큰 수
+    CHUNK_OVERLAP_TOKENS: int = 0
+    # 문서 파싱/청킹에 사용할 프로세스 수 (0이면 CPU 코어 수, 1이면 현재 프로세스에서 순차 처리)
+    DOCUMENT_PARSE_WORKERS: int = 0
     PROMPTS_FILE: str = "app/core/prompts.yaml"
+    # 프롬프트 파일 변경 여부를 확인하는 최소 간격(초)
+    PROMPTS_RELOAD_INTERVAL: float = 1.0
 
     # ChromaDB 설정
     CHROMA_DB_DIR: str = "data/chroma_db"
+    # 서빙 컬렉션의 별칭. 실제 컬렉션은 "<별칭>__v<타임스탬프>" 형태로 버전 관리됩니다.
     CHROMA_COLLECTION_NAME: str = "hufs_cs_docs"
+    CHROMA_ALIAS_FILE: str = "data/chroma_db/aliases.json"
+    # 교체 후에도 남겨 둘 이전 버전 컬렉션 수 (진행 중인 요청 보호 및 롤백용)
+    # 다른 프로세스는 별칭 파일의 수정 시각이 바뀌면 새 컬렉션으로 전환합니다.
+    CHROMA_KEEP_PREVIOUS_VERSIONS: int = 1
+    CHROMA_BATCH_SIZE: int = 500
+    # 새 인덱스를 서빙하기 전에 검색 결과가 있는지 확인하는 질의
+    INDEX_VALIDATION_QUERIES: List[str] = ["졸업요건", "수강신청"]
+
+    # 검색 백엔드 설정
+    # "chroma": ChromaDB HNSW 검색, "numpy": 메모리의 정규화 행렬로 정확한 코사인 검색,
+    # "faiss": FAISS 인덱스 검색 (FAISS_INDEX_TYPE으로 flat/hnsw/ivfpq 선택)
+    # (app.services.vector_store.register_vector_store로 등록한 백엔드 이름도 사용 가능)
+    RETRIEVAL_BACKEND: str = "chroma"
+    # /api/query/batch 한 번에 검색할 수 있는 최대 질의 수와 top_k
+    QUERY_BATCH_MAX_SIZE: int = 256
+    QUERY_BATCH_MAX_TOP_K: int = 50
+    # LLM에 넘기는 검색 컨텍스트의 최대 토큰 수 (점수가 높은 청크부터 채우고 넘치면 잘라냄)
+    CONTEXT_MAX_TOKENS: int = 3000
+    # 추출식 컨텍스트 압축: 검색된 청크마다 질의와 가까운 문장만 남김
+    # (켜면 색인할 때 문장 임베딩을 임베딩 캐시에 미리 저장)
+    CONTEXT_COMPRESSION_ENABLED: bool = False
+    CONTEXT_COMPRESSION_MAX_SENTENCES: int = Field(8, ge=1)
+    # 모델이 생성한 간결한 마크다운 표를 서버에서 열 너비에 맞춰 정렬하고 ```markdown 블록으로 감쌈
+    ANSWER_TABLE_FORMATTING_ENABLED: bool = True
+    # 컨텍스트의 청크를 검색 점수 순서 대신 (출처, 청크 ID) 순서로 배치
+    # (같은 청크가 검색되면 점수가 조금 달라도 프롬프트 앞부분이 같아 프롬프트 캐시에 적중하지만,
+    # 프롬프트 안의 관련도 순서가 사라지므로 기본값은 꺼짐)
+    CONTEXT_STABLE_ORDER: bool = False
+    # 요청별 프롬프트 토큰 사용량을 JSONL로 기록 (evaluate/prompt_token_profiler.py로 분석)
+    PROMPT_LOG_ENABLED: bool = False
+    PROMPT_LOG_PATH: str = "data/logs/prompt_requests.jsonl"
+    NUMPY_INDEX_DIR: str = "data/numpy_index"
+
+    # FAISS 설정
+    FAISS_INDEX_DIR: str = "data/faiss_index"
+    FAISS_INDEX_TYPE: str = "hnsw"
+    FAISS_HNSW_M: int = 32
+    FAISS_HNSW_EF_CONSTRUCTION: int = 200
+    FAISS_HNSW_EF_SEARCH: int = 64
+    FAISS_IVF_NLIST: int = 1024
+    FAISS_IVF_NPROBE: int = 16
+    FAISS_PQ_M: int = 16
+    FAISS_PQ_NBITS: int = 8
 
     # 모델 설정
     EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # 임베딩 차원 (None이면 모델 기본값)
+    EMBEDDING_DIMENSIONS: Optional[int] = None
+    # 색인 시 임베딩 요청 설정 (요청당 토큰/입력 수 한도, 동시 요청 수, 재시도)
+    # 토큰 수는 EMBEDDING_MODEL의 인코딩(cl100k_base)으로 계산합니다.
+    EMBEDDING_BATCH_MAX_TOKENS: int = 250000
+    EMBEDDING_BATCH_MAX_INPUTS: int = 2048
+    # 입력 하나의 최대 토큰 수. 넘는 텍스트(나뉘지 않은 큰 표 등)는 잘라서 임베딩합니다.
+    EMBEDDING_MAX_INPUT_TOKENS: int = 8191
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 6
+    EMBEDDING_RETRY_BASE_DELAY: float = 1.0
     LLM_MODEL: str = "gpt-4o"
 
+    # 응답 캐시 설정 (동일 질문에 대한 LLM 재호출 방지)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_SIZE: int = 1024
+    ANSWER_CACHE_TTL: float = 3600.0
+
+    # 의미 기반 응답 캐시 설정 (표현만 다른 같은 질문에 대한 응답 재사용)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_MAX_SIZE: int = 512
+
+    # 임베딩 캐시 설정 (서빙과 평가 스크립트가 공유하는 디스크 캐시)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 4096
+
     class Config:
         env_file = ".env"
 
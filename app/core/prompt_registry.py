@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import yaml
+
+from app.core.config import settings
+from app.core.utils import count_tokens
+
+# 애플리케이션이 사용하는 필수 시스템 프롬프트 키
+REQUIRED_SYSTEM_PROMPT_KEYS = ("default", "rag")
+
+
+class PromptRegistry:
+    """
+    prompts.yaml을 한 번만 파싱해 메모리에 보관하는 프롬프트 레지스트리
+
+    요청마다 파일을 읽지 않고, reload_interval 간격으로 파일의 mtime/크기만 확인합니다.
+    파일이 바뀐 경우에도 내용 해시가 같으면 다시 파싱하지 않으며, 수정된 파일이
+    유효하지 않으면 오류를 출력하고 기존 프롬프트를 계속 사용합니다.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 1.0):
+        self.path = path
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._prompts: Dict = {}
+        self._token_counts: Dict[str, int] = {}
+        self._hash: Optional[str] = None
+        self._stat_signature = None
+        self._last_checked = 0.0
+
+        # 최초 로드는 실패 시 예외를 그대로 전달하여 잘못된 설정으로 서버가 뜨지 않게 합니다
+        self._load(self._read_stat_signature())
+
+    def _read_stat_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, stat_signature):
+        with open(self.path, "rb") as f:
+            raw = f.read()
+
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest != self._hash:
+            prompts = yaml.safe_load(raw.decode("utf-8"))
+            self._validate(prompts)
+
+            self._prompts = prompts
+            self._token_counts = {
+                key: count_tokens(prompt)
+                for key, prompt in prompts["system_prompts"].items()
+            }
+            self._hash = digest
+
+        self._stat_signature = stat_signature
+
+    def _validate(self, prompts: Dict):
+        if not isinstance(prompts, dict) or not isinstance(
+            prompts.get("system_prompts"), dict
+        ):
+            raise ValueError(f"{self.path}에 system_prompts 항목이 없습니다.")
+
+        system_prompts = prompts["system_prompts"]
+        missing = [key for key in REQUIRED_SYSTEM_PROMPT_KEYS if key not in system_prompts]
+        if missing:
+            raise ValueError(f"{self.path}에 필수 시스템 프롬프트가 없습니다: {missing}")
+
+        for key, prompt in system_prompts.items():
+            if not isinstance(prompt, str) or not prompt.strip():
+                raise ValueError(f"시스템 프롬프트 '{key}'가 비어 있습니다.")
+
+    def refresh(self, force: bool = False):
+        """
+        프롬프트 파일이 변경되었으면 다시 로드합니다.
+
+        Args:
+            force (bool, optional): 확인 간격과 관계없이 즉시 확인할지 여부. 기본값은 False.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_checked < self.reload_interval:
+            return
+
+        with self._lock:
+            self._last_checked = now
+            try:
+                stat_signature = self._read_stat_signature()
+                if force or stat_signature != self._stat_signature:
+                    previous_hash = self._hash
+                    self._load(stat_signature)
+                    if self._hash != previous_hash:
+                        print(f"프롬프트 파일이 다시 로드되었습니다: {self.path}")
+            except Exception as e:
+                print(f"프롬프트 다시 로드 중 오류 발생 (기존 프롬프트 유지): {str(e)}")
+
+    @property
+    def prompts(self) -> Dict:
+        """prompts.yaml 전체 내용"""
+        self.refresh()
+        return self._prompts
+
+    @property
+    def version(self) -> str:
+        """현재 로드된 프롬프트 파일의 SHA-256 해시"""
+        self.refresh()
+        return self._hash
+
+    def get_system_prompt(self, key: str) -> str:
+        """
+        시스템 프롬프트를 반환합니다.
+
+        Args:
+            key (str): 시스템 프롬프트 키
+
+        Returns:
+            str: 시스템 프롬프트
+        """
+        return self.prompts["system_prompts"][key]
+
+    def token_count(self, key: str) -> int:
+        """
+        시스템 프롬프트의 미리 계산된 토큰 수를 반환합니다.
+
+        Args:
+            key (str): 시스템 프롬프트 키
+
+        Returns:
+            int: 토큰 수
+        """
+        self.refresh()
+        return self._token_counts[key]
+
+    @property
+    def token_counts(self) -> Dict[str, int]:
+        """시스템 프롬프트 키별 토큰 수"""
+        self.refresh()
+        return dict(self._token_counts)
+
+
+# 전역 프롬프트 레지스트리 (싱글톤)
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """
+    프롬프트 레지스트리의 싱글톤 인스턴스를 반환합니다.
+
+    Returns:
+        PromptRegistry: 프롬프트 레지스트리
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PromptRegistry(
+                    settings.PROMPTS_FILE, settings.PROMPTS_RELOAD_INTERVAL
+                )
+    return _registry
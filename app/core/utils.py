@@ -1,13 +1,18 @@
 import os
+from typing import Optional
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 # .env 파일에서 환경 변수 로드 (한 번만 실행)
 load_dotenv()
 
 # OpenAI 클라이언트 초기화 (전역 싱글톤)
 client = None
+async_client = None
+
+# 모델별 tiktoken 인코더 (None 키는 gpt-4o 기본 인코딩, 설치되지 않은 경우 값이 False)
+_token_encoders = {}
 
 
 def get_openai_client():
@@ -21,3 +26,107 @@ def get_openai_client():
     if client is None:
         client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     return client
+
+
+def get_async_openai_client():
+    """
+    비동기 OpenAI 클라이언트의 싱글톤 인스턴스를 반환합니다.
+
+    이벤트 루프를 막지 않고 임베딩/채팅 요청을 보내야 하는 FastAPI 핸들러에서 사용합니다.
+
+    Returns:
+        AsyncOpenAI: 비동기 OpenAI 클라이언트 인스턴스
+    """
+    global async_client
+    if async_client is None:
+        async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return async_client
+
+
+def _get_token_encoder(model: Optional[str] = None):
+    """
+    모델의 tiktoken 인코더를 반환합니다. tiktoken이 없으면 False를 반환합니다.
+    모델을 지정하지 않으면 o200k_base(gpt-4o) 인코딩을 사용합니다.
+    """
+    encoder = _token_encoders.get(model)
+    if encoder is None:
+        try:
+            import tiktoken
+
+            if model is None:
+                encoder = tiktoken.get_encoding("o200k_base")
+            else:
+                try:
+                    encoder = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    # 알 수 없는 모델은 OpenAI 임베딩 모델의 인코딩을 사용
+                    encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            if False not in _token_encoders.values():
+                print("tiktoken을 사용할 수 없어 근사 토큰 수를 사용합니다: pip install tiktoken")
+            encoder = False
+        _token_encoders[model] = encoder
+    return encoder
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    텍스트의 토큰 수를 계산합니다.
+
+    tiktoken이 설치되어 있으면 모델의 인코딩(기본값은 o200k_base(gpt-4o))으로 정확히 계산하고,
+    없으면 근사값을 반환합니다. 모델을 지정하지 않으면 한글/영문 혼합 문서 기준(2자당 1토큰)으로,
+    지정하면 API 한도 검사용이므로 실제보다 작게 세지 않도록 UTF-8 2바이트당 1토큰으로 계산합니다.
+
+    Args:
+        text (str): 토큰 수를 계산할 텍스트
+        model (str, optional): 토큰화 기준 모델 (예: settings.EMBEDDING_MODEL)
+
+    Returns:
+        int: 토큰 수
+    """
+    encoder = _get_token_encoder(model)
+
+    if not text:
+        return 0
+    if encoder is False:
+        if model is None:
+            return (len(text) + 1) // 2
+        return (len(text.encode("utf-8")) + 1) // 2
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def token_encoding_name(model: Optional[str] = None) -> str:
+    """
+    count_tokens가 모델에 사용하는 토큰화 방식의 이름을 반환합니다.
+
+    Args:
+        model (str, optional): 토큰화 기준 모델
+
+    Returns:
+        str: tiktoken 인코딩 이름 (예: "o200k_base"), tiktoken이 없으면 "estimate"
+    """
+    encoder = _get_token_encoder(model)
+    return "estimate" if encoder is False else encoder.name
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    텍스트를 모델 기준 max_tokens 토큰 이하로 앞에서부터 자릅니다.
+
+    Args:
+        text (str): 자를 텍스트
+        max_tokens (int): 최대 토큰 수
+        model (str, optional): 토큰화 기준 모델
+
+    Returns:
+        str: 잘린 텍스트 (한도 이하이면 그대로)
+    """
+    encoder = _get_token_encoder(model)
+    if encoder is False:
+        # count_tokens의 근사값(UTF-8 2바이트당 1토큰)과 같은 기준으로 자름
+        return text.encode("utf-8")[: max_tokens * 2].decode("utf-8", errors="ignore")
+
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoder.decode(tokens[:max_tokens])
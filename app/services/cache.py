@@ -0,0 +1,343 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, Hashable,
+                    List, Optional, Sequence)
+
+import numpy as np
+
+
+class TTLCache:
+    """
+    LRU + TTL 방식으로 항목을 제거하는 스레드 안전한 인메모리 캐시
+
+    max_size를 넘으면 가장 오래 사용되지 않은 항목을 제거하고,
+    ttl(초)이 지난 항목은 조회 시점에 만료 처리합니다.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# 리더가 예외 없이 중단(취소 등)되었을 때 대기자에게 전달하는 값. 대기자는 다시 리더가 됩니다.
+_RETRY = object()
+
+
+class AsyncSingleFlight:
+    """
+    같은 키에 대한 동시 비동기 작업을 하나로 합칩니다.
+
+    첫 번째 호출자만 실제 작업을 실행하고, 작업이 끝나기 전에 같은 키로 들어온
+    호출자들은 그 결과(또는 예외)를 함께 받습니다. 대기자에게는 일반 예외(Exception)만
+    전달하며, 리더가 취소되면 대기 중인 호출자 중 하나가 새 리더가 되어 작업을 다시 실행합니다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def wait(self, key: Hashable) -> Any:
+        """
+        같은 키로 진행 중인 작업이 있으면 그 결과를 기다려 반환하고, 없으면 None을 반환합니다.
+        리더가 취소된 경우에도 None을 반환합니다.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            return None
+        result = await asyncio.shield(future)
+        return None if result is _RETRY else result
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            # 다른 호출자가 취소되어도 공유 작업이 취소되지 않도록 shield 사용
+            result = await asyncio.shield(future)
+            if result is not _RETRY:
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            # 대기자가 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        except BaseException:
+            # 취소/인터럽트는 리더에게만 전달하고 대기자는 다시 시도하게 함
+            future.set_result(_RETRY)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+
+class SingleFlight:
+    """AsyncSingleFlight의 스레드 버전입니다. 동기 코드 경로에서 사용합니다."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, dict] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                call = self._inflight.get(key)
+                leader = call is None
+                if leader:
+                    call = {"event": threading.Event(), "result": _RETRY, "error": None}
+                    self._inflight[key] = call
+
+            if leader:
+                break
+
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            if call["result"] is not _RETRY:
+                return call["result"]
+
+        try:
+            call["result"] = func()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call["event"].set()
+
+
+class _BroadcastRun:
+    """AsyncBroadcast에서 키 하나에 대해 실행 중인 작업의 이벤트 기록"""
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    async def replay(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            async with self.condition:
+                await self.condition.wait_for(
+                    lambda: index < len(self.events) or self.done
+                )
+                pending = self.events[index:]
+                finished = self.done
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index == len(self.events):
+                break
+        if self.error is not None:
+            raise self.error
+
+
+class AsyncBroadcast:
+    """
+    같은 키에 대한 동시 스트리밍 작업을 하나로 합칩니다.
+
+    첫 번째 호출자가 넘긴 이벤트 스트림만 백그라운드 태스크에서 실행하고, 같은 키로 들어온
+    모든 호출자(첫 번째 호출자 포함)는 그 이벤트를 처음부터 재생하여 받습니다.
+    태스크는 구독자와 분리되어 있으므로 한 구독자가 연결을 끊어도 다른 구독자의 스트림은
+    끊기지 않고 작업은 끝까지 실행됩니다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, _BroadcastRun] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def subscribe(
+        self, key: Hashable, func: Callable[[], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """
+        같은 키로 진행 중인 스트림이 있으면 그 이벤트를, 없으면 func()로 새 스트림을 시작해
+        그 이벤트를 반환합니다.
+        """
+        run = self._inflight.get(key)
+        if run is None:
+            run = _BroadcastRun()
+            self._inflight[key] = run
+            run.task = asyncio.get_running_loop().create_task(
+                self._produce(key, run, func())
+            )
+
+        async for event in run.replay():
+            yield event
+
+    async def _produce(self, key: Hashable, run: _BroadcastRun, events: AsyncIterator[Any]):
+        try:
+            async for event in events:
+                async with run.condition:
+                    run.events.append(event)
+                    run.condition.notify_all()
+        except Exception as e:
+            run.error = e
+        finally:
+            self._inflight.pop(key, None)
+            async with run.condition:
+                run.done = True
+                run.condition.notify_all()
+
+
+class SemanticCache:
+    """
+    쿼리 임베딩 기반의 의미 캐시
+
+    (쿼리 임베딩, 검색된 청크 ID 집합, 값)을 저장하고, 새 쿼리의 임베딩과 코사인 유사도가
+    threshold 이상이면서 같은 청크 집합으로 검색된 항목이 있으면 그 값을 반환합니다.
+    임베딩은 고정 크기 float32 행렬에 정규화하여 보관하므로 조회는 행렬-벡터 곱 한 번입니다.
+    가득 차면 가장 오래 사용되지 않은 항목을 덮어씁니다.
+    """
+
+    def __init__(self, max_size: int = 512, threshold: float = 0.92):
+        self.max_size = max_size
+        self.threshold = threshold
+        self._matrix: Optional[np.ndarray] = None
+        self._last_used = np.zeros(max_size, dtype=np.float64)
+        self._entries: List[Optional[dict]] = [None] * max_size
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(
+        self, embedding: Sequence[float], chunk_ids: Sequence[str], scope: Hashable
+    ) -> Any:
+        """
+        조건을 만족하는 캐시 값을 반환합니다. 없으면 None을 반환합니다.
+
+        Args:
+            embedding (Sequence[float]): 쿼리 임베딩
+            chunk_ids (Sequence[str]): 쿼리로 검색된 청크 ID 목록
+            scope (Hashable): 프롬프트/모델/인덱스 버전 등 값이 유효한 범위
+
+        Returns:
+            Any: 캐시된 값 또는 None
+        """
+        query = self._normalize(embedding)
+        chunk_set = frozenset(chunk_ids)
+
+        with self._lock:
+            if self._size == 0 or self._matrix is None:
+                self.misses += 1
+                return None
+            if query.shape[0] != self._matrix.shape[1]:
+                self.misses += 1
+                return None
+
+            similarities = self._matrix[: self._size] @ query
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            # 유사도가 높은 후보부터 검사
+            for index in candidates[np.argsort(-similarities[candidates])]:
+                entry = self._entries[index]
+                if entry["scope"] == scope and entry["chunk_ids"] == chunk_set:
+                    self._last_used[index] = time.monotonic()
+                    self.hits += 1
+                    return entry["value"]
+
+            self.misses += 1
+            return None
+
+    def add(
+        self,
+        embedding: Sequence[float],
+        chunk_ids: Sequence[str],
+        scope: Hashable,
+        value: Any,
+    ):
+        """
+        캐시에 항목을 추가합니다.
+
+        Args:
+            embedding (Sequence[float]): 쿼리 임베딩
+            chunk_ids (Sequence[str]): 쿼리로 검색된 청크 ID 목록
+            scope (Hashable): 값이 유효한 범위
+            value (Any): 저장할 값
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                # 임베딩 차원이 바뀌면 캐시를 새로 시작
+                self._matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.max_size
+                self._last_used[:] = 0
+                self._size = 0
+
+            if self._size < self.max_size:
+                index = self._size
+                self._size += 1
+            else:
+                index = int(np.argmin(self._last_used))
+
+            self._matrix[index] = vector
+            self._last_used[index] = time.monotonic()
+            self._entries[index] = {
+                "chunk_ids": frozenset(chunk_ids),
+                "scope": scope,
+                "value": value,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries = [None] * self.max_size
+            self._last_used[:] = 0
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
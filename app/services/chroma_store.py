@@ -0,0 +1,120 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class ChromaVectorStore:
+    """
+    ChromaDB 컬렉션을 VectorStore 인터페이스로 감싼 어댑터
+
+    검색은 ChromaDB의 HNSW 인덱스(코사인 거리)를 사용하며, 거리는 유사도(1 - 거리)로
+    변환하여 반환합니다.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.collection = collection.name
+
+    def _write(self, method, ids, embeddings, documents, metadatas):
+        # ChromaDB는 한 번에 넣을 수 있는 레코드 수에 제한이 있으므로 나누어 저장
+        batch_size = settings.CHROMA_BATCH_SIZE
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            method(
+                ids=list(ids[start:end]),
+                embeddings=embeddings[start:end],
+                documents=list(documents[start:end]),
+                metadatas=list(metadatas[start:end]),
+            )
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ):
+        existing = self._collection.get(ids=list(ids), include=[])["ids"]
+        if existing:
+            raise ValueError(f"이미 존재하는 ID입니다: {existing[0]}")
+        self._write(self._collection.add, ids, embeddings, documents, metadatas)
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ):
+        self._write(self._collection.upsert, ids, embeddings, documents, metadatas)
+
+    def delete(self, ids: Sequence[str]):
+        if ids:
+            self._collection.delete(ids=list(ids))
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def query(self, query_embedding: Sequence[float], top_k: int = 3) -> List[Dict]:
+        """
+        쿼리 임베딩과 가장 유사한 청크 top_k개를 반환합니다.
+
+        Args:
+            query_embedding (Sequence[float]): 쿼리 임베딩
+            top_k (int, optional): 반환할 청크 수. 기본값은 3.
+
+        Returns:
+            List[Dict]: 유사도 내림차순으로 정렬된 청크 목록 (score: 코사인 유사도)
+        """
+        return self.query_batch([query_embedding], top_k)[0]
+
+    def query_batch(self, query_embeddings, top_k: int = 3) -> List[List[Dict]]:
+        """
+        여러 쿼리 임베딩을 한 번의 ChromaDB 호출로 검색합니다.
+
+        Args:
+            query_embeddings: 쿼리 임베딩 목록
+            top_k (int, optional): 쿼리마다 반환할 청크 수. 기본값은 3.
+
+        Returns:
+            List[List[Dict]]: 쿼리별 청크 목록
+        """
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        if len(query_embeddings) == 0:
+            return []
+
+        results = self._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            include=["documents", "metadatas", "distances"],
+        )
+
+        batches = []
+        for ids, documents, metadatas, distances in zip(
+            results["ids"],
+            results["documents"],
+            results["metadatas"],
+            results["distances"],
+        ):
+            chunks = []
+            for chunk_id, document, metadata, distance in zip(
+                ids, documents, metadatas, distances
+            ):
+                metadata = metadata or {}
+                chunks.append(
+                    {
+                        "id": chunk_id,
+                        "title": metadata.get("title", "제목 없음"),
+                        "content": document,
+                        "source": metadata.get("source", "출처 미상"),
+                        "heading_path": metadata.get("heading_path"),
+                        "token_count": metadata.get("token_count"),
+                        # 코사인 거리를 유사도로 변환
+                        "score": 1.0 - distance,
+                    }
+                )
+            batches.append(chunks)
+        return batches
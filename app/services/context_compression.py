@@ -0,0 +1,163 @@
+"""
+추출식 컨텍스트 압축
+
+검색된 청크를 문장(표는 행) 단위로 나누고, 질의 임베딩과의 코사인 유사도를 한 번의 행렬 곱으로
+계산하여 청크마다 관련도가 높은 문장과 그 문장이 속한 헤딩(표 머리글)만 남깁니다.
+추가 LLM 호출 없이 프롬프트 토큰을 줄이기 위한 단계이며 CONTEXT_COMPRESSION_ENABLED로 켭니다.
+
+문장 임베딩은 색인할 때 미리 계산하여 임베딩 캐시에 넣어 두므로(index_sentence_embeddings),
+질의 시에는 캐시에서 읽기만 합니다. 캐시에 없는 문장만 한 번의 요청으로 임베딩합니다.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.utils import count_tokens
+from app.services.numpy_store import normalize_rows
+
+# 문장 경계 (마침표/물음표/느낌표 뒤 공백 또는 줄바꿈)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。])\s+|\n")
+
+# 문자나 숫자가 없는 조각(구분선, 표 구분 행 등)은 점수를 매기지 않음
+_HAS_WORD = re.compile(r"\w")
+
+
+def split_sentences(content: str) -> List[Tuple[List[str], str]]:
+    """
+    청크 내용을 점수를 매길 단위(문장, 표의 행)로 나눕니다.
+
+    Args:
+        content (str): 청크 내용
+
+    Returns:
+        List[Tuple[List[str], str]]: (단위 앞에 함께 보여야 하는 줄 목록, 문장) 목록.
+            앞의 줄 목록은 가장 가까운 헤딩과, 표의 행이면 표 머리글 두 줄입니다.
+    """
+    units = []
+    heading: List[str] = []
+    table_header: List[str] = []
+
+    for line in content.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            heading, table_header = [line], []
+            continue
+
+        if stripped.startswith("|"):
+            # 표의 첫 두 줄(머리글, 구분 행)은 행과 함께 보여 줄 머리글로 사용
+            if len(table_header) < 2:
+                table_header.append(line)
+                continue
+            units.append((heading + table_header, line))
+            continue
+
+        table_header = []
+        for sentence in SENTENCE_BOUNDARY.split(line):
+            if _HAS_WORD.search(sentence):
+                units.append((heading, sentence.strip()))
+
+    return units
+
+
+def sentence_texts(chunks: List[Dict]) -> List[str]:
+    """
+    청크 목록의 모든 문장을 중복 없이 반환합니다. (색인 시 문장 임베딩 대상)
+
+    Args:
+        chunks (List[Dict]): 'content'를 포함한 청크 목록
+
+    Returns:
+        List[str]: 문장 목록
+    """
+    texts = {}
+    for chunk in chunks:
+        for _, sentence in split_sentences(chunk["content"]):
+            texts[sentence] = None
+    return list(texts)
+
+
+def index_sentence_embeddings(chunks: List[Dict], progress=None):
+    """
+    청크의 문장 임베딩을 미리 계산하여 임베딩 캐시에 저장합니다. (색인 단계에서 호출)
+
+    Args:
+        chunks (List[Dict]): 새로 색인한 청크 목록
+        progress (ReindexJob, optional): 진행 상황을 기록하고 취소 여부를 확인할 작업 객체
+    """
+    from app.services.embeddings import embed_texts_for_ingestion
+
+    sentences = sentence_texts(chunks)
+    if sentences:
+        print(f"컨텍스트 압축용 문장 임베딩: {len(sentences)}개 문장")
+        embed_texts_for_ingestion(sentences, progress=progress)
+
+
+def compress_chunks(
+    query_embedding: List[float],
+    chunks: List[Dict],
+    max_sentences: int = None,
+) -> List[Dict]:
+    """
+    청크마다 질의와 관련도가 높은 문장만 남긴 새 청크 목록을 반환합니다.
+
+    모든 청크의 문장 임베딩을 하나의 행렬로 모아 질의 임베딩과 한 번에 유사도를 계산하고,
+    청크마다 상위 max_sentences개 문장을 원래 순서대로, 속한 헤딩/표 머리글과 함께 남깁니다.
+    문장 수가 max_sentences 이하인 청크는 그대로 둡니다.
+
+    Args:
+        query_embedding (List[float]): 질의 임베딩
+        chunks (List[Dict]): 검색된 청크 목록
+        max_sentences (int, optional): 청크당 남길 문장 수.
+            기본값은 settings.CONTEXT_COMPRESSION_MAX_SENTENCES.
+
+    Returns:
+        List[Dict]: 'content'와 'token_count'가 압축된 내용으로 바뀐 청크 목록
+
+    Raises:
+        ValueError: max_sentences가 1보다 작은 경우
+    """
+    from app.services.embeddings import embed_texts
+
+    if max_sentences is None:
+        max_sentences = settings.CONTEXT_COMPRESSION_MAX_SENTENCES
+    if max_sentences < 1:
+        raise ValueError(f"max_sentences는 1 이상이어야 합니다: {max_sentences}")
+
+    units = [split_sentences(chunk["content"]) for chunk in chunks]
+    targets = [i for i, chunk_units in enumerate(units) if len(chunk_units) > max_sentences]
+    if not targets or not query_embedding:
+        return chunks
+
+    # 압축 대상 청크의 모든 문장을 한 행렬로 모아 한 번에 점수 계산
+    sentences = [sentence for i in targets for _, sentence in units[i]]
+    matrix = normalize_rows(np.asarray(embed_texts(sentences), dtype=np.float32))
+    query = np.asarray(query_embedding, dtype=np.float32)
+    scores = matrix @ (query / (np.linalg.norm(query) or 1.0))
+
+    compressed = list(chunks)
+    offset = 0
+    for i in targets:
+        chunk_units = units[i]
+        chunk_scores = scores[offset : offset + len(chunk_units)]
+        offset += len(chunk_units)
+
+        keep = sorted(np.argpartition(-chunk_scores, max_sentences - 1)[:max_sentences])
+        lines: List[str] = []
+        shown = set()
+        for j in keep:
+            context, sentence = chunk_units[j]
+            for line in context:
+                if line not in shown:
+                    if line.lstrip().startswith("#") and lines:
+                        lines.append("")
+                    lines.append(line)
+                    shown.add(line)
+            lines.append(sentence)
+
+        content = "\n".join(lines)
+        compressed[i] = {**chunks[i], "content": content, "token_count": count_tokens(content)}
+
+    return compressed
@@ -0,0 +1,189 @@
+"""
+원본 문서 매니페스트
+
+재색인할 때 data/docs/raw의 모든 파일을 다시 읽고 청킹하지 않도록, 마지막으로 색인한
+파일마다 크기, 수정 시각, 내용 해시, 만들어진 청크 ID를 기록합니다. 크기와 수정 시각이
+같은 파일은 읽지 않고, 달라진 파일도 내용 해시가 같으면 바뀌지 않은 것으로 봅니다.
+
+청킹 설정이 바뀌면 파일이 그대로여도 청크가 달라지므로 설정값도 함께 기록합니다.
+매니페스트는 서빙 컬렉션 교체에 성공한 뒤에만 저장하며, 기록한 컬렉션 이름이 현재 서빙
+컬렉션과 다르면(롤백, 수동 삭제 등) 사용하지 않습니다.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    파일 내용의 SHA-256 해시를 반환합니다.
+
+    Args:
+        file_path (str): 파일 경로
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DocumentManifest:
+    """
+    색인된 원본 파일 목록 (파일 이름 -> size, mtime_ns, sha256, chunk_ids)
+    """
+
+    def __init__(
+        self,
+        files: Optional[Dict[str, Dict]] = None,
+        collection: Optional[str] = None,
+        path: Optional[str] = None,
+        chunking: Optional[Dict] = None,
+    ):
+        self.files: Dict[str, Dict] = files or {}
+        self.collection = collection
+        self.chunking = chunking
+        self.path = path or settings.DOCUMENT_MANIFEST_PATH
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "DocumentManifest":
+        """
+        매니페스트 파일을 불러옵니다. 파일이 없거나 읽을 수 없으면 빈 매니페스트를 반환합니다.
+
+        Args:
+            path (str, optional): 매니페스트 파일 경로. 기본값은 settings.DOCUMENT_MANIFEST_PATH.
+
+        Returns:
+            DocumentManifest: 불러온 매니페스트
+        """
+        path = path or settings.DOCUMENT_MANIFEST_PATH
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path=path)
+        except (OSError, ValueError) as e:
+            print(f"문서 매니페스트를 읽을 수 없어 새로 만듭니다: {str(e)}")
+            return cls(path=path)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path=path)
+        return cls(data.get("files", {}), data.get("collection"), path, data.get("chunking"))
+
+    def save(self):
+        """매니페스트를 임시 파일에 쓴 뒤 os.replace로 교체합니다."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "collection": self.collection,
+                    "chunking": self.chunking,
+                    "files": self.files,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp_file, self.path)
+
+    def lookup(self, name: str, stat: os.stat_result) -> Optional[Dict]:
+        """
+        크기와 수정 시각이 기록과 같으면 해당 항목을 반환합니다. (파일을 읽지 않음)
+
+        Args:
+            name (str): 파일 이름
+            stat (os.stat_result): 파일의 현재 stat
+
+        Returns:
+            Optional[Dict]: 바뀌지 않은 파일의 항목, 없으면 None
+        """
+        entry = self.files.get(name)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return entry
+        return None
+
+    def record(self, name: str, stat: os.stat_result, sha256: str, chunk_ids: List[str]):
+        """
+        파일 하나의 색인 결과를 기록합니다.
+
+        Args:
+            name (str): 파일 이름
+            stat (os.stat_result): 파일 stat
+            sha256 (str): 파일 내용 해시
+            chunk_ids (List[str]): 파일에서 만들어진 청크 ID 목록
+        """
+        self.files[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+            "chunk_ids": list(chunk_ids),
+        }
+
+
+class DocumentChangePlan:
+    """
+    매니페스트와 현재 원본 문서를 비교한 벡터 저장소 변경 계획
+
+    - chunks: 추가되거나 바뀐 파일에서 새로 만든 청크 (임베딩 대상 후보)
+    - keep_ids: 바뀌지 않은 파일의 청크 ID (기존 컬렉션에서 그대로 복사)
+    - remove_ids: 바뀌거나 삭제된 파일에서 더 이상 만들어지지 않는 청크 ID
+    """
+
+    def __init__(self, manifest: DocumentManifest):
+        self.manifest = manifest
+        self.added: List[str] = []
+        self.modified: List[str] = []
+        self.deleted: List[str] = []
+        self.unchanged: List[str] = []
+        self.chunks: List[Dict] = []
+        self.keep_ids: List[str] = []
+        self.remove_ids: List[str] = []
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+    @property
+    def total_chunks(self) -> int:
+        return len(self.chunks) + len(self.keep_ids)
+
+    def summary(self) -> str:
+        return (
+            f"파일 추가 {len(self.added)}개, 수정 {len(self.modified)}개, "
+            f"삭제 {len(self.deleted)}개, 유지 {len(self.unchanged)}개 "
+            f"(삭제할 청크 {len(self.remove_ids)}개)"
+        )
+
+
+def load_document_manifest(collection: Optional[str] = None) -> DocumentManifest:
+    """
+    매니페스트를 불러옵니다. collection이 주어졌는데 매니페스트를 저장할 때의 서빙 컬렉션과
+    다르면, 매니페스트의 청크가 현재 컬렉션에 있다고 보장할 수 없으므로 빈 매니페스트를 반환합니다.
+
+    Args:
+        collection (str, optional): 현재 서빙 컬렉션 이름
+
+    Returns:
+        DocumentManifest: 매니페스트
+    """
+    manifest = DocumentManifest.load()
+    if collection is not None and manifest.collection != collection:
+        if manifest.files:
+            print("문서 매니페스트가 현재 서빙 컬렉션과 달라 모든 파일을 다시 처리합니다.")
+        return DocumentManifest(path=manifest.path)
+    return manifest
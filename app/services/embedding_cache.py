@@ -0,0 +1,162 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.cache import TTLCache
+
+
+def hash_text(text: str) -> str:
+    """
+    임베딩 캐시 키로 사용할 텍스트의 SHA-256 해시를 반환합니다.
+
+    Args:
+        text (str): 원본 텍스트
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    (모델, 차원, 텍스트 해시)를 키로 임베딩을 저장하는 디스크 기반 캐시
+
+    SQLite 파일에 float32 바이트로 저장하여 프로세스 재시작이나 평가 스크립트 실행 간에도
+    재사용하며, 자주 쓰는 항목은 앞단의 인메모리 LRU에서 바로 반환합니다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model: str,
+        dimensions: Optional[int] = None,
+        memory_size: int = 4096,
+    ):
+        self.path = path
+        self.model = model
+        self.dimensions = dimensions or 0
+        self._memory = TTLCache(memory_size)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (model, dimensions, text_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        텍스트 목록의 캐시된 임베딩을 반환합니다. 캐시에 없는 항목은 None입니다.
+
+        Args:
+            texts (Sequence[str]): 텍스트 목록
+
+        Returns:
+            List[Optional[List[float]]]: 텍스트 순서대로 정렬된 임베딩 목록
+        """
+        hashes = [hash_text(text) for text in texts]
+        results: List[Optional[List[float]]] = [
+            self._memory.get(text_hash) for text_hash in hashes
+        ]
+
+        missing = sorted({h for h, r in zip(hashes, results) if r is None})
+        if not missing:
+            return results
+
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회
+            for start in range(0, len(missing), 500):
+                batch = missing[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, embedding FROM embeddings "
+                    f"WHERE model = ? AND dimensions = ? AND text_hash IN ({placeholders})",
+                    [self.model, self.dimensions, *batch],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+        for i, text_hash in enumerate(hashes):
+            if results[i] is None and text_hash in found:
+                results[i] = found[text_hash]
+                self._memory.set(text_hash, found[text_hash])
+
+        return results
+
+    def put_many(self, texts: Sequence[str], embeddings: Sequence[Sequence[float]]):
+        """
+        텍스트와 임베딩 쌍을 캐시에 저장합니다.
+
+        Args:
+            texts (Sequence[str]): 텍스트 목록
+            embeddings (Sequence[Sequence[float]]): 텍스트와 같은 순서의 임베딩 목록
+        """
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            text_hash = hash_text(text)
+            vector = np.asarray(embedding, dtype=np.float32)
+            self._memory.set(text_hash, vector.tolist())
+            rows.append((self.model, self.dimensions, text_hash, vector.tobytes()))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, dimensions, text_hash, embedding) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+
+# 전역 임베딩 캐시 (싱글톤, 열 수 없었던 경우 False)
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    설정에 맞는 임베딩 캐시의 싱글톤 인스턴스를 반환합니다.
+    캐시가 비활성화되어 있거나 열 수 없으면 None을 반환합니다.
+    여는 데 실패하면 그 결과를 기억하여 다시 시도하거나 오류를 반복해서 출력하지 않습니다.
+
+    Returns:
+        Optional[EmbeddingCache]: 임베딩 캐시
+    """
+    global _embedding_cache
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                try:
+                    _embedding_cache = EmbeddingCache(
+                        settings.EMBEDDING_CACHE_PATH,
+                        settings.EMBEDDING_MODEL,
+                        settings.EMBEDDING_DIMENSIONS,
+                        settings.EMBEDDING_CACHE_MEMORY_SIZE,
+                    )
+                except Exception as e:
+                    print(f"임베딩 캐시를 열 수 없어 캐시 없이 진행합니다: {str(e)}")
+                    _embedding_cache = False
+    return _embedding_cache if _embedding_cache is not False else None
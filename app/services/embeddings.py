@@ -1,54 +1,487 @@
+import asyncio
+import json
 import os
-from typing import Dict, List
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
 
 import chromadb
 import numpy as np
+import openai
 from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 
 from app.core.config import settings
-from app.core.utils import get_openai_client
-from app.services.markdown_processor import process_markdown_documents
+from app.core.utils import (count_tokens, get_async_openai_client,
+                            get_openai_client, truncate_tokens)
+from app.services.context_compression import index_sentence_embeddings
+from app.services.embedding_cache import get_embedding_cache
+from app.services.vector_store import get_vector_store
+
+
+class CachedOpenAIEmbeddingFunction(OpenAIEmbeddingFunction):
+    """
+    임베딩 캐시를 거쳐 OpenAI 임베딩을 생성하는 ChromaDB 임베딩 함수
+
+    ChromaDB가 query_texts/documents를 임베딩할 때 이미 계산한 텍스트는 네트워크 요청 없이
+    캐시에서 가져오고, 나머지만 한 번의 요청으로 생성합니다.
+    """
+
+    def __call__(self, input):
+        return embed_texts(list(input))
+
+
+# 프로세스 전역 ChromaDB 핸들 레지스트리
+# 요청마다 PersistentClient와 임베딩 함수를 새로 만들지 않도록 한 번 생성한 핸들과
+# 문서 수를 재사용하고, 벡터 저장소가 갱신될 때만 무효화합니다.
+_chroma_client = None
+_collections: Dict[str, "chromadb.Collection"] = {}
+_collection_counts: Dict[str, int] = {}
+_registry_lock = threading.Lock()
+
+# 벡터 저장소 데이터가 바뀔 때마다 증가하는 인덱스 버전 (응답 캐시 키에 사용)
+_index_version = 0
+
+# 색인 중 임베딩 요청이 속도 제한에 걸리면 모든 워커가 이 시각까지 요청을 멈춤
+_rate_limited_until = 0.0
+_rate_limit_lock = threading.Lock()
+
+# 서빙에 사용하는 실제 컬렉션 이름
+# CHROMA_COLLECTION_NAME은 별칭(alias)이며, 재색인 시 버전이 붙은 새 컬렉션을 만든 뒤
+# 별칭이 가리키는 컬렉션을 원자적으로 교체합니다.
+# 다른 프로세스(다른 uvicorn 워커, CLI)가 별칭을 바꿀 수 있으므로 별칭 파일의 수정 시각이
+# 바뀌면 다시 읽습니다.
+_active_collection_name: Optional[str] = None
+_alias_file_mtime: Optional[int] = None
 
 
 def get_chroma_client():
     """
-    ChromaDB 클라이언트를 초기화하고 반환합니다.
+    ChromaDB 클라이언트를 초기화하고 반환합니다. 프로세스당 한 번만 생성됩니다.
 
     Returns:
         chromadb.PersistentClient: 초기화된 ChromaDB 클라이언트
     """
-    # 디렉토리가 없으면 생성
-    os.makedirs(settings.CHROMA_DB_DIR, exist_ok=True)
+    global _chroma_client
+    if _chroma_client is None:
+        with _registry_lock:
+            if _chroma_client is None:
+                # 디렉토리가 없으면 생성
+                os.makedirs(settings.CHROMA_DB_DIR, exist_ok=True)
+
+                # 클라이언트 생성
+                _chroma_client = chromadb.PersistentClient(path=settings.CHROMA_DB_DIR)
+    return _chroma_client
+
+
+def get_active_collection_name() -> str:
+    """
+    CHROMA_COLLECTION_NAME 별칭이 현재 가리키는 실제 컬렉션 이름을 반환합니다.
+    별칭 파일이 없으면 별칭과 같은 이름의 컬렉션을 사용합니다.
+
+    별칭 파일은 수정 시각이 바뀐 경우에만 다시 읽으며, 다른 프로세스가 별칭을 교체했으면
+    인덱스 버전을 올려 응답 캐시와 의미 캐시의 키가 바뀌도록 합니다.
+
+    Returns:
+        str: 서빙에 사용하는 컬렉션 이름
+    """
+    global _active_collection_name, _alias_file_mtime, _index_version
+    alias = settings.CHROMA_COLLECTION_NAME
+    try:
+        mtime = os.stat(settings.CHROMA_ALIAS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    if _active_collection_name is not None and mtime == _alias_file_mtime:
+        return _active_collection_name
+
+    name = alias
+    if mtime is not None:
+        try:
+            with open(settings.CHROMA_ALIAS_FILE, "r", encoding="utf-8") as f:
+                name = json.load(f).get(alias, alias)
+        except FileNotFoundError:
+            mtime = None
+
+    with _registry_lock:
+        if _active_collection_name is not None and name != _active_collection_name:
+            print(f"다른 프로세스가 교체한 컬렉션 '{name}'을(를) 사용합니다.")
+            _index_version += 1
+        _active_collection_name = name
+        _alias_file_mtime = mtime
+    return name
+
+
+def set_active_collection_name(name: str):
+    """
+    별칭이 가리키는 컬렉션을 교체합니다. 별칭 파일은 임시 파일에 쓴 뒤
+    os.replace로 바꾸므로 다른 프로세스가 반쯤 쓰인 파일을 읽는 일이 없습니다.
+
+    Args:
+        name (str): 새로 서빙할 컬렉션 이름
+    """
+    global _active_collection_name, _alias_file_mtime, _index_version
+    alias = settings.CHROMA_COLLECTION_NAME
+
+    aliases = {}
+    try:
+        with open(settings.CHROMA_ALIAS_FILE, "r", encoding="utf-8") as f:
+            aliases = json.load(f)
+    except FileNotFoundError:
+        pass
+    aliases[alias] = name
 
-    # 클라이언트 생성
-    return chromadb.PersistentClient(path=settings.CHROMA_DB_DIR)
+    os.makedirs(os.path.dirname(settings.CHROMA_ALIAS_FILE) or ".", exist_ok=True)
+    tmp_file = f"{settings.CHROMA_ALIAS_FILE}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(aliases, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, settings.CHROMA_ALIAS_FILE)
 
+    with _registry_lock:
+        _active_collection_name = name
+        _alias_file_mtime = os.stat(settings.CHROMA_ALIAS_FILE).st_mtime_ns
+        _index_version += 1
 
-def get_or_create_collection():
+
+def get_or_create_collection(name: Optional[str] = None):
     """
-    ChromaDB 컬렉션을 가져오거나 생성합니다.
+    ChromaDB 컬렉션을 가져오거나 생성합니다. 한 번 가져온 컬렉션 핸들은 캐시됩니다.
+
+    Args:
+        name (str, optional): 컬렉션 이름. 기본값은 현재 서빙 중인 컬렉션.
 
     Returns:
         chromadb.Collection: ChromaDB 컬렉션
     """
+    if name is None:
+        name = get_active_collection_name()
+
+    collection = _collections.get(name)
+    if collection is not None:
+        return collection
+
     client = get_chroma_client()
 
-    # OpenAI 임베딩 함수 설정
-    embedding_function = OpenAIEmbeddingFunction(
-        api_key=settings.OPENAI_API_KEY, model_name=settings.EMBEDDING_MODEL
-    )
+    with _registry_lock:
+        collection = _collections.get(name)
+        if collection is None:
+            # OpenAI 임베딩 함수 설정
+            embedding_function = CachedOpenAIEmbeddingFunction(
+                api_key=settings.OPENAI_API_KEY, model_name=settings.EMBEDDING_MODEL
+            )
+
+            # 컬렉션 생성 또는 가져오기
+            collection = client.get_or_create_collection(
+                name=name,
+                embedding_function=embedding_function,
+                metadata={"hnsw:space": "cosine"},  # FAISS HNSW 인덱스 사용
+            )
+            _collections[name] = collection
+
+    return collection
+
+
+def get_collection_count(name: Optional[str] = None) -> int:
+    """
+    컬렉션의 문서 수를 반환합니다. 값은 invalidate_collection_cache가 호출될 때까지 캐시됩니다.
+
+    Args:
+        name (str, optional): 컬렉션 이름. 기본값은 현재 서빙 중인 컬렉션.
 
-    # 컬렉션 생성 또는 가져오기
-    return client.get_or_create_collection(
-        name=settings.CHROMA_COLLECTION_NAME,
-        embedding_function=embedding_function,
-        metadata={"hnsw:space": "cosine"},  # FAISS HNSW 인덱스 사용
+    Returns:
+        int: 컬렉션에 저장된 문서 수
+    """
+    if name is None:
+        name = get_active_collection_name()
+
+    count = _collection_counts.get(name)
+    if count is None:
+        count = get_or_create_collection(name).count()
+        _collection_counts[name] = count
+    return count
+
+
+def invalidate_collection_cache(name: Optional[str] = None, drop_handle: bool = False):
+    """
+    캐시된 문서 수(및 선택적으로 컬렉션 핸들)를 무효화합니다.
+    벡터 저장소의 데이터가 바뀐 뒤에 호출해야 합니다.
+
+    Args:
+        name (str, optional): 컬렉션 이름. 기본값은 현재 서빙 중인 컬렉션.
+        drop_handle (bool, optional): 컬렉션 핸들도 함께 제거할지 여부. 기본값은 False.
+    """
+    global _index_version
+    if name is None:
+        name = get_active_collection_name()
+
+    with _registry_lock:
+        _collection_counts.pop(name, None)
+        if drop_handle:
+            _collections.pop(name, None)
+        _index_version += 1
+
+
+def get_index_version() -> int:
+    """
+    현재 인덱스 버전을 반환합니다. 벡터 저장소가 갱신될 때마다 값이 바뀝니다.
+    다른 프로세스가 별칭을 교체했는지도 함께 확인합니다.
+
+    Returns:
+        int: 인덱스 버전
+    """
+    get_active_collection_name()
+    return _index_version
+
+
+def _embedding_request_kwargs() -> Dict:
+    """임베딩 API 요청에 공통으로 사용할 인자를 반환합니다."""
+    kwargs = {"model": settings.EMBEDDING_MODEL}
+    if settings.EMBEDDING_DIMENSIONS:
+        kwargs["dimensions"] = settings.EMBEDDING_DIMENSIONS
+    return kwargs
+
+
+def _count_embedding_tokens(text: str) -> int:
+    """
+    임베딩 모델 기준 입력 토큰 수를 계산합니다. 입력당 한도를 넘는 텍스트는 잘라서 보내므로
+    한도를 넘지 않습니다.
+    """
+    return min(
+        count_tokens(text, settings.EMBEDDING_MODEL), settings.EMBEDDING_MAX_INPUT_TOKENS
     )
 
 
+def _embedding_inputs(texts: List[str]) -> List[str]:
+    """
+    임베딩 API 입력을 만듭니다. 입력당 토큰 한도(EMBEDDING_MAX_INPUT_TOKENS)를 넘는 텍스트는
+    한도에 맞게 앞부분만 남깁니다. (캐시 키는 원래 텍스트를 사용)
+    """
+    limit = settings.EMBEDDING_MAX_INPUT_TOKENS
+    inputs = []
+    for text in texts:
+        # 토큰은 최소 1바이트이므로 바이트 수가 한도 이하이면 토큰을 세지 않아도 됨
+        if (
+            len(text.encode("utf-8")) > limit
+            and count_tokens(text, settings.EMBEDDING_MODEL) > limit
+        ):
+            print(f"임베딩 입력이 {limit} 토큰을 넘어 앞부분만 임베딩합니다: {text[:40]!r}...")
+            text = truncate_tokens(text, limit, settings.EMBEDDING_MODEL)
+        inputs.append(text)
+    return inputs
+
+
+def _split_cached(texts: List[str]):
+    """
+    중복을 제거한 텍스트 목록과, 그중 캐시에 있는 임베딩/없는 텍스트를 반환합니다.
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    cache = get_embedding_cache()
+    if cache is None:
+        return unique_texts, {}, unique_texts, None
+
+    cached = cache.get_many(unique_texts)
+    found = {text: emb for text, emb in zip(unique_texts, cached) if emb is not None}
+    missing = [text for text in unique_texts if text not in found]
+    return unique_texts, found, missing, cache
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """
+    여러 텍스트의 임베딩을 생성합니다.
+
+    같은 텍스트는 한 번만 처리하고, 임베딩 캐시에 있는 텍스트는 API를 호출하지 않으며,
+    나머지는 한 번의 API 요청으로 생성한 뒤 캐시에 저장합니다.
+
+    Args:
+        texts (List[str]): 임베딩할 텍스트 목록
+
+    Returns:
+        List[List[float]]: 입력 순서대로 정렬된 임베딩 목록
+    """
+    if not texts:
+        return []
+
+    _, found, missing, cache = _split_cached(texts)
+
+    if missing:
+        client = get_openai_client()
+        response = client.embeddings.create(
+            input=_embedding_inputs(missing), **_embedding_request_kwargs()
+        )
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        if cache is not None:
+            cache.put_many(missing, embeddings)
+        found.update(zip(missing, embeddings))
+
+    return [found[text] for text in texts]
+
+
+def _pack_batches(texts: List[str]) -> List[tuple]:
+    """
+    텍스트를 요청당 토큰 예산(EMBEDDING_BATCH_MAX_TOKENS)과 입력 수 한도
+    (EMBEDDING_BATCH_MAX_INPUTS)를 넘지 않는 배치로 순서대로 묶습니다.
+    토큰 수는 gpt-4o가 아닌 임베딩 모델의 인코딩으로 계산합니다.
+
+    Args:
+        texts (List[str]): 임베딩할 텍스트 목록
+
+    Returns:
+        List[tuple]: (텍스트 목록, 토큰 수) 배치 목록
+    """
+    batches = []
+    batch, batch_tokens = [], 0
+    for text in texts:
+        tokens = _count_embedding_tokens(text)
+        if batch and (
+            batch_tokens + tokens > settings.EMBEDDING_BATCH_MAX_TOKENS
+            or len(batch) >= settings.EMBEDDING_BATCH_MAX_INPUTS
+        ):
+            batches.append((batch, batch_tokens))
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        batches.append((batch, batch_tokens))
+    return batches
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    재시도 전 대기 시간을 계산합니다. 응답에 Retry-After 헤더가 있으면 그 값을 따르고,
+    없으면 지수 백오프에 지터를 더합니다.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    delay = settings.EMBEDDING_RETRY_BASE_DELAY * (2**attempt)
+    return min(delay, 60.0) * (0.5 + random.random() / 2)
+
+
+def _embed_batch_with_retry(texts: List[str]) -> List[List[float]]:
+    """
+    한 배치를 임베딩합니다. 속도 제한이나 일시적인 서버/네트워크 오류는
+    EMBEDDING_MAX_RETRIES번까지 대기 후 재시도합니다.
+    """
+    global _rate_limited_until
+    client = get_openai_client()
+
+    for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
+        # 다른 워커가 속도 제한에 걸렸으면 같이 대기
+        wait = _rate_limited_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            response = client.embeddings.create(
+                input=_embedding_inputs(texts), **_embedding_request_kwargs()
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        except (
+            openai.RateLimitError,
+            openai.APIConnectionError,
+            openai.APITimeoutError,
+            openai.InternalServerError,
+        ) as e:
+            if attempt == settings.EMBEDDING_MAX_RETRIES:
+                raise
+            delay = _retry_delay(e, attempt)
+            if isinstance(e, openai.RateLimitError):
+                with _rate_limit_lock:
+                    _rate_limited_until = max(_rate_limited_until, time.monotonic() + delay)
+            print(f"임베딩 요청 재시도 {attempt + 1}/{settings.EMBEDDING_MAX_RETRIES} ({delay:.1f}초 후): {str(e)}")
+            time.sleep(delay)
+
+
+def embed_texts_for_ingestion(texts: List[str], progress=None) -> List[List[float]]:
+    """
+    색인용으로 많은 텍스트를 임베딩합니다.
+
+    캐시에 없는 텍스트만 토큰 예산 단위 배치로 묶어 EMBEDDING_CONCURRENCY개까지 동시에
+    요청하고, 완료된 배치는 바로 임베딩 캐시에 저장합니다. 도중에 실패하거나 취소되어도
+    이미 끝난 배치는 다음 실행에서 캐시로 재사용되므로 남은 배치만 다시 요청합니다.
+
+    Args:
+        texts (List[str]): 임베딩할 텍스트 목록
+        progress (ReindexJob, optional): 진행 상황을 기록하고 배치마다 취소 여부를 확인할 작업 객체
+
+    Returns:
+        List[List[float]]: 입력 순서대로 정렬된 임베딩 목록
+    """
+    if not texts:
+        return []
+
+    _, found, missing, cache = _split_cached(texts)
+    batches = _pack_batches(missing)
+    if missing:
+        print(
+            f"임베딩 생성: {len(missing)}개 텍스트를 {len(batches)}개 배치로 요청합니다 "
+            f"(캐시 재사용 {len(found)}개, 동시 요청 {settings.EMBEDDING_CONCURRENCY}개)"
+        )
+
+    executor = ThreadPoolExecutor(max_workers=max(1, settings.EMBEDDING_CONCURRENCY))
+    try:
+        futures = {
+            executor.submit(_embed_batch_with_retry, batch): (batch, tokens)
+            for batch, tokens in batches
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            batch, tokens = futures[future]
+            embeddings = future.result()
+            # 완료된 배치를 캐시에 저장 (재시작 시 체크포인트 역할)
+            if cache is not None:
+                cache.put_many(batch, embeddings)
+            found.update(zip(batch, embeddings))
+
+            print(f"임베딩 배치 {done}/{len(batches)} 완료 ({len(batch)}개, {tokens} 토큰)")
+            if progress is not None:
+                progress.add(tokens_spent=tokens)
+                progress.check_cancelled()
+    finally:
+        # 실패하거나 취소되면 아직 시작하지 않은 배치는 요청하지 않음
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return [found[text] for text in texts]
+
+
+async def embed_texts_async(texts: List[str]) -> List[List[float]]:
+    """
+    embed_texts의 비동기 버전입니다.
+
+    Args:
+        texts (List[str]): 임베딩할 텍스트 목록
+
+    Returns:
+        List[List[float]]: 입력 순서대로 정렬된 임베딩 목록
+    """
+    if not texts:
+        return []
+
+    # SQLite 조회는 동기 API이므로 워커 스레드에서 실행
+    _, found, missing, cache = await asyncio.to_thread(_split_cached, texts)
+
+    if missing:
+        client = get_async_openai_client()
+        response = await client.embeddings.create(
+            input=_embedding_inputs(missing), **_embedding_request_kwargs()
+        )
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        if cache is not None:
+            await asyncio.to_thread(cache.put_many, missing, embeddings)
+        found.update(zip(missing, embeddings))
+
+    return [found[text] for text in texts]
+
+
 def generate_embedding(text: str) -> List[float]:
     """
-    OpenAI API를 사용하여 텍스트에 대한 임베딩 벡터를 생성합니다.
+    OpenAI API를 사용하여 텍스트에 대한 임베딩 벡터를 생성합니다. (임베딩 캐시 사용)
 
     Args:
         text (str): 임베딩할 텍스트
@@ -57,23 +490,40 @@ def generate_embedding(text: str) -> List[float]:
         List[float]: 임베딩 벡터
     """
     try:
-        client = get_openai_client()
-        response = client.embeddings.create(model=settings.EMBEDDING_MODEL, input=text)
-        # 응답에서 임베딩 벡터 추출
-        embedding = response.data[0].embedding
-        return embedding
+        return embed_texts([text])[0]
     except Exception as e:
         print(f"임베딩 생성 중 오류 발생: {str(e)}")
         return []
 
 
-def find_similar_chunks(query: str, top_k: int = 3) -> List[Dict]:
+async def generate_embedding_async(text: str) -> List[float]:
     """
-    사용자 쿼리에 가장 유사한 청크를 ChromaDB에서 검색합니다.
+    generate_embedding의 비동기 버전입니다.
+
+    Args:
+        text (str): 임베딩할 텍스트
+
+    Returns:
+        List[float]: 임베딩 벡터
+    """
+    try:
+        return (await embed_texts_async([text]))[0]
+    except Exception as e:
+        print(f"임베딩 생성 중 오류 발생: {str(e)}")
+        return []
+
+
+def find_similar_chunks(
+    query: str, top_k: int = 3, query_embedding: Optional[List[float]] = None
+) -> List[Dict]:
+    """
+    사용자 쿼리에 가장 유사한 청크를 설정된 검색 백엔드(RETRIEVAL_BACKEND)에서 검색합니다.
 
     Args:
         query (str): 사용자 쿼리
         top_k (int, optional): 반환할 최상위 유사 청크 수. 기본값은 3.
+        query_embedding (List[float], optional): 미리 계산된 쿼리 임베딩.
+            주어지면 쿼리를 다시 임베딩하지 않고 이 벡터로 검색합니다.
 
     Returns:
         List[Dict]: 상위 k개의 유사한 청크 목록
@@ -82,77 +532,287 @@ def find_similar_chunks(query: str, top_k: int = 3) -> List[Dict]:
         collection = get_or_create_collection()
 
         # 컬렉션이 비어있는 경우
-        if collection.count() == 0:
+        if get_collection_count() == 0:
             print("ChromaDB가 비어있습니다. 데이터를 추가해주세요.")
             return []
 
-        # ChromaDB에서 검색
-        results = collection.query(query_texts=[query], n_results=top_k)
-
-        # 결과 포맷 변환
-        chunks = []
-        for i in range(len(results["ids"][0])):
-            chunk = {
-                "id": results["ids"][0][i],
-                "title": results["metadatas"][0][i].get("title", "제목 없음"),
-                "content": results["documents"][0][i],
-                "source": results["metadatas"][0][i].get("source", "출처 미상"),
-            }
-            chunks.append(chunk)
-
-        return chunks
+        # 쿼리 임베딩은 캐시를 거쳐 한 번만 만들고 모든 백엔드에 같은 벡터로 검색
+        if not query_embedding:
+            query_embedding = embed_texts([query])[0]
+        return get_vector_store(collection).query(query_embedding, top_k)
 
     except Exception as e:
-        print(f"ChromaDB 검색 중 오류 발생: {str(e)}")
+        print(f"벡터 검색 중 오류 발생: {str(e)}")
         return []
 
 
-def generate_embeddings_for_chunks(chunks: List[Dict[str, str]]) -> List[Dict]:
+async def find_similar_chunks_async(
+    query: str, top_k: int = 3, query_embedding: Optional[List[float]] = None
+) -> List[Dict]:
     """
-    청크 목록에 대한 임베딩을 생성하고 ChromaDB에 저장합니다.
+    find_similar_chunks의 비동기 버전입니다.
+
+    ChromaDB 검색(쿼리 임베딩 생성 + HNSW 검색)은 동기 API이므로 워커 스레드에서 실행하여
+    이벤트 루프가 다른 요청을 계속 처리할 수 있도록 합니다.
 
     Args:
-        chunks (List[Dict[str, str]]): 청킹된, 각각 'title'과 'content'를 포함하는 딕셔너리 목록
+        query (str): 사용자 쿼리
+        top_k (int, optional): 반환할 최상위 유사 청크 수. 기본값은 3.
+        query_embedding (List[float], optional): 미리 계산된 쿼리 임베딩
 
     Returns:
-        List[Dict]: 저장된 청크 목록
+        List[Dict]: 상위 k개의 유사한 청크 목록
     """
-    # ChromaDB 컬렉션 가져오기
-    collection = get_or_create_collection()
+    return await asyncio.to_thread(find_similar_chunks, query, top_k, query_embedding)
+
+
+def find_similar_chunks_batch(queries: List[str], top_k: int = 3) -> List[List[Dict]]:
+    """
+    여러 쿼리에 가장 유사한 청크를 한 번에 검색합니다.
+
+    같은 쿼리는 한 번만 처리하며, 쿼리 임베딩은 한 번의 API 요청(캐시에 없는 것만)으로 만들고
+    검색 백엔드의 query_batch로 한 번에 검색합니다.
+
+    Args:
+        queries (List[str]): 사용자 쿼리 목록
+        top_k (int, optional): 쿼리마다 반환할 최상위 유사 청크 수. 기본값은 3.
+
+    Returns:
+        List[List[Dict]]: 입력 순서와 같은 쿼리별 상위 k개의 유사한 청크 목록
+    """
+    if not queries:
+        return []
 
-    # 기존 데이터 모두 제거 (새로 생성)
     try:
-        # 기존 모든 문서의 ID를 가져옵니다
-        if collection.count() > 0:
-            all_ids = collection.get()["ids"]
-            # 모든 ID를 사용하여 데이터 삭제
-            if all_ids:
-                collection.delete(ids=all_ids)
-            print(f"{len(all_ids)}개의 기존 문서가 삭제되었습니다.")
+        collection = get_or_create_collection()
+
+        # 컬렉션이 비어있는 경우
+        if get_collection_count() == 0:
+            print("ChromaDB가 비어있습니다. 데이터를 추가해주세요.")
+            return [[] for _ in queries]
+
+        unique_queries = list(dict.fromkeys(queries))
+        results = get_vector_store(collection).query_batch(
+            embed_texts(unique_queries), top_k
+        )
+        by_query = dict(zip(unique_queries, results))
+        return [list(by_query[query]) for query in queries]
+
     except Exception as e:
-        print(f"기존 데이터 삭제 중 오류 발생: {str(e)}")
-        # 오류가 발생해도 계속 진행
+        print(f"벡터 검색 중 오류 발생: {str(e)}")
+        return [[] for _ in queries]
+
+
+async def find_similar_chunks_batch_async(
+    queries: List[str], top_k: int = 3
+) -> List[List[Dict]]:
+    """
+    find_similar_chunks_batch의 비동기 버전입니다.
+
+    Args:
+        queries (List[str]): 사용자 쿼리 목록
+        top_k (int, optional): 쿼리마다 반환할 최상위 유사 청크 수. 기본값은 3.
+
+    Returns:
+        List[List[Dict]]: 쿼리별 상위 k개의 유사한 청크 목록
+    """
+    return await asyncio.to_thread(find_similar_chunks_batch, queries, top_k)
+
+
+def chunk_to_metadata(chunk: Dict) -> Dict:
+    """
+    청크를 ChromaDB 메타데이터 형식으로 변환합니다.
 
-    ids = []
-    documents = []
-    metadatas = []
+    Args:
+        chunk (Dict): 청크 딕셔너리
 
-    for i, chunk in enumerate(chunks):
-        print(f"청크 {i+1}/{len(chunks)}에 대한 임베딩 생성 및 저장 중...")
+    Returns:
+        Dict: ChromaDB에 저장할 메타데이터
+    """
+    return {
+        "title": chunk["title"],
+        "source": chunk.get("source", "출처 미상"),
+        "heading_path": chunk.get("heading_path", chunk["title"]),
+        "content_hash": chunk.get("content_hash", ""),
+        "token_count": chunk.get("token_count", 0),
+    }
 
-        # 청크 데이터 준비
-        chunk_id = f"chunk_{i}"
-        text = chunk["content"]
-        metadata = {"title": chunk["title"], "source": chunk.get("source", "출처 미상")}
 
-        # ChromaDB에 추가하기 위한 데이터 수집
-        ids.append(chunk_id)
-        documents.append(text)
-        metadatas.append(metadata)
+def _batched(items: List, size: int):
+    """리스트를 size 크기의 조각으로 나누어 순회합니다."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def validate_collection(collection, expected_count: int):
+    """
+    새로 만든 컬렉션이 서빙 가능한 상태인지 검증합니다. 실패하면 ValueError를 발생시킵니다.
 
-    # 배치로 ChromaDB에 데이터 추가
-    collection.add(ids=ids, documents=documents, metadatas=metadatas)
+    Args:
+        collection (chromadb.Collection): 검증할 컬렉션
+        expected_count (int): 컬렉션에 들어 있어야 하는 청크 수
+    """
+    count = collection.count()
+    if count != expected_count:
+        raise ValueError(f"문서 수가 일치하지 않습니다: 기대 {expected_count}개, 실제 {count}개")
+
+    for query in settings.INDEX_VALIDATION_QUERIES:
+        results = collection.query(query_texts=[query], n_results=1)
+        if not results["ids"][0]:
+            raise ValueError(f"검증 질의에 대한 검색 결과가 없습니다: {query}")
+
+
+def garbage_collect_collections(keep: Optional[int] = None):
+    """
+    서빙 중이 아닌 이전 버전 컬렉션을 삭제합니다.
+    진행 중인 요청이 이전 핸들을 쓰고 있을 수 있으므로 최근 버전 keep개는 남겨 둡니다.
 
-    print(f"ChromaDB에 {len(chunks)} 청크 저장 완료")
+    Args:
+        keep (int, optional): 남겨 둘 이전 버전 수. 기본값은 설정의 CHROMA_KEEP_PREVIOUS_VERSIONS.
+    """
+    if keep is None:
+        keep = settings.CHROMA_KEEP_PREVIOUS_VERSIONS
+
+    client = get_chroma_client()
+    active = get_active_collection_name()
+    prefix = f"{settings.CHROMA_COLLECTION_NAME}__v"
+
+    # list_collections는 버전에 따라 이름 문자열 또는 Collection 객체를 반환합니다
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    # 버전 관리 이전에 만들어진 별칭 이름의 컬렉션도 이전 버전으로 취급
+    previous = sorted(
+        (
+            name
+            for name in names
+            if (name.startswith(prefix) or name == settings.CHROMA_COLLECTION_NAME)
+            and name != active
+        ),
+        reverse=True,
+    )
+
+    for name in previous[keep:]:
+        client.delete_collection(name)
+        invalidate_collection_cache(name, drop_handle=True)
+        print(f"이전 버전 컬렉션 삭제: {name}")
+
+
+def generate_embeddings_for_chunks(
+    chunks: List[Dict[str, str]],
+    incremental: bool = True,
+    progress=None,
+    keep_ids: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    청크 목록으로 새 버전의 ChromaDB 컬렉션을 만들고, 검증 후 서빙 컬렉션을 교체합니다.
+
+    서빙 중인 컬렉션은 건드리지 않고 버전이 붙은 섀도 컬렉션에 데이터를 채운 다음
+    (문서 수, 검증 질의) 검증을 통과하면 별칭을 원자적으로 바꾸므로, 재색인 도중에도
+    검색 요청은 항상 완전한 컬렉션을 사용합니다.
+
+    청크 ID는 원본 파일, 헤딩 경로, 내용 해시로부터 만들어지므로(make_chunk_id),
+    증분 모드에서는 현재 컬렉션에 같은 ID가 있는 청크의 임베딩을 그대로 복사하고
+    새로 생기거나 바뀐 청크만 임베딩합니다. 청크 구성이 같으면 아무 작업도 하지 않습니다.
+    keep_ids에는 문서 매니페스트상 바뀌지 않은 파일의 청크 ID를 넘기며, 이 청크들은 청크
+    내용 없이 ID만으로 현재 컬렉션에서 복사합니다.
+
+    Args:
+        chunks (List[Dict[str, str]]): 청킹된, 각각 'id', 'title', 'content'를 포함하는 딕셔너리 목록
+        incremental (bool, optional): 현재 컬렉션의 임베딩을 재사용할지 여부. False이면
+            keep_ids 외의 모든 청크를 embed_texts_for_ingestion으로 다시 계산합니다(임베딩
+            캐시에 있는 텍스트는 캐시를 사용). 기본값은 True.
+        progress (ReindexJob, optional): 진행 상황을 기록하고 배치 사이마다 취소 여부를
+            확인할 작업 객체
+        keep_ids (List[str], optional): 현재 컬렉션에서 그대로 유지할 청크 ID 목록
+
+    Returns:
+        List[Dict]: 저장된 청크 목록
+    """
+    batch_size = settings.CHROMA_BATCH_SIZE
+    active = get_or_create_collection()
+    existing_ids = set(active.get(include=[])["ids"]) if active.count() else set()
+
+    keep_ids = set(keep_ids or [])
+    missing = keep_ids - existing_ids
+    if missing:
+        raise ValueError(
+            f"유지할 청크 {len(missing)}개가 현재 컬렉션에 없습니다. 전체 재색인이 필요합니다."
+        )
+
+    chunk_ids = {chunk["id"] for chunk in chunks} | keep_ids
+    if incremental and existing_ids == chunk_ids:
+        print("변경된 청크가 없어 벡터 저장소를 그대로 유지합니다.")
+        return chunks
+
+    reused_ids = sorted(existing_ids & chunk_ids if incremental else keep_ids)
+    reused = set(reused_ids)
+    new_chunks = [chunk for chunk in chunks if chunk["id"] not in reused]
+
+    print(
+        f"변경 사항: 추가/수정 {len(new_chunks)}개, "
+        f"삭제 {len(existing_ids - chunk_ids)}개, 유지 {len(reused_ids)}개"
+    )
+    if progress is not None:
+        progress.add(chunks_total=len(chunk_ids))
+
+    # 1. 섀도 컬렉션 생성
+    shadow_name = (
+        f"{settings.CHROMA_COLLECTION_NAME}__v{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    )
+    shadow = get_or_create_collection(shadow_name)
+
+    try:
+        # 2. 바뀌지 않은 청크는 기존 임베딩을 그대로 복사
+        for batch_ids in _batched(reused_ids, batch_size):
+            records = active.get(
+                ids=batch_ids, include=["embeddings", "documents", "metadatas"]
+            )
+            shadow.add(
+                ids=records["ids"],
+                embeddings=records["embeddings"],
+                documents=records["documents"],
+                metadatas=records["metadatas"],
+            )
+            if progress is not None:
+                progress.add(chunks_reused=len(batch_ids))
+                progress.check_cancelled()
+
+        # 3. 새로 생기거나 바뀐 청크만 임베딩한 뒤, 계산한 임베딩을 그대로 저장
+        embeddings = embed_texts_for_ingestion(
+            [chunk["content"] for chunk in new_chunks], progress=progress
+        )
+        for start in range(0, len(new_chunks), batch_size):
+            batch = new_chunks[start : start + batch_size]
+            shadow.add(
+                ids=[chunk["id"] for chunk in batch],
+                embeddings=embeddings[start : start + batch_size],
+                documents=[chunk["content"] for chunk in batch],
+                metadatas=[chunk_to_metadata(chunk) for chunk in batch],
+            )
+            if progress is not None:
+                progress.add(chunks_embedded=len(batch))
+                progress.check_cancelled()
+
+        # 컨텍스트 압축에 쓸 문장 임베딩을 임베딩 캐시에 미리 저장
+        if settings.CONTEXT_COMPRESSION_ENABLED:
+            index_sentence_embeddings(new_chunks, progress=progress)
+
+        # 4. 검증
+        validate_collection(shadow, len(chunk_ids))
+
+    except BaseException:
+        # 실패하거나 취소된 섀도 컬렉션은 정리하고 기존 컬렉션으로 계속 서빙
+        get_chroma_client().delete_collection(shadow_name)
+        invalidate_collection_cache(shadow_name, drop_handle=True)
+        raise
+
+    # 5. 별칭 교체 및 이전 버전 정리
+    set_active_collection_name(shadow_name)
+    print(f"서빙 컬렉션이 {shadow_name}(으)로 교체되었습니다.")
+
+    # 첫 검색 요청이 인덱스 생성 비용을 부담하지 않도록 미리 생성
+    get_vector_store(shadow)
+    garbage_collect_collections()
+
+    print(f"ChromaDB에 {len(chunk_ids)} 청크 저장 완료")
 
     return chunks
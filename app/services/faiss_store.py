@@ -0,0 +1,450 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+try:
+    import faiss
+except ImportError:  # faiss-cpu가 설치되지 않은 환경
+    faiss = None
+
+
+def index_build_settings(index_type: Optional[str] = None) -> Dict:
+    """
+    인덱스 구조를 결정하는 설정(인덱스 종류와 생성 파라미터)을 반환합니다.
+    저장된 인덱스의 값과 다르면 인덱스를 다시 만들어야 합니다. (efSearch/nprobe는 검색 시 적용)
+
+    Args:
+        index_type (str, optional): 인덱스 종류. 기본값은 설정의 FAISS_INDEX_TYPE.
+
+    Returns:
+        Dict: 인덱스 생성 설정
+    """
+    if index_type is None:
+        index_type = settings.FAISS_INDEX_TYPE
+
+    build_settings = {"index_type": index_type}
+    if index_type == "hnsw":
+        build_settings.update(
+            m=settings.FAISS_HNSW_M, ef_construction=settings.FAISS_HNSW_EF_CONSTRUCTION
+        )
+    elif index_type == "ivfpq":
+        build_settings.update(
+            nlist=settings.FAISS_IVF_NLIST,
+            pq_m=settings.FAISS_PQ_M,
+            pq_nbits=settings.FAISS_PQ_NBITS,
+        )
+    return build_settings
+
+
+class FaissVectorStore:
+    """
+    FAISS 인덱스 기반 벡터 저장소
+
+    index_type으로 정확 검색(flat), 그래프 기반 근사 검색(hnsw), 압축 근사 검색(ivfpq)을
+    선택할 수 있습니다. 임베딩은 L2 정규화 후 내적(METRIC_INNER_PRODUCT)으로 검색하므로
+    점수는 코사인 유사도입니다. 인덱스 파일과 ID/메타데이터 파일을 함께 저장하며,
+    불러올 때는 가능한 경우 메모리 매핑(읽기 전용)으로 열고, 청크를 추가할 때 처음 한 번
+    인덱스를 메모리로 복사하여 쓰기 가능한 인덱스로 바꿉니다.
+
+    HNSW 인덱스는 벡터 삭제를 지원하지 않으므로 삭제는 위치를 기록해 두는
+    톰스톤 방식으로 처리하고, 검색 시 삭제된 위치를 건너뜁니다.
+    """
+
+    INDEX_FILE = "index.faiss"
+    METADATA_FILE = "metadata.json"
+
+    def __init__(
+        self,
+        index,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+        index_type: str,
+        collection: Optional[str] = None,
+        deleted: Sequence[int] = (),
+        mmapped: bool = False,
+        build_settings: Optional[Dict] = None,
+    ):
+        self.index = index
+        # 인덱스를 만들 때 요청한 설정 (IVF-PQ가 flat으로 대체되어도 요청한 값을 기록)
+        self.build_settings = build_settings or index_build_settings(index_type)
+        # 메모리 매핑으로 연 읽기 전용 인덱스인지 여부
+        self.mmapped = mmapped
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.index_type = index_type
+        self.collection = collection
+        self.deleted = set(deleted)
+        self._positions = {
+            chunk_id: i for i, chunk_id in enumerate(self.ids) if i not in self.deleted
+        }
+        self._configure_search()
+
+    @staticmethod
+    def _require_faiss():
+        if faiss is None:
+            raise ImportError(
+                "FAISS 백엔드를 사용하려면 faiss-cpu가 필요합니다: pip install faiss-cpu"
+            )
+
+    def _configure_search(self):
+        """검색 시 정확도/속도 파라미터를 설정합니다."""
+        if self.index_type == "hnsw":
+            self.index.hnsw.efSearch = settings.FAISS_HNSW_EF_SEARCH
+        elif self.index_type == "ivfpq":
+            faiss.extract_index_ivf(self.index).nprobe = settings.FAISS_IVF_NPROBE
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+        index_type: Optional[str] = None,
+        collection: Optional[str] = None,
+    ) -> "FaissVectorStore":
+        """
+        임베딩으로 FAISS 인덱스를 만듭니다.
+
+        Args:
+            ids (Sequence[str]): 청크 ID 목록
+            embeddings: (청크 수, 차원) 크기의 임베딩 행렬
+            documents (Sequence[str]): 청크 내용 목록
+            metadatas (Sequence[Dict]): 청크 메타데이터 목록
+            index_type (str, optional): "flat", "hnsw", "ivfpq" 중 하나. 기본값은 설정의 FAISS_INDEX_TYPE.
+            collection (str, optional): 원본 ChromaDB 컬렉션 이름
+
+        Returns:
+            FaissVectorStore: 생성된 벡터 저장소
+        """
+        cls._require_faiss()
+        if index_type is None:
+            index_type = settings.FAISS_INDEX_TYPE
+        build_settings = index_build_settings(index_type)
+
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError("임베딩 행렬의 크기가 ID 수와 일치하지 않습니다.")
+        count, dim = matrix.shape
+        if count:
+            faiss.normalize_L2(matrix)
+
+        if index_type == "ivfpq":
+            # IVF 클러스터당 약 39개, PQ 코드북 학습에 2^nbits개 이상의 벡터가 필요합니다
+            nlist = min(settings.FAISS_IVF_NLIST, count // 39)
+            if nlist < 1 or count < 2**settings.FAISS_PQ_NBITS or dim % settings.FAISS_PQ_M:
+                print(f"벡터 수({count})가 IVF-PQ 학습에 부족하여 flat 인덱스를 사용합니다.")
+                index_type = "flat"
+
+        if index_type == "flat":
+            index = faiss.IndexFlatIP(dim)
+        elif index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, settings.FAISS_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = settings.FAISS_HNSW_EF_CONSTRUCTION
+        elif index_type == "ivfpq":
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(
+                quantizer,
+                dim,
+                nlist,
+                settings.FAISS_PQ_M,
+                settings.FAISS_PQ_NBITS,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            index.train(matrix)
+        else:
+            raise ValueError(f"지원하지 않는 FAISS 인덱스 종류입니다: {index_type}")
+
+        if count:
+            index.add(matrix)
+
+        return cls(
+            index,
+            ids,
+            documents,
+            metadatas,
+            index_type,
+            collection,
+            build_settings=build_settings,
+        )
+
+    def count(self) -> int:
+        return len(self._positions)
+
+    def _ensure_writable(self):
+        """메모리 매핑된 읽기 전용 인덱스이면 메모리로 복사하여 쓰기 가능한 인덱스로 바꿉니다."""
+        if self.mmapped:
+            self.index = faiss.clone_index(self.index)
+            self.mmapped = False
+            self._configure_search()
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ):
+        """
+        새 청크를 인덱스에 추가합니다.
+
+        Args:
+            ids (Sequence[str]): 청크 ID 목록
+            embeddings: (청크 수, 차원) 크기의 임베딩 행렬
+            documents (Sequence[str]): 청크 내용 목록
+            metadatas (Sequence[Dict]): 청크 메타데이터 목록
+        """
+        for chunk_id in ids:
+            if chunk_id in self._positions:
+                raise ValueError(f"이미 존재하는 ID입니다: {chunk_id}")
+
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError("임베딩 행렬의 크기가 ID 수와 일치하지 않습니다.")
+        if not len(ids):
+            return
+
+        faiss.normalize_L2(matrix)
+        self._ensure_writable()
+        self.index.add(matrix)
+        for chunk_id in ids:
+            self._positions[chunk_id] = len(self.ids)
+            self.ids.append(chunk_id)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ):
+        """같은 ID의 청크를 지운 뒤 다시 추가합니다."""
+        self.delete(ids)
+        self.add(ids, embeddings, documents, metadatas)
+
+    def delete(self, ids: Sequence[str]):
+        """
+        ID에 해당하는 청크를 삭제된 것으로 표시합니다. 없는 ID는 무시합니다.
+
+        Args:
+            ids (Sequence[str]): 삭제할 청크 ID 목록
+        """
+        for chunk_id in ids:
+            position = self._positions.pop(chunk_id, None)
+            if position is not None:
+                self.deleted.add(position)
+
+    def query(self, query_embedding: Sequence[float], top_k: int = 3) -> List[Dict]:
+        """
+        쿼리 임베딩과 가장 유사한 청크 top_k개를 반환합니다.
+
+        Args:
+            query_embedding (Sequence[float]): 쿼리 임베딩
+            top_k (int, optional): 반환할 청크 수. 기본값은 3.
+
+        Returns:
+            List[Dict]: 유사도 내림차순으로 정렬된 청크 목록 (score: 코사인 유사도)
+        """
+        return self.query_batch([query_embedding], top_k)[0]
+
+    def query_batch(self, query_embeddings, top_k: int = 3) -> List[List[Dict]]:
+        """
+        여러 쿼리 임베딩을 한 번의 FAISS 검색으로 처리합니다.
+
+        Args:
+            query_embeddings: (쿼리 수, 차원) 크기의 쿼리 임베딩
+            top_k (int, optional): 쿼리마다 반환할 청크 수. 기본값은 3.
+
+        Returns:
+            List[List[Dict]]: 쿼리별 청크 목록
+        """
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        if not self._positions:
+            return [[] for _ in range(len(queries))]
+
+        faiss.normalize_L2(queries)
+        # 삭제된 위치가 결과에 섞일 수 있으므로 그만큼 더 가져온 뒤 걸러냄
+        search_k = min(top_k + len(self.deleted), self.index.ntotal)
+        scores, positions = self.index.search(queries, search_k)
+
+        batches = []
+        for row_scores, row_positions in zip(scores, positions):
+            chunks = []
+            for score, position in zip(row_scores, row_positions):
+                # 결과가 search_k보다 적으면 -1로 채워집니다
+                if position < 0 or position in self.deleted:
+                    continue
+                chunks.append(self._to_chunk(int(position), float(score)))
+                if len(chunks) == top_k:
+                    break
+            batches.append(chunks)
+        return batches
+
+    def _to_chunk(self, position: int, score: float) -> Dict:
+        metadata = self.metadatas[position] or {}
+        return {
+            "id": self.ids[position],
+            "title": metadata.get("title", "제목 없음"),
+            "content": self.documents[position],
+            "source": metadata.get("source", "출처 미상"),
+            "heading_path": metadata.get("heading_path"),
+            "token_count": metadata.get("token_count"),
+            "score": score,
+        }
+
+    def save(self, directory: str):
+        """
+        인덱스 파일과 ID/메타데이터 파일을 디렉토리에 저장합니다.
+
+        Args:
+            directory (str): 저장할 디렉토리
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        index_path = os.path.join(directory, self.INDEX_FILE)
+        faiss.write_index(self.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+
+        metadata_path = os.path.join(directory, self.METADATA_FILE)
+        with open(metadata_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "collection": self.collection,
+                    "index_type": self.index_type,
+                    "build_settings": self.build_settings,
+                    "ids": self.ids,
+                    "documents": self.documents,
+                    "metadatas": self.metadatas,
+                    "deleted": sorted(self.deleted),
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(metadata_path + ".tmp", metadata_path)
+
+    @classmethod
+    def load(cls, directory: str) -> "FaissVectorStore":
+        """
+        save로 저장한 벡터 저장소를 불러옵니다. 인덱스는 가능한 경우 메모리 매핑으로 엽니다.
+
+        Args:
+            directory (str): 저장된 디렉토리
+
+        Returns:
+            FaissVectorStore: 불러온 벡터 저장소
+        """
+        cls._require_faiss()
+        with open(os.path.join(directory, cls.METADATA_FILE), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        index_path = os.path.join(directory, cls.INDEX_FILE)
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(index_path)
+        try:
+            index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            mmapped = True
+        except RuntimeError:
+            # 메모리 매핑을 지원하지 않는 인덱스 종류는 일반 방식으로 로드
+            index = faiss.read_index(index_path)
+            mmapped = False
+
+        return cls(
+            index,
+            metadata["ids"],
+            metadata["documents"],
+            metadata["metadatas"],
+            metadata["index_type"],
+            collection=metadata.get("collection"),
+            deleted=metadata.get("deleted", ()),
+            mmapped=mmapped,
+            # 이전 버전에서 저장한 파일은 설정을 알 수 없으므로 다시 만들도록 함
+            build_settings=metadata.get("build_settings", {"index_type": None}),
+        )
+
+    @classmethod
+    def from_collection(cls, collection, index_type: Optional[str] = None) -> "FaissVectorStore":
+        """
+        ChromaDB 컬렉션에 저장된 임베딩과 메타데이터로 FAISS 인덱스를 만듭니다.
+
+        Args:
+            collection (chromadb.Collection): 원본 컬렉션
+            index_type (str, optional): 인덱스 종류. 기본값은 설정의 FAISS_INDEX_TYPE.
+
+        Returns:
+            FaissVectorStore: 생성된 벡터 저장소
+        """
+        records = collection.get(include=["embeddings", "documents", "metadatas"])
+        embeddings = records["embeddings"]
+        if embeddings is None or len(embeddings) == 0:
+            embeddings = np.zeros((0, 1), dtype=np.float32)
+
+        return cls.build(
+            records["ids"],
+            embeddings,
+            records["documents"],
+            records["metadatas"],
+            index_type=index_type,
+            collection=collection.name,
+        )
+
+
+# 전역 FAISS 벡터 저장소 (서빙 컬렉션이 바뀌면 다시 로드)
+_faiss_store: Optional[FaissVectorStore] = None
+_faiss_store_lock = threading.Lock()
+
+
+def get_faiss_store(collection) -> FaissVectorStore:
+    """
+    서빙 중인 컬렉션과 같은 데이터의 FAISS 벡터 저장소를 반환합니다.
+
+    디스크(FAISS_INDEX_DIR)에 같은 컬렉션과 같은 인덱스 설정(index_build_settings)으로 만든
+    인덱스가 있으면 불러오고, 없거나 컬렉션 또는 설정이 다르면 컬렉션에서 임베딩을 내보내
+    인덱스를 만들고 저장합니다.
+
+    Args:
+        collection (chromadb.Collection): 서빙 중인 ChromaDB 컬렉션
+
+    Returns:
+        FaissVectorStore: FAISS 벡터 저장소
+    """
+    global _faiss_store
+
+    def is_current(store: Optional[FaissVectorStore]) -> bool:
+        return (
+            store is not None
+            and store.collection == collection.name
+            and store.build_settings == index_build_settings()
+        )
+
+    store = _faiss_store
+    if is_current(store):
+        return store
+
+    with _faiss_store_lock:
+        store = _faiss_store
+        if is_current(store):
+            return store
+
+        store = None
+        try:
+            store = FaissVectorStore.load(settings.FAISS_INDEX_DIR)
+        except FileNotFoundError:
+            pass
+
+        if not is_current(store):
+            print(f"FAISS 인덱스를 컬렉션 {collection.name}에서 생성합니다...")
+            store = FaissVectorStore.from_collection(collection)
+            store.save(settings.FAISS_INDEX_DIR)
+            store = FaissVectorStore.load(settings.FAISS_INDEX_DIR)
+
+        _faiss_store = store
+        return store
@@ -0,0 +1,164 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class ReindexCancelled(Exception):
+    """재색인 작업이 취소되었을 때 발생하는 예외"""
+
+
+class ReindexJob:
+    """
+    백그라운드 재색인 작업의 상태와 진행 상황
+
+    파이프라인 각 단계는 add()로 진행 카운터를 올리고, 단계 사이마다 check_cancelled()를
+    호출하여 취소 요청을 확인합니다.
+    """
+
+    def __init__(self, full_rebuild: bool = False):
+        self.id = uuid.uuid4().hex
+        self.full_rebuild = full_rebuild
+        self.status = "pending"
+        self.stage = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        # 진행 카운터
+        self.files_parsed = 0
+        self.files_skipped = 0
+        self.chunks_total = 0
+        self.chunks_reused = 0
+        self.chunks_embedded = 0
+        self.tokens_spent = 0
+
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def add(self, **counters: int):
+        """
+        진행 카운터를 증가시킵니다. (예: job.add(files_parsed=1))
+        """
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def set_stage(self, stage: str):
+        """현재 진행 단계를 기록하고 취소 요청을 확인합니다."""
+        self.stage = stage
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        """취소가 요청되었으면 ReindexCancelled를 발생시킵니다."""
+        if self._cancel_event.is_set():
+            raise ReindexCancelled("재색인 작업이 취소되었습니다.")
+
+    def cancel(self):
+        """작업 취소를 요청합니다. 진행 중인 배치가 끝난 뒤 중단됩니다."""
+        self._cancel_event.set()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "full_rebuild": self.full_rebuild,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "cancel_requested": self._cancel_event.is_set(),
+            "progress": {
+                "files_parsed": self.files_parsed,
+                "files_skipped": self.files_skipped,
+                "chunks_total": self.chunks_total,
+                "chunks_reused": self.chunks_reused,
+                "chunks_embedded": self.chunks_embedded,
+                "tokens_spent": self.tokens_spent,
+            },
+        }
+
+
+# 최근 작업 목록 (오래된 것부터 제거)
+MAX_JOB_HISTORY = 20
+_jobs: "OrderedDict[str, ReindexJob]" = OrderedDict()
+_active_job: Optional[ReindexJob] = None
+_jobs_lock = threading.Lock()
+
+
+def _run_job(job: ReindexJob):
+    global _active_job
+    from app.services.rag import rebuild_vector_store
+
+    job.status = "running"
+    job.started_at = time.time()
+    try:
+        rebuild_vector_store(full_rebuild=job.full_rebuild, progress=job)
+        job.stage = "done"
+        job.status = "succeeded"
+    except ReindexCancelled:
+        job.status = "cancelled"
+        print(f"재색인 작업이 취소되었습니다: {job.id}")
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        print(f"재색인 작업 중 오류 발생: {str(e)}")
+    finally:
+        job.finished_at = time.time()
+        with _jobs_lock:
+            if _active_job is job:
+                _active_job = None
+
+
+def start_reindex_job(full_rebuild: bool = False) -> ReindexJob:
+    """
+    재색인 작업을 백그라운드 스레드에서 시작합니다. 한 번에 하나의 작업만 실행됩니다.
+
+    Args:
+        full_rebuild (bool, optional): 모든 문서를 다시 청킹하고 색인할지 여부.
+            임베딩 캐시에 있는 텍스트는 다시 요청하지 않습니다. 기본값은 False.
+
+    Returns:
+        ReindexJob: 시작된 작업
+
+    Raises:
+        RuntimeError: 이미 실행 중인 재색인 작업이 있는 경우
+    """
+    global _active_job
+    with _jobs_lock:
+        if _active_job is not None:
+            raise RuntimeError(f"이미 실행 중인 재색인 작업이 있습니다: {_active_job.id}")
+
+        job = ReindexJob(full_rebuild=full_rebuild)
+        _active_job = job
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_JOB_HISTORY:
+            _jobs.popitem(last=False)
+
+    threading.Thread(target=_run_job, args=(job,), daemon=True, name=f"reindex-{job.id}").start()
+    return job
+
+
+def get_reindex_job(job_id: str) -> Optional[ReindexJob]:
+    """
+    작업 ID로 재색인 작업을 찾습니다.
+
+    Args:
+        job_id (str): 작업 ID
+
+    Returns:
+        Optional[ReindexJob]: 작업 (없으면 None)
+    """
+    return _jobs.get(job_id)
+
+
+def get_active_reindex_job() -> Optional[ReindexJob]:
+    """실행 중인 재색인 작업을 반환합니다. 없으면 None을 반환합니다."""
+    return _active_job
@@ -1,11 +1,21 @@
 import glob
+import hashlib
+import json
+import multiprocessing
 import os
 import re
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import nbformat
 
 from app.core.config import settings
+from app.core.utils import count_tokens, token_encoding_name
+from app.services.document_manifest import (DocumentChangePlan,
+                                            DocumentManifest, file_sha256)
+
+# 청킹 규칙(분할 기준, 제목 처리 등)을 바꾸면 올려서 기존 매니페스트의 청크를 다시 만들게 함
+CHUNKER_VERSION = 1
 
 
 def extract_markdown_from_notebook(notebook_path: str) -> str:
@@ -18,10 +28,23 @@ def extract_markdown_from_notebook(notebook_path: str) -> str:
     Returns:
         str: 추출된 마크다운 내용
     """
-    notebook = nbformat.read(notebook_path, as_version=4)
-    markdown_cells = [
-        cell["source"] for cell in notebook.cells if cell["cell_type"] == "markdown"
-    ]
+    # 스키마 검증 없이 JSON에서 마크다운 셀만 바로 읽음
+    with open(notebook_path, "r", encoding="utf-8") as f:
+        notebook = json.load(f)
+
+    cells = notebook.get("cells") if isinstance(notebook, dict) else None
+    if not isinstance(cells, list):
+        # nbformat 4 미만 등 예상과 다른 구조는 nbformat으로 변환하여 읽음
+        notebook = nbformat.read(notebook_path, as_version=4)
+        cells = notebook.cells
+
+    markdown_cells = []
+    for cell in cells:
+        if cell.get("cell_type") != "markdown":
+            continue
+        source = cell.get("source", "")
+        # 노트북 파일에서 source는 문자열 또는 줄 단위 문자열 목록
+        markdown_cells.append(source if isinstance(source, str) else "".join(source))
     return "\n\n".join(markdown_cells)
 
 
@@ -39,51 +62,508 @@ def read_markdown_file(file_path: str) -> str:
         return f.read()
 
 
-def combine_markdown_documents(directory_path: str) -> str:
+def list_document_files(directory_path: str) -> List[str]:
     """
-    지정된 디렉토리에서 모든 노트북 파일과 마크다운 파일을 찾아 내용을 추출하고 합침
+    디렉토리에서 처리할 노트북 파일과 마크다운 파일 목록을 반환합니다. (노트북 파일 먼저)
 
     Args:
         directory_path (str): 파일들이 있는 디렉토리 경로
 
     Returns:
-        str: 합쳐진 마크다운 내용
+        List[str]: 파일 경로 목록
     """
-    # 노트북 파일과 마크다운 파일 목록 가져오기
     notebook_files = glob.glob(os.path.join(directory_path, "*.ipynb"))
     markdown_files = glob.glob(os.path.join(directory_path, "*.md")) + glob.glob(
         os.path.join(directory_path, "*.markdown")
     )
+    return notebook_files + markdown_files
 
-    combined_markdown = ""
 
-    # 노트북 파일 처리
-    for notebook_file in notebook_files:
-        print(f"Processing notebook: {notebook_file}")
-        markdown_content = extract_markdown_from_notebook(notebook_file)
+def read_document(file_path: str) -> str:
+    """
+    노트북 파일이면 마크다운 셀을, 마크다운 파일이면 파일 내용을 읽어 반환합니다.
 
-        # 각 문서 사이에 구분자 추가
-        if combined_markdown:
-            combined_markdown += f"\n\n## 문서: {os.path.basename(notebook_file)}\n\n"
-        else:
-            combined_markdown += f"## 문서: {os.path.basename(notebook_file)}\n\n"
+    Args:
+        file_path (str): 파일 경로
+
+    Returns:
+        str: 마크다운 내용
+    """
+    if file_path.endswith(".ipynb"):
+        return extract_markdown_from_notebook(file_path)
+    return read_markdown_file(file_path)
+
+
+def parse_document(file_path: str) -> Tuple[str, str, List[Dict[str, str]]]:
+    """
+    파일 하나를 읽고 청킹합니다. 프로세스 풀의 작업 단위입니다.
+
+    Args:
+        file_path (str): 파일 경로
+
+    Returns:
+        Tuple[str, str, List[Dict[str, str]]]: 원본 파일 이름, 마크다운 내용, 청크 목록
+    """
+    source = os.path.basename(file_path)
+    markdown_content = read_document(file_path)
+    return source, markdown_content, list(chunk_document(markdown_content, source))
+
+
+def _parse_worker_count(num_files: int, workers: Optional[int] = None) -> int:
+    if workers is None:
+        workers = settings.DOCUMENT_PARSE_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, num_files))
+
+
+def iter_parsed_documents(
+    directory_path: str, progress=None, workers: Optional[int] = None
+) -> Iterator[Tuple[str, str, List[Dict[str, str]]]]:
+    """
+    디렉토리의 문서를 프로세스 풀에서 병렬로 읽고 청킹하여, 파일 목록 순서대로 반환하는 제너레이터
+
+    Args:
+        directory_path (str): 파일들이 있는 디렉토리 경로
+        progress (ReindexJob, optional): 처리한 파일 수를 기록할 작업 객체
+        workers (int, optional): 프로세스 수. 기본값은 settings.DOCUMENT_PARSE_WORKERS.
+
+    Yields:
+        Tuple[str, str, List[Dict[str, str]]]: 원본 파일 이름, 마크다운 내용, 청크 목록
+    """
+    yield from _iter_parsed_files(list_document_files(directory_path), progress, workers)
+
+
+def _iter_parsed_files(
+    file_paths: List[str], progress=None, workers: Optional[int] = None
+) -> Iterator[Tuple[str, str, List[Dict[str, str]]]]:
+    workers = _parse_worker_count(len(file_paths), workers)
+
+    executor = None
+    if workers > 1:
+        # 서버의 재색인 작업은 스레드에서 실행되므로 fork 대신 forkserver/spawn으로 프로세스 생성
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        print(f"{len(file_paths)}개 파일을 {workers}개 프로세스로 처리합니다.")
+        # map은 완료 순서와 관계없이 입력 순서대로 결과를 반환
+        results = executor.map(parse_document, file_paths)
+    else:
+        results = map(parse_document, file_paths)
+
+    try:
+        for file_path, result in zip(file_paths, results):
+            kind = "notebook" if file_path.endswith(".ipynb") else "markdown"
+            print(f"Processing {kind}: {file_path}")
+
+            yield result
+
+            if progress is not None:
+                progress.add(files_parsed=1)
+                progress.check_cancelled()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def iter_documents(directory_path: str, progress=None) -> Iterator[Tuple[str, str]]:
+    """
+    디렉토리의 문서를 읽어 (파일 이름, 마크다운 내용)을 순서대로 반환하는 제너레이터
 
-        combined_markdown += markdown_content
+    Args:
+        directory_path (str): 파일들이 있는 디렉토리 경로
+        progress (ReindexJob, optional): 처리한 파일 수를 기록할 작업 객체
 
-    # 마크다운 파일 처리
-    for markdown_file in markdown_files:
-        print(f"Processing markdown: {markdown_file}")
-        markdown_content = read_markdown_file(markdown_file)
+    Yields:
+        Tuple[str, str]: 원본 파일 이름과 마크다운 내용
+    """
+    for file_path in list_document_files(directory_path):
+        kind = "notebook" if file_path.endswith(".ipynb") else "markdown"
+        print(f"Processing {kind}: {file_path}")
+
+        yield os.path.basename(file_path), read_document(file_path)
+
+        if progress is not None:
+            progress.add(files_parsed=1)
+            progress.check_cancelled()
+
+
+def combine_markdown_documents(directory_path: str, progress=None) -> str:
+    """
+    지정된 디렉토리에서 모든 노트북 파일과 마크다운 파일을 찾아 내용을 추출하고 합침
+
+    색인 파이프라인은 파일 단위로 처리(iter_document_chunks)하므로 이 함수를 사용하지 않으며,
+    합쳐진 문서를 직접 확인할 때만 사용합니다.
+
+    Args:
+        directory_path (str): 파일들이 있는 디렉토리 경로
+        progress (ReindexJob, optional): 처리한 파일 수를 기록할 작업 객체
+
+    Returns:
+        str: 합쳐진 마크다운 내용
+    """
+    return "\n\n".join(
+        document_header(source) + markdown_content
+        for source, markdown_content in iter_documents(directory_path, progress)
+    )
+
+
+def document_header(source: str, heading_level: str = "##") -> str:
+    """
+    문서 내용 앞에 붙는 "문서: 파일명" 구분 헤딩을 반환합니다.
+    이 헤딩은 문서 첫 청크(첫 헤딩 이전 내용)의 제목이 됩니다.
+
+    Args:
+        source (str): 원본 파일 이름
+        heading_level (str, optional): 청킹 기준 헤딩 레벨. 기본값은 '##'.
+
+    Returns:
+        str: 구분 헤딩 문자열
+    """
+    return f"{heading_level} 문서: {source}\n\n"
+
+
+def make_chunk_id(source: str, heading_path: List[str], content: str) -> str:
+    """
+    청크의 안정적인 ID를 만듭니다.
+
+    원본 파일, 헤딩 경로, 내용 해시로부터 결정되므로 다른 문단을 수정하거나 문서 순서가
+    바뀌어도 내용이 같은 청크의 ID는 바뀌지 않습니다.
+
+    Args:
+        source (str): 청크가 속한 원본 파일 이름
+        heading_path (List[str]): 상위 헤딩부터 청크 제목까지의 헤딩 목록
+        content (str): 청크 내용
+
+    Returns:
+        str: "chunk_" 접두사가 붙은 청크 ID
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    key = "\x1f".join([source, " > ".join(heading_path), content_hash])
+    return "chunk_" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:20]
+
+
+def _make_chunk(
+    heading_path: List[str],
+    lines: List[str],
+    source: str,
+    seen_ids: Set[str],
+) -> Dict[str, str]:
+    """헤딩 경로와 줄 목록으로 청크 딕셔너리를 만듭니다."""
+    content = "\n".join(lines)
+    chunk_id = make_chunk_id(source, heading_path, content)
+
+    # 같은 파일에 제목과 내용이 완전히 같은 청크가 있으면 순번을 붙여 구분
+    base_id, duplicate = chunk_id, 1
+    while chunk_id in seen_ids:
+        duplicate += 1
+        chunk_id = f"{base_id}_{duplicate}"
+    seen_ids.add(chunk_id)
+
+    return {
+        "id": chunk_id,
+        "title": heading_path[-1],
+        "content": content,
+        "source": source,
+        "heading_path": " > ".join(heading_path),
+        "content_hash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        "token_count": count_tokens(content),
+    }
+
+
+def _block_tokens(lines: List[str]) -> int:
+    return count_tokens("\n".join(lines))
+
+
+def _fenced_lines(lines: List[str]) -> List[bool]:
+    """각 줄이 코드 블록(```) 안에 있는지 여부 목록을 반환합니다."""
+    inside, mask = False, []
+    for line in lines:
+        is_fence = line.lstrip().startswith("```")
+        mask.append(inside or is_fence)
+        if is_fence:
+            inside = not inside
+    return mask
+
+
+def _split_paragraphs(lines: List[str]) -> List[List[str]]:
+    """
+    빈 줄을 기준으로 문단을 나눕니다. 표(연속된 '|' 줄)와 코드 블록 안에는 빈 줄이 있어도
+    나누지 않으므로 표와 코드 블록은 항상 한 문단에 온전히 들어갑니다.
+    """
+    paragraphs, current = [], []
+    for line, fenced in zip(lines, _fenced_lines(lines)):
+        if not line.strip() and not fenced:
+            if current:
+                paragraphs.append(current)
+                current = []
+            continue
+        current.append(line)
+    if current:
+        paragraphs.append(current)
+    return paragraphs
+
+
+def _is_table(paragraph: List[str]) -> bool:
+    return any(line.lstrip().startswith("|") for line in paragraph)
+
+
+def _pack_paragraphs(
+    paragraphs: List[List[str]],
+    heading_line: Optional[str],
+    max_tokens: int,
+    overlap_tokens: int,
+) -> List[List[str]]:
+    """
+    문단을 토큰 예산 안에서 순서대로 묶습니다. 두 번째 조각부터는 섹션 헤딩 줄을 앞에 붙이고,
+    overlap_tokens가 있으면 이전 조각의 마지막 문단들을 겹쳐 넣습니다.
+    """
+    # 두 번째 조각부터 붙는 헤딩 줄과 문단 사이 빈 줄만큼 예산을 남겨 둠
+    if heading_line:
+        max_tokens = max(1, max_tokens - count_tokens(heading_line) - 1)
+
+    # 예산을 넘는 문단은 줄 단위로 나눔 (표와 코드 블록은 나누지 않음)
+    units: List[List[str]] = []
+    for paragraph in paragraphs:
+        if _block_tokens(paragraph) <= max_tokens or _is_table(paragraph) or any(
+            _fenced_lines(paragraph)
+        ):
+            units.append(paragraph)
+            continue
+        current: List[str] = []
+        for line in paragraph:
+            if current and _block_tokens(current + [line]) > max_tokens:
+                units.append(current)
+                current = []
+            current.append(line)
+        if current:
+            units.append(current)
+
+    pieces: List[List[List[str]]] = []
+    current, current_tokens = [], 0
+    for unit in units:
+        unit_tokens = _block_tokens(unit) + 1
+        # 헤딩 줄만 있는 조각은 내보내지 않고 다음 문단과 함께 둠
+        heading_only = all(len(u) == 1 and u[0].startswith("#") for u in current)
+        if current and not heading_only and current_tokens + unit_tokens > max_tokens:
+            pieces.append(current)
+            # 겹치기: 이전 조각 끝의 문단을 overlap_tokens 안에서 가져옴
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                previous_tokens = _block_tokens(previous) + 1
+                if carried_tokens + previous_tokens > overlap_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous_tokens
+            # 겹친 문단 때문에 예산을 넘으면 앞에서부터 덜어냄
+            while carried and carried_tokens + unit_tokens > max_tokens:
+                carried_tokens -= _block_tokens(carried.pop(0)) + 1
+            current, current_tokens = carried, carried_tokens
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        pieces.append(current)
+
+    results = []
+    for i, piece in enumerate(pieces):
+        lines = [line for j, unit in enumerate(piece) for line in ([""] if j else []) + unit]
+        if i and heading_line and lines[0] != heading_line:
+            lines = [heading_line, ""] + lines
+        results.append(lines)
+    return results
+
+
+def _split_section(
+    lines: List[str],
+    heading_path: List[str],
+    level: int,
+    max_tokens: int,
+    overlap_tokens: int,
+) -> List[Tuple[List[str], List[str]]]:
+    """
+    토큰 예산을 넘는 섹션을 하위 헤딩(level+1 ~ '######'), 없으면 문단 기준으로 재귀적으로 나눕니다.
+    나눈 뒤 예산 안에 들어가는 인접 조각은 다시 합치며, 합친 조각의 헤딩 경로는 공통 상위 경로입니다.
 
-        # 각 문서 사이에 구분자 추가
-        if combined_markdown:
-            combined_markdown += f"\n\n## 문서: {os.path.basename(markdown_file)}\n\n"
+    Returns:
+        List[Tuple[List[str], List[str]]]: (헤딩 경로, 줄 목록) 목록
+    """
+    if max_tokens <= 0 or _block_tokens(lines) <= max_tokens:
+        return [(heading_path, lines)]
+
+    fenced = _fenced_lines(lines)
+    heading_line = lines[0] if lines and lines[0].startswith("#") else None
+
+    for sub_level in range(level + 1, 7):
+        prefix = "#" * sub_level + " "
+        starts = [
+            i
+            for i, line in enumerate(lines)
+            if i and line.startswith(prefix) and not fenced[i]
+        ]
+        if not starts:
+            continue
+
+        # 첫 하위 헤딩 이전 부분(섹션 헤딩과 도입부)과 하위 섹션들
+        intro = lines[: starts[0]]
+        if _block_tokens(intro) > max_tokens:
+            intro_pieces = _pack_paragraphs(
+                _split_paragraphs(intro), heading_line, max_tokens, overlap_tokens
+            )
         else:
-            combined_markdown += f"## 문서: {os.path.basename(markdown_file)}\n\n"
+            intro_pieces = [intro]
+        parts = [(heading_path, piece) for piece in intro_pieces]
+        for start, end in zip(starts, starts[1:] + [len(lines)]):
+            title = lines[start][len(prefix) :].strip()
+            parts.extend(
+                _split_section(
+                    lines[start:end],
+                    heading_path + [title],
+                    sub_level,
+                    max_tokens,
+                    overlap_tokens,
+                )
+            )
+        return _merge_pieces(parts, max_tokens)
+
+    paragraphs = _split_paragraphs(lines)
+    return [
+        (heading_path, piece)
+        for piece in _pack_paragraphs(paragraphs, heading_line, max_tokens, overlap_tokens)
+    ]
+
+
+def _merge_pieces(
+    pieces: List[Tuple[List[str], List[str]]], max_tokens: int
+) -> List[Tuple[List[str], List[str]]]:
+    """인접한 작은 조각을 토큰 예산 안에서 합칩니다. 내용 없는 헤딩만 있는 조각은 다음 조각에 붙입니다."""
+    merged: List[Tuple[List[str], List[str]]] = []
+    for path, lines in pieces:
+        if merged:
+            previous_path, previous_lines = merged[-1]
+            heading_only = previous_lines[0].startswith("#") and not any(
+                line.strip() for line in previous_lines[1:]
+            )
+            if heading_only or _block_tokens(previous_lines + lines) <= max_tokens:
+                common = []
+                for a, b in zip(previous_path, path):
+                    if a != b:
+                        break
+                    common.append(a)
+                merged[-1] = (common or previous_path, previous_lines + lines)
+                continue
+        merged.append((path, lines))
+    return merged
+
+
+def _iter_heading_chunks(
+    lines: Iterable[str],
+    heading_level: str,
+    source: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+) -> Iterator[Dict[str, str]]:
+    """
+    줄 단위로 읽으면서 청킹 기준 헤딩을 만날 때마다 이전 섹션을 청크로 반환하는 제너레이터
+    토큰 예산(max_tokens)을 넘는 섹션은 하위 헤딩과 문단 기준으로 나눕니다.
+
+    "문서: 파일명" 구분 헤딩을 만나면 이후 청크의 원본 파일을 바꾸고 상위 헤딩을 초기화합니다.
+    첫 청킹 기준 헤딩 이전의 줄은 버립니다.
+    """
+    if max_tokens is None:
+        max_tokens = settings.CHUNK_MAX_TOKENS
+    if overlap_tokens is None:
+        overlap_tokens = settings.CHUNK_OVERLAP_TOKENS
+
+    def section_chunks(title, parent, buffer):
+        heading_path = [h for h in (parent, title) if h]
+        for path, piece in _split_section(
+            buffer, heading_path, len(heading_level), max_tokens, overlap_tokens
+        ):
+            yield _make_chunk(path, piece, source, seen_ids)
+
+    # 헤딩 레벨에 맞는 정규식 패턴 생성
+    pattern = re.compile(f"^{heading_level} .*$")
+    # 청킹 기준보다 상위 레벨의 헤딩 (예: '##' 기준이면 '#')
+    parent_pattern = (
+        re.compile(f"^#{{1,{len(heading_level) - 1}}} .*$") if len(heading_level) > 1 else None
+    )
+
+    seen_ids: Set[str] = set()
+    current_parent = None
+    title, parent, buffer = None, None, []
+
+    for line in lines:
+        if pattern.match(line):
+            if title is not None:
+                yield from section_chunks(title, parent, buffer)
+
+            title = line.replace(heading_level + " ", "")
+            # 문서 구분 헤딩이면 이후 청크의 원본 파일을 갱신하고 이전 문서의 상위 헤딩은 버림
+            if title.startswith("문서: "):
+                source = title[len("문서: ") :].strip()
+                current_parent = None
+            parent, buffer = current_parent, [line]
+            continue
+
+        if parent_pattern and parent_pattern.match(line):
+            current_parent = line.lstrip("#").strip()
+        if title is not None:
+            buffer.append(line)
+
+    if title is not None:
+        yield from section_chunks(title, parent, buffer)
+
+
+def chunk_document(
+    markdown_text: str,
+    source: str,
+    heading_level: str = "##",
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+) -> Iterator[Dict[str, str]]:
+    """
+    문서 하나를 지정된 헤딩 레벨('##')을 기준으로 청킹하는 제너레이터
+
+    문서 앞에 "문서: 파일명" 구분 헤딩을 붙이므로 첫 헤딩 이전 내용도 하나의 청크가 되며,
+    모든 청크에 원본 파일(source)과 헤딩 경로가 기록됩니다. 토큰 예산을 넘는 섹션은
+    하위 헤딩('###' 이하), 문단 순으로 나누며 표와 코드 블록은 나누지 않습니다.
+
+    Args:
+        markdown_text (str): 문서의 마크다운 내용
+        source (str): 원본 파일 이름
+        heading_level (str, optional): 청킹 기준이 되는 헤딩 레벨. 기본값은 '##'.
+        max_tokens (int, optional): 청크당 최대 토큰 수 (0이면 나누지 않음).
+            기본값은 settings.CHUNK_MAX_TOKENS.
+        overlap_tokens (int, optional): 문단 단위로 나눌 때 이전 청크와 겹칠 최대 토큰 수.
+            기본값은 settings.CHUNK_OVERLAP_TOKENS.
+
+    Yields:
+        Dict[str, str]: {'id', 'title', 'content', 'source', 'heading_path', 'content_hash',
+            'token_count'}
+    """
+    text = document_header(source, heading_level) + markdown_text
+    yield from _iter_heading_chunks(
+        text.split("\n"), heading_level, source, max_tokens, overlap_tokens
+    )
+
+
+def iter_document_chunks(directory_path: str, progress=None) -> Iterator[Dict[str, str]]:
+    """
+    디렉토리의 문서를 파일 단위로 읽고 청킹하여 청크를 하나씩 반환하는 제너레이터
+    (파일 → 헤딩 섹션 → 청크). 전체 문서를 하나의 문자열로 합치지 않으며,
+    파일은 프로세스 풀에서 병렬로 처리하되 청크는 파일 목록 순서대로 반환합니다.
 
-        combined_markdown += markdown_content
+    Args:
+        directory_path (str): 파일들이 있는 디렉토리 경로
+        progress (ReindexJob, optional): 처리한 파일 수를 기록할 작업 객체
 
-    return combined_markdown
+    Yields:
+        Dict[str, str]: 청크 딕셔너리
+    """
+    for _, _, chunks in iter_parsed_documents(directory_path, progress):
+        yield from chunks
 
 
 def chunk_by_heading(
@@ -92,62 +572,43 @@ def chunk_by_heading(
     """
     마크다운 텍스트를 지정된 헤딩 레벨('##')을 기준으로 청킹
 
+    combine_markdown_documents로 합친 텍스트라면 "문서: 파일명" 구분 헤딩을 따라가며 각 청크의
+    원본 파일과 헤딩 경로를 기록하고, 이를 바탕으로 안정적인 청크 ID를 부여합니다.
+
     Args:
         markdown_text (str): 마크다운 텍스트
         heading_level (str, optional): 청킹 기준이 되는 헤딩 레벨. 기본값은 '##'.
 
     Returns:
-        List[Dict[str, str]]: 청킹된 내용의 리스트. 각 항목은 {'title': 제목, 'content': 내용} 형태의 딕셔너리.
+        List[Dict[str, str]]: 청킹된 내용의 리스트. 각 항목은
+            {'id', 'title', 'content', 'source', 'heading_path', 'content_hash', 'token_count'}
+            형태의 딕셔너리.
     """
-    # 헤딩 레벨에 맞는 정규식 패턴 생성
-    pattern = f"^{heading_level} .*$"
-
-    # 헤딩으로 시작하는 라인 찾기
-    lines = markdown_text.split("\n")
-    chunk_starts = []
-
-    for i, line in enumerate(lines):
-        if re.match(pattern, line):
-            chunk_starts.append(i)
+    chunks = list(_iter_heading_chunks(markdown_text.split("\n"), heading_level, "출처 미상"))
 
     # 청크가 없는 경우 처리
-    if not chunk_starts:
+    if not chunks:
         print(f"경고: '{heading_level}'로 시작하는 헤딩을 찾을 수 없습니다.")
-        return []
-
-    # 청크 생성
-    chunks = []
-
-    for i, start_idx in enumerate(chunk_starts):
-        # 청크의 제목 (헤딩 라인)
-        title = lines[start_idx].replace(heading_level + " ", "")
-
-        # 청크의 내용
-        if i < len(chunk_starts) - 1:
-            content = "\n".join(lines[start_idx : chunk_starts[i + 1]])
-        else:
-            content = "\n".join(lines[start_idx:])
-
-        chunks.append({"title": title, "content": content, "source": f"chunk_{i+1}"})
 
     return chunks
 
 
 def process_markdown_documents(
-    directory_path: str = None, output_file: str = None
-) -> Tuple[str, List[Dict[str, str]]]:
+    directory_path: str = None, output_file: str = None, progress=None
+) -> List[Dict[str, str]]:
     """
     마크다운 문서를 처리하는 전체 파이프라인:
-    1. 문서 수집 및 결합
-    2. 헤딩 기준으로 청킹
-    3. 파일로 저장
+    1. 문서를 파일 단위로 읽기 (프로세스 풀에서 병렬 처리, 결과는 파일 목록 순서)
+    2. 파일마다 헤딩 기준으로 청킹
+    3. 확인용으로 합친 마크다운을 파일 단위로 이어 쓰기 (전체 문서를 메모리에 합치지 않음)
 
     Args:
         directory_path (str, optional): 노트북 파일들이 있는 디렉토리 경로
         output_file (str, optional): 결합된 마크다운을 저장할 파일 경로.
+        progress (ReindexJob, optional): 진행 상황을 기록할 작업 객체
 
     Returns:
-        Tuple[str, List[Dict[str, str]]]: 결합된 마크다운 텍스트와 청킹된 내용 리스트
+        List[Dict[str, str]]: 청킹된 내용 리스트
     """
     if directory_path is None:
         directory_path = os.path.join(settings.DOCS_DIR, "raw")
@@ -158,18 +619,113 @@ def process_markdown_documents(
     # 출력 디렉토리가 없으면 생성
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-    # 1. 마크다운 문서 결합
-    combined_markdown = combine_markdown_documents(directory_path)
-
-    # 2. 결합된 마크다운 저장
+    chunks = []
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write(combined_markdown)
+        for i, (source, markdown_content, document_chunks) in enumerate(
+            iter_parsed_documents(directory_path, progress)
+        ):
+            # 파일 단위로 이어 씀
+            f.write(("\n\n" if i else "") + document_header(source) + markdown_content)
+            chunks.extend(document_chunks)
 
     print(f"합쳐진 마크다운 저장 완료: {output_file}")
 
-    # 3. 헤딩 기준으로 청킹
-    chunks = chunk_by_heading(combined_markdown)
-
     print(f"총 {len(chunks)}개의 청크로 분할됨")
 
-    return combined_markdown, chunks
+    return chunks
+
+
+def chunking_signature() -> Dict:
+    """
+    청크 구성에 영향을 주는 청킹 설정(청커 버전, 토큰 인코딩, 토큰 한도)을 반환합니다.
+    (문서 매니페스트에 기록)
+
+    Returns:
+        Dict: 청킹 설정
+    """
+    return {
+        "version": CHUNKER_VERSION,
+        "encoding": token_encoding_name(),
+        "max_tokens": settings.CHUNK_MAX_TOKENS,
+        "overlap_tokens": settings.CHUNK_OVERLAP_TOKENS,
+    }
+
+
+def plan_document_changes(
+    directory_path: str = None, manifest: DocumentManifest = None, progress=None
+) -> DocumentChangePlan:
+    """
+    매니페스트와 비교하여 추가되거나 바뀐 파일만 읽고 청킹한 뒤, 벡터 저장소 변경 계획을 만듭니다.
+
+    크기와 수정 시각이 기록과 같은 파일은 읽지 않고, 다르더라도 내용 해시가 같으면 기존 청크를
+    그대로 사용합니다. 매니페스트는 이번 처리 결과로 갱신되며(저장은 호출한 쪽에서 색인에
+    성공한 뒤 수행), 빈 매니페스트를 넘기면 모든 파일을 처리합니다.
+
+    Args:
+        directory_path (str, optional): 원본 문서 디렉토리. 기본값은 DOCS_DIR/raw.
+        manifest (DocumentManifest, optional): 마지막 색인의 매니페스트. 기본값은 빈 매니페스트.
+        progress (ReindexJob, optional): 진행 상황을 기록할 작업 객체
+
+    Returns:
+        DocumentChangePlan: 파일별 변경 내용과 새 청크, 유지/삭제할 청크 ID
+    """
+    if directory_path is None:
+        directory_path = os.path.join(settings.DOCS_DIR, "raw")
+    if manifest is None:
+        manifest = DocumentManifest()
+
+    plan = DocumentChangePlan(manifest)
+
+    # 청킹 설정이 바뀌었으면 모든 파일을 다시 청킹
+    signature = chunking_signature()
+    rechunk_all = bool(manifest.files) and manifest.chunking != signature
+    if rechunk_all:
+        print("청킹 설정이 바뀌어 모든 파일을 다시 청킹합니다.")
+    manifest.chunking = signature
+
+    previous_ids = {name: entry["chunk_ids"] for name, entry in manifest.files.items()}
+
+    # 1. 파일 목록을 매니페스트와 비교 (크기/수정 시각 -> 내용 해시 순으로 확인)
+    changed_paths, fingerprints = [], {}
+    current_names = set()
+    for file_path in list_document_files(directory_path):
+        name = os.path.basename(file_path)
+        current_names.add(name)
+        stat = os.stat(file_path)
+
+        entry = None if rechunk_all else manifest.lookup(name, stat)
+        sha256 = None
+        if entry is None and not rechunk_all:
+            sha256 = file_sha256(file_path)
+            previous = manifest.files.get(name)
+            if previous is not None and previous["sha256"] == sha256:
+                # 수정 시각만 바뀐 파일: 다음 비교를 위해 stat만 갱신
+                manifest.record(name, stat, sha256, previous["chunk_ids"])
+                entry = previous
+
+        if entry is not None:
+            plan.unchanged.append(name)
+            plan.keep_ids.extend(entry["chunk_ids"])
+            continue
+
+        (plan.modified if name in manifest.files else plan.added).append(name)
+        changed_paths.append(file_path)
+        fingerprints[name] = (stat, sha256 or file_sha256(file_path))
+
+    plan.deleted = sorted(set(manifest.files) - current_names)
+    for name in plan.deleted:
+        plan.remove_ids.extend(manifest.files.pop(name)["chunk_ids"])
+
+    if progress is not None and plan.unchanged:
+        progress.add(files_skipped=len(plan.unchanged))
+
+    # 2. 추가되거나 바뀐 파일만 병렬로 청킹
+    for name, _, chunks in _iter_parsed_files(changed_paths, progress):
+        stat, sha256 = fingerprints[name]
+        chunk_ids = [chunk["id"] for chunk in chunks]
+        new_ids = set(chunk_ids)
+        plan.remove_ids.extend(i for i in previous_ids.get(name, []) if i not in new_ids)
+        manifest.record(name, stat, sha256, chunk_ids)
+        plan.chunks.extend(chunks)
+
+    return plan
@@ -0,0 +1,257 @@
+"""
+응답의 마크다운 표 정렬
+
+모델은 `| 학기 | 과목명 | 학점 |`처럼 공백 없이 간결한 표만 생성하고, 열 너비 맞춤(공백 채우기)과
+```markdown 코드블록 감싸기는 서버에서 처리합니다. 한글 등 전각 문자는 화면 너비 2칸으로 계산하여
+고정폭 글꼴에서 열이 맞도록 정렬합니다.
+
+스트리밍 응답은 IncrementalTableFormatter로 조각 단위로 처리합니다. 표가 아닌 줄은 받는 즉시
+내보내고, 표는 마지막 행까지 받은 뒤 정렬하여 한 번에 내보냅니다.
+"""
+
+import re
+import unicodedata
+from typing import List, Optional
+
+# 표 구분 행의 셀 (예: ---, :---, ---:, :---:)
+_SEPARATOR_CELL = re.compile(r"^:?-+:?$")
+# 이스케이프되지 않은 '|'
+_CELL_BOUNDARY = re.compile(r"(?<!\\)\|")
+
+# 서버가 대신 정리하는 코드블록 언어 (모델이 예전 지침대로 표를 감싼 경우)
+_TABLE_FENCE_LANGUAGES = ("markdown", "md")
+
+
+def display_width(text: str) -> int:
+    """
+    고정폭 글꼴에서 문자열이 차지하는 칸 수를 반환합니다. (전각 문자는 2칸, 결합 문자는 0칸)
+
+    Args:
+        text (str): 문자열
+
+    Returns:
+        int: 화면 너비
+    """
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+    return width
+
+
+def parse_row(line: str) -> List[str]:
+    """
+    표의 한 행을 셀 목록으로 나눕니다.
+
+    Args:
+        line (str): '|'로 시작하는 표의 행
+
+    Returns:
+        List[str]: 앞뒤 공백을 제거한 셀 목록
+    """
+    row = line.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|") and not row.endswith("\\|"):
+        row = row[:-1]
+    return [cell.strip() for cell in _CELL_BOUNDARY.split(row)]
+
+
+def _is_separator(cells: List[str]) -> bool:
+    return bool(cells) and all(_SEPARATOR_CELL.match(cell.replace(" ", "")) for cell in cells)
+
+
+def _is_table(lines: List[str]) -> bool:
+    return len(lines) >= 2 and _is_separator(parse_row(lines[1]))
+
+
+def _pad(cell: str, width: int, align: str) -> str:
+    padding = width - display_width(cell)
+    if align == "right":
+        return " " * padding + cell
+    if align == "center":
+        left = padding // 2
+        return " " * left + cell + " " * (padding - left)
+    return cell + " " * padding
+
+
+def format_table(lines: List[str]) -> str:
+    """
+    표의 행 목록을 열 너비에 맞춰 정렬하고 ```markdown 코드블록으로 감쌉니다.
+    구분 행의 정렬 표시(:---, ---:, :---:)는 유지합니다.
+
+    Args:
+        lines (List[str]): 머리글, 구분 행, 본문 행 순서의 표 행 목록
+
+    Returns:
+        str: 정렬된 표 (마지막 줄바꿈 포함)
+    """
+    rows = [parse_row(line) for line in lines]
+    separator = [cell.replace(" ", "") for cell in rows[1]]
+    body = [rows[0]] + rows[2:]
+
+    columns = max(len(row) for row in rows)
+    body = [row + [""] * (columns - len(row)) for row in body]
+    separator += ["---"] * (columns - len(separator))
+
+    aligns = []
+    for cell in separator:
+        if cell.startswith(":") and cell.endswith(":"):
+            aligns.append("center")
+        elif cell.endswith(":"):
+            aligns.append("right")
+        else:
+            aligns.append("left")
+
+    widths = [
+        max([3] + [display_width(row[i]) for row in body]) for i in range(columns)
+    ]
+
+    def render(cells):
+        return "| " + " | ".join(cells) + " |"
+
+    separator_cells = []
+    for width, align in zip(widths, aligns):
+        dashes = "-" * width
+        if align == "center":
+            dashes = ":" + dashes[2:] + ":"
+        elif align == "right":
+            dashes = dashes[1:] + ":"
+        separator_cells.append(dashes)
+
+    output = [render(_pad(c, w, a) for c, w, a in zip(body[0], widths, aligns))]
+    output.append(render(separator_cells))
+    for row in body[1:]:
+        output.append(render(_pad(c, w, a) for c, w, a in zip(row, widths, aligns)))
+
+    return "```markdown\n" + "\n".join(output) + "\n```\n"
+
+
+class IncrementalTableFormatter:
+    """
+    스트리밍되는 응답 조각에서 마크다운 표를 찾아 정렬하는 포매터
+
+    feed()에 조각을 넣으면 지금 내보내도 되는 텍스트를 반환하고, 응답이 끝나면 flush()로
+    남은 텍스트를 받습니다. 표일 수 있는 줄('|'로 시작)과 코드블록 경계('`'로 시작)만
+    줄이 끝날 때까지 보류하며, 나머지 줄은 받는 즉시 내보냅니다.
+    """
+
+    def __init__(self):
+        self._line = ""  # 아직 내보내지 않은 현재 줄
+        self._streaming_line = False  # 현재 줄을 이미 내보내는 중인지 여부
+        self._table: List[str] = []  # 보류 중인 표 후보 행
+        self._table_newline = True  # 보류 중인 마지막 행이 줄바꿈으로 끝났는지 여부
+        self._code_fence = False  # 그대로 내보내는 코드블록 안인지 여부
+        self._table_fence = False  # 서버가 대신 정리하는 ```markdown 블록 안인지 여부
+
+    def feed(self, text: str) -> str:
+        """
+        응답 조각을 처리합니다.
+
+        Args:
+            text (str): 모델이 생성한 응답 조각
+
+        Returns:
+            str: 지금 내보낼 텍스트
+        """
+        output = []
+        while text:
+            newline = text.find("\n")
+
+            if self._streaming_line:
+                if newline < 0:
+                    output.append(text)
+                    break
+                output.append(text[: newline + 1])
+                text = text[newline + 1 :]
+                self._streaming_line = False
+                continue
+
+            if newline < 0:
+                self._line += text
+                # 표나 코드블록 경계가 아닌 것이 확실한 줄은 끝나기 전에 바로 내보냄
+                stripped = self._line.lstrip()
+                held = ("`",) if self._code_fence else ("|", "`")
+                if stripped and not stripped.startswith(held):
+                    output.append(self._flush_table())
+                    output.append(self._line)
+                    self._line = ""
+                    self._streaming_line = True
+                break
+
+            line = self._line + text[: newline + 1]
+            self._line = ""
+            text = text[newline + 1 :]
+            output.append(self._complete_line(line))
+
+        return "".join(output)
+
+    def flush(self) -> str:
+        """
+        남은 텍스트(마지막 줄과 보류 중인 표)를 반환합니다.
+
+        Returns:
+            str: 남은 텍스트
+        """
+        output = ""
+        if self._line:
+            line, self._line = self._line, ""
+            output = self._complete_line(line)
+        return output + self._flush_table()
+
+    def _complete_line(self, line: str) -> str:
+        stripped = line.strip()
+
+        if stripped.startswith("```"):
+            if self._code_fence:
+                self._code_fence = False
+                return line
+            if self._table_fence:
+                # 서버가 정리하는 블록의 닫는 줄은 버림 (줄바꿈 여부는 표에 반영)
+                self._table_fence = False
+                self._table_newline = line.endswith("\n")
+                return self._flush_table()
+            language = stripped[3:].strip().lower()
+            if language in _TABLE_FENCE_LANGUAGES:
+                self._table_fence = True
+                return self._flush_table()
+            self._code_fence = True
+            return self._flush_table() + line
+
+        if self._code_fence:
+            return line
+
+        if stripped.startswith("|"):
+            self._table.append(line.rstrip("\n"))
+            self._table_newline = line.endswith("\n")
+            return ""
+
+        return self._flush_table() + line
+
+    def _flush_table(self) -> str:
+        if not self._table:
+            return ""
+        lines, self._table = self._table, []
+        text = format_table(lines) if _is_table(lines) else "\n".join(lines) + "\n"
+        # 응답이 줄바꿈 없이 표로 끝나면 마지막 줄바꿈을 붙이지 않음
+        if not self._table_newline:
+            text = text[:-1]
+        self._table_newline = True
+        return text
+
+
+def format_tables(text: Optional[str]) -> Optional[str]:
+    """
+    응답 전체의 마크다운 표를 정렬하고 코드블록으로 감쌉니다.
+
+    Args:
+        text (str): 모델 응답
+
+    Returns:
+        str: 표가 정렬된 응답
+    """
+    if not text:
+        return text
+    formatter = IncrementalTableFormatter()
+    return formatter.feed(text) + formatter.flush()
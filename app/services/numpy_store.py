@@ -0,0 +1,380 @@
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.vector_file import (embedding_matrix, load_vector_file,
+                                      save_vector_file, vector_chunks)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    행렬의 각 행을 L2 정규화합니다. 이미 정규화된 행렬(저장된 파일, OpenAI 임베딩)은
+    복사하지 않고 그대로 반환하며, 0 벡터 행은 0으로 둡니다.
+
+    Args:
+        matrix (np.ndarray): (행 수, 차원) 크기의 행렬
+
+    Returns:
+        np.ndarray: 행이 정규화된 행렬
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    if np.allclose(norms, 1.0, atol=1e-3):
+        return matrix
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_similar(
+    matrix: np.ndarray, query_embeddings, top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    행이 정규화된 행렬에서 쿼리마다 코사인 유사도가 가장 높은 행 top_k개를 찾습니다.
+
+    모든 쿼리를 행렬-행렬 곱 한 번으로 계산하고, 전체 정렬 대신 argpartition으로
+    상위 k개만 부분 선택한 뒤 그 안에서만 정렬합니다.
+
+    Args:
+        matrix (np.ndarray): (행 수, 차원) 크기의 정규화된 행렬
+        query_embeddings: (쿼리 수, 차원) 크기의 쿼리 임베딩
+        top_k (int): 쿼리마다 찾을 행 수
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (쿼리 수, k) 크기의 행 번호와 유사도 (유사도 내림차순)
+    """
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    scores = (queries / norms) @ matrix.T
+
+    top_k = min(top_k, scores.shape[1])
+    if top_k <= 0:
+        empty = np.zeros((len(queries), 0))
+        return empty.astype(np.int64), empty
+
+    top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+class NumpyVectorStore:
+    """
+    정확한(brute-force) 코사인 검색을 수행하는 인메모리 벡터 저장소
+
+    L2 정규화한 청크 임베딩을 연속된 float32 행렬 하나에 보관하고, 메타데이터는 같은 순서의
+    리스트에 둡니다. 검색은 행렬-벡터 곱 한 번과 argpartition으로 끝나므로 수백~수만 개
+    규모의 코퍼스에서는 HNSW보다 빠르고 결과도 근사가 아닌 정확한 top-k입니다.
+    """
+
+    # 디렉토리 안의 벡터 저장소 파일 이름 (index.meta.json과 세대별 데이터 파일)
+    FILE_NAME = "index"
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+        collection: Optional[str] = None,
+    ):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError("임베딩 행렬의 크기가 ID 수와 일치하지 않습니다.")
+
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.collection = collection
+        self.matrix = normalize_rows(matrix)
+        self._positions = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ):
+        """
+        새 청크를 행렬 끝에 추가합니다.
+
+        Args:
+            ids (Sequence[str]): 청크 ID 목록
+            embeddings: (청크 수, 차원) 크기의 임베딩 행렬
+            documents (Sequence[str]): 청크 내용 목록
+            metadatas (Sequence[Dict]): 청크 메타데이터 목록
+        """
+        for chunk_id in ids:
+            if chunk_id in self._positions:
+                raise ValueError(f"이미 존재하는 ID입니다: {chunk_id}")
+
+        rows = np.asarray(embeddings, dtype=np.float32)
+        if rows.ndim != 2 or rows.shape[0] != len(ids):
+            raise ValueError("임베딩 행렬의 크기가 ID 수와 일치하지 않습니다.")
+        if not len(ids):
+            return
+        rows = normalize_rows(rows)
+
+        self.matrix = np.vstack([self.matrix, rows]) if self.ids else rows
+        for chunk_id in ids:
+            self._positions[chunk_id] = len(self.ids)
+            self.ids.append(chunk_id)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ):
+        """같은 ID의 청크를 지운 뒤 다시 추가합니다."""
+        self.delete(ids)
+        self.add(ids, embeddings, documents, metadatas)
+
+    def delete(self, ids: Sequence[str]):
+        """
+        ID에 해당하는 행을 삭제합니다. 없는 ID는 무시합니다.
+
+        Args:
+            ids (Sequence[str]): 삭제할 청크 ID 목록
+        """
+        removed = {self._positions[chunk_id] for chunk_id in ids if chunk_id in self._positions}
+        if not removed:
+            return
+
+        keep = [i for i in range(len(self.ids)) if i not in removed]
+        self.matrix = self.matrix[keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self._positions = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+
+    def query(self, query_embedding: Sequence[float], top_k: int = 3) -> List[Dict]:
+        """
+        쿼리 임베딩과 코사인 유사도가 가장 높은 청크 top_k개를 반환합니다.
+
+        Args:
+            query_embedding (Sequence[float]): 쿼리 임베딩
+            top_k (int, optional): 반환할 청크 수. 기본값은 3.
+
+        Returns:
+            List[Dict]: 유사도 내림차순으로 정렬된 청크 목록 (score: 코사인 유사도)
+        """
+        return self.query_batch([query_embedding], top_k)[0]
+
+    def query_batch(self, query_embeddings, top_k: int = 3) -> List[List[Dict]]:
+        """
+        여러 쿼리 임베딩을 행렬-행렬 곱 한 번으로 검색합니다.
+
+        Args:
+            query_embeddings: (쿼리 수, 차원) 크기의 쿼리 임베딩
+            top_k (int, optional): 쿼리마다 반환할 청크 수. 기본값은 3.
+
+        Returns:
+            List[List[Dict]]: 쿼리별 청크 목록
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if not self.ids:
+            return [[] for _ in range(len(queries))]
+
+        top, top_scores = top_k_similar(self.matrix, queries, top_k)
+        return [
+            [self._to_chunk(int(i), float(score)) for i, score in zip(rows, row_scores)]
+            for rows, row_scores in zip(top, top_scores)
+        ]
+
+    def _to_chunk(self, index: int, score: float) -> Dict:
+        metadata = self.metadatas[index] or {}
+        return {
+            "id": self.ids[index],
+            "title": metadata.get("title", "제목 없음"),
+            "content": self.documents[index],
+            "source": metadata.get("source", "출처 미상"),
+            "heading_path": metadata.get("heading_path"),
+            "token_count": metadata.get("token_count"),
+            "score": score,
+        }
+
+    def save(self, directory: str):
+        """
+        임베딩 행렬과 청크 정보를 바이너리 벡터 저장소 형식(vector_file)으로 저장합니다.
+        다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체합니다.
+
+        Args:
+            directory (str): 저장할 디렉토리
+        """
+        save_vector_file(
+            os.path.join(directory, self.FILE_NAME),
+            self.matrix,
+            self.documents,
+            self.metadatas,
+            ids=self.ids,
+            header={"collection": self.collection},
+        )
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "NumpyVectorStore":
+        """
+        save로 저장한 벡터 저장소를 불러옵니다.
+
+        Args:
+            directory (str): 저장된 디렉토리
+            mmap (bool, optional): 임베딩 행렬을 메모리 매핑으로 열지 여부. 기본값은 True.
+
+        Returns:
+            NumpyVectorStore: 불러온 벡터 저장소
+        """
+        records = load_vector_file(os.path.join(directory, cls.FILE_NAME), mmap_mode=mmap)
+        return cls(
+            records["ids"],
+            records["embeddings"],
+            records["documents"],
+            records["metadatas"],
+            collection=records["header"].get("collection"),
+        )
+
+    @classmethod
+    def from_collection(cls, collection) -> "NumpyVectorStore":
+        """
+        ChromaDB 컬렉션에 저장된 임베딩과 메타데이터로 벡터 저장소를 만듭니다.
+
+        Args:
+            collection (chromadb.Collection): 원본 컬렉션
+
+        Returns:
+            NumpyVectorStore: 생성된 벡터 저장소
+        """
+        records = collection.get(include=["embeddings", "documents", "metadatas"])
+        embeddings = records["embeddings"]
+        if embeddings is None or len(embeddings) == 0:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+
+        return cls(
+            records["ids"],
+            embeddings,
+            records["documents"],
+            records["metadatas"],
+            collection=collection.name,
+        )
+
+
+# 전역 NumPy 벡터 저장소 (서빙 컬렉션이 바뀌면 다시 로드)
+_numpy_store: Optional[NumpyVectorStore] = None
+_numpy_store_lock = threading.Lock()
+
+
+def get_numpy_store(collection) -> NumpyVectorStore:
+    """
+    서빙 중인 컬렉션과 같은 데이터의 NumPy 벡터 저장소를 반환합니다.
+
+    디스크(NUMPY_INDEX_DIR)에 같은 컬렉션으로 만든 파일이 있으면 메모리 매핑으로 열고,
+    없거나 오래된 파일이면 컬렉션에서 임베딩을 내보내 새로 저장합니다.
+
+    Args:
+        collection (chromadb.Collection): 서빙 중인 ChromaDB 컬렉션
+
+    Returns:
+        NumpyVectorStore: NumPy 벡터 저장소
+    """
+    global _numpy_store
+    store = _numpy_store
+    if store is not None and store.collection == collection.name:
+        return store
+
+    with _numpy_store_lock:
+        store = _numpy_store
+        if store is not None and store.collection == collection.name:
+            return store
+
+        store = None
+        try:
+            store = NumpyVectorStore.load(settings.NUMPY_INDEX_DIR)
+        except FileNotFoundError:
+            pass
+
+        if store is None or store.collection != collection.name:
+            print(f"NumPy 인덱스를 컬렉션 {collection.name}에서 생성합니다...")
+            store = NumpyVectorStore.from_collection(collection)
+            store.save(settings.NUMPY_INDEX_DIR)
+            # 저장한 파일을 메모리 매핑으로 다시 열어 프로세스 간 페이지 캐시를 공유
+            store = NumpyVectorStore.load(settings.NUMPY_INDEX_DIR)
+
+        _numpy_store = store
+        return store
+
+
+# 청크 목록 검색(legacy 벡터 저장소)에 쓰는 (청크 목록, 정규화된 임베딩 행렬)
+_chunk_search_index: Tuple[Optional[List[Dict]], Optional[np.ndarray]] = (None, None)
+
+
+def load_search_chunks(path: str) -> List[Dict]:
+    """
+    바이너리 벡터 저장소를 청크 목록으로 불러오고, 불러온 임베딩 행렬을 그대로
+    검색 행렬로 등록합니다. 저장된 행렬은 이미 정규화되어 있으므로 메모리 매핑된
+    행렬을 복사하지 않고 사용합니다.
+
+    Args:
+        path (str): 벡터 저장소 경로
+
+    Returns:
+        List[Dict]: title, content, source, embedding을 포함한 청크 목록
+    """
+    global _chunk_search_index
+    records = load_vector_file(path)
+    chunks = vector_chunks(records)
+    _chunk_search_index = (chunks, normalize_rows(records["embeddings"]))
+    return chunks
+
+
+def chunk_search_matrix(chunks: List[Dict]) -> np.ndarray:
+    """
+    청크 목록의 정규화된 임베딩 행렬을 반환합니다. load_search_chunks로 불러온 목록이면
+    등록된 행렬을, 아니면 청크의 임베딩으로 한 번 만든 행렬을 재사용합니다.
+
+    Args:
+        chunks (List[Dict]): 'embedding'을 포함한 청크 목록
+
+    Returns:
+        np.ndarray: (청크 수, 차원) 크기의 정규화된 임베딩 행렬
+    """
+    global _chunk_search_index
+    source, matrix = _chunk_search_index
+    if source is not chunks or matrix.shape[0] != len(chunks):
+        matrix = normalize_rows(embedding_matrix([chunk["embedding"] for chunk in chunks]))
+        _chunk_search_index = (chunks, matrix)
+    return matrix
+
+
+def search_chunks(
+    chunks: List[Dict], query_embeddings: Sequence[Sequence[float]], top_k: int
+) -> List[List[Dict]]:
+    """
+    청크 목록에서 쿼리 임베딩마다 코사인 유사도가 가장 높은 청크 top_k개를 찾습니다.
+    청크가 없거나 쿼리 임베딩과 차원이 다르면 쿼리마다 빈 목록을 반환합니다.
+
+    Args:
+        chunks (List[Dict]): 'embedding'을 포함한 청크 목록
+        query_embeddings (Sequence[Sequence[float]]): 쿼리 임베딩 목록
+        top_k (int): 쿼리마다 반환할 청크 수
+
+    Returns:
+        List[List[Dict]]: 쿼리별 상위 k개의 유사한 청크 목록
+    """
+    if not chunks or len(query_embeddings) == 0:
+        return [[] for _ in query_embeddings]
+
+    matrix = chunk_search_matrix(chunks)
+    if len(query_embeddings[0]) != matrix.shape[1]:
+        print("쿼리 임베딩과 벡터 저장소의 차원이 일치하지 않습니다.")
+        return [[] for _ in query_embeddings]
+
+    top, _ = top_k_similar(matrix, query_embeddings, top_k)
+    return [[chunks[i] for i in rows] for rows in top]
@@ -0,0 +1,168 @@
+"""
+프롬프트 토큰 사용량 기록
+
+LLM 호출마다 시스템 프롬프트/컨텍스트/질문/응답의 토큰 수와 API가 보고한 사용량
+(prompt_tokens, completion_tokens, 프롬프트 캐시에 적중한 cached_tokens)을 집계합니다.
+집계 값은 /api/metrics 엔드포인트로 확인할 수 있고, PROMPT_LOG_ENABLED가 켜져 있으면 요청마다 한 줄씩
+JSONL 파일에 기록하여 evaluate/prompt_token_profiler.py로 분석합니다. (질문/응답 원문은 기록하지 않음)
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+def usage_to_dict(usage: Any) -> Dict[str, int]:
+    """
+    chat completions 응답의 usage(객체 또는 model_dump() 결과)에서 토큰 수를 꺼냅니다.
+
+    Args:
+        usage: response.usage 또는 그 딕셔너리
+
+    Returns:
+        Dict[str, int]: prompt_tokens, completion_tokens, cached_tokens
+    """
+    if usage is None:
+        return {}
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+
+    details = usage.get("prompt_tokens_details") or {}
+    if not isinstance(details, dict):
+        details = vars(details)
+    return {
+        "prompt_tokens": usage.get("prompt_tokens") or 0,
+        "completion_tokens": usage.get("completion_tokens") or 0,
+        "cached_tokens": details.get("cached_tokens") or 0,
+    }
+
+
+class PromptMetrics:
+    """
+    시스템 프롬프트 키별 LLM 호출 토큰 사용량과 프롬프트 캐시 적중 통계 (스레드 안전)
+    """
+
+    _FIELDS = (
+        "requests",
+        "system_tokens",
+        "context_tokens",
+        "query_tokens",
+        "answer_tokens",
+        "prompt_tokens",
+        "completion_tokens",
+        "cached_tokens",
+        "cache_hits",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, system_key: str, tokens: Dict[str, int], usage: Dict[str, int]):
+        """
+        LLM 호출 한 번의 토큰 수를 집계합니다.
+
+        Args:
+            system_key (str): 시스템 프롬프트 키
+            tokens (Dict[str, int]): system_tokens, context_tokens, query_tokens, answer_tokens
+            usage (Dict[str, int]): usage_to_dict로 꺼낸 API 사용량
+        """
+        with self._lock:
+            totals = self._totals.setdefault(system_key, dict.fromkeys(self._FIELDS, 0))
+            totals["requests"] += 1
+            for name, value in {**tokens, **usage}.items():
+                if name in totals:
+                    totals[name] += value
+            if usage.get("cached_tokens"):
+                totals["cache_hits"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        시스템 프롬프트 키별 누적 값과 평균, 프롬프트 캐시 적중률을 반환합니다.
+
+        Returns:
+            Dict[str, Dict[str, float]]: 키별 통계
+        """
+        with self._lock:
+            totals = {key: dict(values) for key, values in self._totals.items()}
+
+        stats = {}
+        for key, values in totals.items():
+            requests = values["requests"] or 1
+            stats[key] = {
+                **values,
+                "avg_prompt_tokens": round(values["prompt_tokens"] / requests, 1),
+                "avg_cached_tokens": round(values["cached_tokens"] / requests, 1),
+                "avg_context_tokens": round(values["context_tokens"] / requests, 1),
+                "avg_answer_tokens": round(values["answer_tokens"] / requests, 1),
+                # 캐시 적중이 있었던 요청 비율과, 전체 프롬프트 토큰 중 캐시된 토큰 비율
+                "cache_hit_rate": round(values["cache_hits"] / requests, 4),
+                "cached_token_ratio": round(
+                    values["cached_tokens"] / (values["prompt_tokens"] or 1), 4
+                ),
+            }
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+
+_prompt_metrics = PromptMetrics()
+_log_lock = threading.Lock()
+
+
+def get_prompt_metrics() -> PromptMetrics:
+    """
+    프로세스 전역 프롬프트 사용량 집계 객체를 반환합니다.
+
+    Returns:
+        PromptMetrics: 집계 객체
+    """
+    return _prompt_metrics
+
+
+def record_llm_call(
+    system_key: str,
+    tokens: Dict[str, int],
+    usage: Any,
+    stream: bool = False,
+    latency_ms: Optional[float] = None,
+):
+    """
+    LLM 호출 한 번의 토큰 사용량을 집계하고, 설정되어 있으면 JSONL 요청 로그에 기록합니다.
+    기록에 실패해도 응답에는 영향을 주지 않습니다.
+
+    Args:
+        system_key (str): 시스템 프롬프트 키
+        tokens (Dict[str, int]): system_tokens, context_tokens, query_tokens, answer_tokens
+        usage: API 응답의 usage (객체 또는 딕셔너리)
+        stream (bool, optional): 스트리밍 호출 여부
+        latency_ms (float, optional): LLM 호출 소요 시간(ms)
+    """
+    try:
+        usage = usage_to_dict(usage)
+        _prompt_metrics.record(system_key, tokens, usage)
+
+        if not settings.PROMPT_LOG_ENABLED:
+            return
+
+        record = {
+            "timestamp": time.time(),
+            "system_key": system_key,
+            "stream": stream,
+            "latency_ms": latency_ms,
+            **tokens,
+            **usage,
+        }
+        path = settings.PROMPT_LOG_PATH
+        with _log_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print(f"프롬프트 사용량 기록 중 오류 발생: {str(e)}")
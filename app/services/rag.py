@@ -1,85 +1,280 @@
+import asyncio
 import os
-from typing import Dict, List
+import time
+import unicodedata
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 import yaml
 
 from app.core.config import settings
-from app.core.utils import get_openai_client
+from app.core.prompt_registry import get_prompt_registry
+from app.core.utils import (count_tokens, get_async_openai_client,
+                            get_openai_client)
+from app.services.cache import (AsyncBroadcast, AsyncSingleFlight,
+                                SemanticCache, SingleFlight, TTLCache)
+from app.services.context_compression import (SENTENCE_BOUNDARY,
+                                               compress_chunks)
 from app.services.embeddings import (find_similar_chunks,
-                                     get_or_create_collection)
+                                     find_similar_chunks_async,
+                                     generate_embedding,
+                                     generate_embedding_async,
+                                     get_collection_count, get_index_version)
+from app.services.markdown_tables import (IncrementalTableFormatter,
+                                          format_tables)
+from app.services.prompt_metrics import record_llm_call
+
+# 검색 결과가 없을 때 반환하는 기본 응답
+NO_RESULT_MESSAGE = "죄송합니다. 질문에 관련된 정보를 찾을 수 없습니다."
+
+# 응답 캐시: 같은 질문(정규화 기준)에 대한 응답과 출처를 재사용합니다.
+_answer_cache = TTLCache(settings.ANSWER_CACHE_MAX_SIZE, settings.ANSWER_CACHE_TTL)
+_answer_flight = SingleFlight()
+_answer_flight_async = AsyncSingleFlight()
+_answer_stream_flight = AsyncBroadcast()
+
+# 의미 캐시: 표현은 달라도 임베딩이 가깝고 같은 문서가 검색되는 질문의 응답을 재사용합니다.
+_semantic_cache = SemanticCache(
+    settings.SEMANTIC_CACHE_MAX_SIZE, settings.SEMANTIC_CACHE_THRESHOLD
+)
 
 
 def load_prompts(yaml_file=None):
     """
     YAML 파일에서 프롬프트를 로드하는 함수
 
+    기본 프롬프트 파일은 프롬프트 레지스트리에 캐시된 내용을 반환하며,
+    다른 경로를 지정한 경우에만 파일을 직접 읽습니다.
+
     Args:
         yaml_file (str): YAML 파일 경로
 
     Returns:
         dict: 로드된 프롬프트
     """
-    if yaml_file is None:
-        yaml_file = settings.PROMPTS_FILE
+    if yaml_file is None or yaml_file == settings.PROMPTS_FILE:
+        return get_prompt_registry().prompts
 
     with open(yaml_file, "r", encoding="utf-8") as file:
         return yaml.safe_load(file)
 
 
-def format_context_from_chunks(chunks: List[Dict]) -> str:
+CONTEXT_HEADER = "다음은 한국외국어대학교 컴퓨터공학과 관련 문서에서 검색된 내용입니다:\n\n"
+
+
+def _trim_to_tokens(content: str, max_tokens: int) -> Tuple[str, int]:
     """
-    검색된 청크들로부터 LLM에 제공할 컨텍스트를 포맷팅합니다.
+    청크 내용을 토큰 예산에 맞게 앞에서부터 자릅니다. 문단(섹션) 단위로 채운 뒤 넘치는 문단은
+    문장 단위로, 표는 머리글을 유지한 채 행 단위로 자릅니다.
+
+    Returns:
+        Tuple[str, int]: 잘라낸 내용과 그 토큰 수 (들어갈 내용이 없으면 ("", 0))
+    """
+    kept, used = [], 0
+    for paragraph in content.split("\n\n"):
+        tokens = count_tokens(paragraph) + 1
+        if used + tokens <= max_tokens:
+            kept.append(paragraph)
+            used += tokens
+            continue
+
+        # 넘치는 문단의 앞부분만 사용
+        lines = paragraph.split("\n")
+        if lines[0].lstrip().startswith("|") and len(lines) > 2:
+            units, separator, prefix = lines[2:], "\n", lines[:2]
+        else:
+            units, separator, prefix = SENTENCE_BOUNDARY.split(paragraph), " ", []
+
+        partial, partial_tokens = list(prefix), count_tokens("\n".join(prefix)) + 1
+        for unit in units:
+            unit_tokens = count_tokens(unit) + 1
+            if used + partial_tokens + unit_tokens > max_tokens:
+                break
+            partial.append(unit)
+            partial_tokens += unit_tokens
+        if len(partial) > len(prefix):
+            body = separator.join(partial[len(prefix) :])
+            kept.append("\n".join(prefix + [body]))
+            used += partial_tokens
+        break
+
+    # 헤딩만 남았으면 넣지 않음
+    if all(line.startswith("#") for paragraph in kept for line in paragraph.split("\n")):
+        return "", 0
+    return "\n\n".join(kept), used
+
+
+def pack_context_from_chunks(
+    chunks: List[Dict], max_tokens: Optional[int] = None
+) -> Tuple[str, int]:
+    """
+    토큰 예산 안에서 검색된 청크로 LLM 컨텍스트를 만듭니다.
+
+    점수가 높은 청크부터 청크별로 미리 계산한 토큰 수(token_count)로 예산을 채우고,
+    예산을 넘는 청크는 문단/문장 경계에서 잘라 남은 예산만큼만 넣습니다.
+
+    기본적으로 검색 결과(관련도) 순서를 따릅니다. settings.CONTEXT_STABLE_ORDER가 켜져 있으면
+    컨텍스트의 청크를 (출처, 청크 ID) 순서로 배치하여, 같은 청크가 검색된 요청은 점수 순서와
+    관계없이 같은 컨텍스트를 만듭니다. (프롬프트 캐시 적중률은 오르지만 관련도 순서는 사라짐)
 
     Args:
         chunks (List[Dict]): 유사한 청크들의 목록
+        max_tokens (int, optional): 컨텍스트 최대 토큰 수. 기본값은 settings.CONTEXT_MAX_TOKENS.
 
     Returns:
-        str: 포맷팅된 컨텍스트 문자열
+        Tuple[str, int]: 포맷팅된 컨텍스트 문자열과 그 토큰 수
     """
-    formatted_context = (
-        "다음은 한국외국어대학교 컴퓨터공학과 관련 문서에서 검색된 내용입니다:\n\n"
-    )
+    if max_tokens is None:
+        max_tokens = settings.CONTEXT_MAX_TOKENS
+
+    used = count_tokens(CONTEXT_HEADER)
+    packed: Dict[int, str] = {}
+    trimmed = 0
+    order = sorted(range(len(chunks)), key=lambda i: -(chunks[i].get("score") or 0.0))
+    for i in order:
+        chunk = chunks[i]
+        overhead = count_tokens(f"--- 문서 {len(chunks)}: {chunk['title']} ---\n") + 1
+        remaining = max_tokens - used - overhead
+        if remaining <= 0:
+            continue
 
-    for i, chunk in enumerate(chunks, 1):
-        formatted_context += f"--- 문서 {i}: {chunk['title']} ---\n"
-        formatted_context += chunk["content"]
-        formatted_context += "\n\n"
+        tokens = chunk.get("token_count") or count_tokens(chunk["content"])
+        content = chunk["content"]
+        if tokens > remaining:
+            content, tokens = _trim_to_tokens(content, remaining)
+            if not content:
+                continue
+            trimmed += 1
+
+        packed[i] = content
+        used += overhead + tokens
+
+    positions = sorted(packed)
+    if settings.CONTEXT_STABLE_ORDER:
+        positions.sort(key=lambda i: (chunks[i].get("source") or "", chunks[i].get("id") or ""))
+
+    formatted_context = [CONTEXT_HEADER]
+    for n, i in enumerate(positions, 1):
+        formatted_context.append(f"--- 문서 {n}: {chunks[i]['title']} ---\n")
+        formatted_context.append(packed[i])
+        formatted_context.append("\n\n")
+
+    if trimmed or len(packed) < len(chunks):
+        print(
+            f"컨텍스트 토큰 예산({max_tokens})에 맞춰 청크 {len(chunks)}개 중 "
+            f"{len(packed)}개를 사용했습니다. (잘린 청크 {trimmed}개, {used} 토큰)"
+        )
 
-    return formatted_context
+    return "".join(formatted_context), used
 
 
-def update_vector_store(documents_dir=None):
+def format_context_from_chunks(chunks: List[Dict], max_tokens: Optional[int] = None) -> str:
     """
-    마크다운 문서를 처리하고 ChromaDB 벡터 저장소를 업데이트합니다.
+    검색된 청크들로부터 LLM에 제공할 컨텍스트를 포맷팅합니다.
+    컨텍스트는 토큰 예산(settings.CONTEXT_MAX_TOKENS) 안으로 제한됩니다. (pack_context_from_chunks 참고)
 
     Args:
-        documents_dir (str, optional): 마크다운 문서 디렉토리
+        chunks (List[Dict]): 유사한 청크들의 목록
+        max_tokens (int, optional): 컨텍스트 최대 토큰 수
 
     Returns:
-        bool: 업데이트 성공 여부
+        str: 포맷팅된 컨텍스트 문자열
     """
-    from app.services.embeddings import generate_embeddings_for_chunks
-    from app.services.markdown_processor import process_markdown_documents
+    return pack_context_from_chunks(chunks, max_tokens)[0]
+
 
+def rebuild_vector_store(
+    documents_dir=None, full_rebuild: bool = False, progress=None
+) -> int:
+    """
+    마크다운 문서를 처리하고 ChromaDB 벡터 저장소를 다시 만듭니다. 오류는 호출자에게 전달됩니다.
+
+    문서 매니페스트와 비교하여 추가되거나 바뀐 파일만 다시 청킹하며, 바뀐 파일이 없으면
+    벡터 저장소를 건드리지 않고 바로 반환합니다.
+
+    Args:
+        documents_dir (str, optional): 마크다운 문서 디렉토리. 기본값은 DOCS_DIR/raw.
+        full_rebuild (bool, optional): 매니페스트와 현재 컬렉션을 무시하고 모든 문서를 다시
+            청킹하여 새 컬렉션을 만들지 여부. 임베딩 캐시(모델, 차원, 텍스트 기준)에 있는
+            텍스트는 캐시의 임베딩을 그대로 사용합니다.
+        progress (ReindexJob, optional): 진행 상황을 기록하고 취소 여부를 확인할 작업 객체
+
+    Returns:
+        int: 저장된 청크 수
+
+    Raises:
+        ValueError: 처리할 문서가 없는 경우
+    """
+    from app.services.document_manifest import (DocumentManifest,
+                                                load_document_manifest)
+    from app.services.embeddings import (generate_embeddings_for_chunks,
+                                         get_active_collection_name)
+    from app.services.markdown_processor import plan_document_changes
+
+    # 원본 문서는 DOCS_DIR/raw에 있습니다. DOCS_DIR를 그대로 넘기면 이전에 만든
+    # combined_markdown.md만 다시 읽게 됩니다.
     if documents_dir is None:
-        documents_dir = settings.DOCS_DIR
+        documents_dir = os.path.join(settings.DOCS_DIR, "raw")
 
     print(f"마크다운 문서를 처리하고 벡터 저장소를 업데이트합니다...")
 
-    try:
-        # 마크다운 문서 처리
-        _, chunks = process_markdown_documents(documents_dir)
+    # 전체 재색인이면 매니페스트를 무시하고 모든 파일을 다시 처리
+    manifest = (
+        DocumentManifest()
+        if full_rebuild
+        else load_document_manifest(get_active_collection_name())
+    )
+
+    # 바뀐 문서만 처리
+    if progress is not None:
+        progress.set_stage("parsing")
+    plan = plan_document_changes(documents_dir, manifest, progress=progress)
+    print(plan.summary())
+
+    if not plan.total_chunks:
+        raise ValueError("처리할 문서가 없습니다.")
+
+    if not plan.has_changes:
+        print("변경된 문서가 없어 벡터 저장소를 그대로 유지합니다.")
+        # 수정 시각만 바뀐 파일의 기록 갱신
+        manifest.save()
+        return plan.total_chunks
+
+    print(f"바뀐 파일에서 {len(plan.chunks)}개의 청크를 만들었습니다. 임베딩 생성 중...")
+
+    # 임베딩 생성 및 ChromaDB에 저장
+    if progress is not None:
+        progress.set_stage("embedding")
+    generate_embeddings_for_chunks(
+        plan.chunks,
+        incremental=not full_rebuild,
+        progress=progress,
+        keep_ids=plan.keep_ids,
+    )
 
-        if not chunks:
-            print("처리할 문서가 없습니다.")
-            return False
+    # 서빙 컬렉션 교체에 성공한 뒤에만 매니페스트 저장
+    manifest.collection = get_active_collection_name()
+    manifest.save()
 
-        print(f"{len(chunks)}개의 청크로 분할되었습니다. 임베딩 생성 중...")
+    print(f"벡터 저장소 업데이트가 완료되었습니다.")
+    return plan.total_chunks
 
-        # 임베딩 생성 및 ChromaDB에 저장
-        generate_embeddings_for_chunks(chunks)
 
-        print(f"벡터 저장소 업데이트가 완료되었습니다.")
+def update_vector_store(documents_dir=None, full_rebuild: bool = False):
+    """
+    마크다운 문서를 처리하고 ChromaDB 벡터 저장소를 업데이트합니다.
+    기본적으로 바뀐 청크만 다시 임베딩하는 증분 업데이트를 수행합니다.
+
+    Args:
+        documents_dir (str, optional): 마크다운 문서 디렉토리. 기본값은 DOCS_DIR/raw.
+        full_rebuild (bool, optional): 매니페스트와 현재 컬렉션을 무시하고 모든 문서를 다시
+            청킹하여 새 컬렉션을 만들지 여부. 임베딩 캐시(모델, 차원, 텍스트 기준)에 있는
+            텍스트는 캐시의 임베딩을 그대로 사용합니다.
+
+    Returns:
+        bool: 업데이트 성공 여부
+    """
+    try:
+        rebuild_vector_store(documents_dir, full_rebuild)
         return True
 
     except Exception as e:
@@ -87,10 +282,289 @@ def update_vector_store(documents_dir=None):
         return False
 
 
+def build_rag_messages(query: str, context: str, system_key: str = "rag") -> List[Dict]:
+    """
+    LLM에 전달할 채팅 메시지 목록을 구성합니다.
+
+    프롬프트 캐시는 요청 간에 같은 앞부분(prefix)에만 적용되므로, 바뀌지 않는 시스템 프롬프트를
+    맨 앞에 두고 요청마다 바뀌는 부분은 뒤에 둡니다. 컨텍스트는 질문과 섞지 않고 별도 메시지로
+    보내므로, 같은 청크가 검색된 요청은 질문 전까지의 메시지가 모두 같습니다.
+
+    Args:
+        query (str): 사용자 쿼리
+        context (str): format_context_from_chunks로 만든 컨텍스트
+        system_key (str, optional): 시스템 프롬프트 키. 기본값은 "rag".
+
+    Returns:
+        List[Dict]: OpenAI chat completions 형식의 메시지 목록
+    """
+    system_prompt = get_prompt_registry().get_system_prompt(system_key)
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": f"컨텍스트: {context}"},
+        {"role": "user", "content": f"질문: {query}"},
+    ]
+
+
+def normalize_query(query: str) -> str:
+    """
+    캐시 키로 사용할 수 있도록 쿼리를 정규화합니다.
+    (유니코드 NFKC 정규화, 대소문자 통일, 공백 정리, 끝의 문장부호 제거)
+
+    Args:
+        query (str): 사용자 쿼리
+
+    Returns:
+        str: 정규화된 쿼리
+    """
+    normalized = unicodedata.normalize("NFKC", query).casefold()
+    normalized = " ".join(normalized.split())
+    return normalized.rstrip("?!.~ ")
+
+
+def make_answer_cache_key(query: str, system_key: str) -> Tuple:
+    """
+    응답 캐시 키를 만듭니다. 프롬프트, 모델, 인덱스 중 하나라도 바뀌면 키가 달라집니다.
+
+    Args:
+        query (str): 사용자 쿼리
+        system_key (str): 시스템 프롬프트 키
+
+    Returns:
+        Tuple: 캐시 키
+    """
+    return (
+        normalize_query(query),
+        system_key,
+        get_prompt_registry().version,
+        settings.LLM_MODEL,
+        get_index_version(),
+    )
+
+
+def make_semantic_cache_scope(system_key: str) -> Tuple:
+    """
+    의미 캐시 항목이 유효한 범위(프롬프트, 모델, 인덱스 버전)를 만듭니다.
+
+    Args:
+        system_key (str): 시스템 프롬프트 키
+
+    Returns:
+        Tuple: 의미 캐시 범위
+    """
+    return (
+        system_key,
+        get_prompt_registry().version,
+        settings.LLM_MODEL,
+        get_index_version(),
+    )
+
+
+def _retrieve(query: str) -> Tuple[List[Dict], List[float]]:
+    """
+    관련 청크를 검색합니다. 의미 캐시를 사용하면 쿼리 임베딩도 함께 반환합니다.
+    """
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return find_similar_chunks(query), []
+
+    embedding = generate_embedding(query)
+    return find_similar_chunks(query, query_embedding=embedding), embedding
+
+
+async def _retrieve_async(query: str) -> Tuple[List[Dict], List[float]]:
+    """
+    _retrieve의 비동기 버전입니다.
+    """
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return await find_similar_chunks_async(query), []
+
+    embedding = await generate_embedding_async(query)
+    chunks = await find_similar_chunks_async(query, query_embedding=embedding)
+    return chunks, embedding
+
+
+def _format_answer(answer: Optional[str]) -> Optional[str]:
+    """
+    설정에 따라 모델 응답의 마크다운 표를 서버에서 정렬합니다.
+    """
+    if not settings.ANSWER_TABLE_FORMATTING_ENABLED:
+        return answer
+    return format_tables(answer)
+
+
+def _record_prompt_usage(
+    system_key: str,
+    query: str,
+    context_tokens: int,
+    answer: Optional[str],
+    usage,
+    started_at: float,
+    stream: bool = False,
+):
+    """
+    LLM 호출 한 번의 프롬프트 구성별 토큰 수와 API 사용량(프롬프트 캐시 적중 포함)을 기록합니다.
+    """
+    record_llm_call(
+        system_key,
+        {
+            "system_tokens": get_prompt_registry().token_count(system_key),
+            "context_tokens": context_tokens,
+            "query_tokens": count_tokens(query),
+            "answer_tokens": count_tokens(answer or ""),
+        },
+        usage,
+        stream=stream,
+        latency_ms=round((time.perf_counter() - started_at) * 1000, 1),
+    )
+
+
+def _compress(query: str, embedding: List[float], chunks: List[Dict]) -> List[Dict]:
+    """
+    컨텍스트 압축이 켜져 있으면 청크마다 질의와 관련도가 높은 문장만 남깁니다.
+    """
+    if not settings.CONTEXT_COMPRESSION_ENABLED or not chunks:
+        return chunks
+    try:
+        return compress_chunks(embedding or generate_embedding(query), chunks)
+    except Exception as e:
+        # 압축에 실패하면 원래 청크로 응답
+        print(f"컨텍스트 압축 중 오류 발생: {str(e)}")
+        return chunks
+
+
+async def _compress_async(
+    query: str, embedding: List[float], chunks: List[Dict]
+) -> List[Dict]:
+    """
+    _compress의 비동기 버전입니다.
+    """
+    if not settings.CONTEXT_COMPRESSION_ENABLED or not chunks:
+        return chunks
+    return await asyncio.to_thread(_compress, query, embedding, chunks)
+
+
+def _lookup_semantic_cache(
+    embedding: List[float], chunks: List[Dict], system_key: str
+) -> Optional[Dict]:
+    if not embedding or not chunks:
+        return None
+    return _semantic_cache.lookup(
+        embedding, [chunk["id"] for chunk in chunks], make_semantic_cache_scope(system_key)
+    )
+
+
+def _store_semantic_cache(
+    embedding: List[float], chunks: List[Dict], system_key: str, result: Dict
+):
+    if not embedding or not chunks:
+        return
+    _semantic_cache.add(
+        embedding,
+        [chunk["id"] for chunk in chunks],
+        make_semantic_cache_scope(system_key),
+        result,
+    )
+
+
+def _generate_answer(query: str, system_key: str) -> Dict:
+    """
+    검색과 LLM 호출을 수행해 응답과 출처 제목을 반환합니다. 오류는 호출자에게 전달됩니다.
+    """
+    # 1. 관련 청크 검색
+    similar_chunks, embedding = _retrieve(query)
+
+    # 검색 결과가 없는 경우
+    if not similar_chunks:
+        return {"answer": NO_RESULT_MESSAGE, "sources": []}
+
+    # 2. 의미 캐시 확인
+    cached = _lookup_semantic_cache(embedding, similar_chunks, system_key)
+    if cached is not None:
+        return cached
+
+    # 3. 검색된 청크로부터 컨텍스트 구성 (설정 시 관련 문장만 남김)
+    context, context_tokens = pack_context_from_chunks(
+        _compress(query, embedding, similar_chunks)
+    )
+
+    # 4. 메시지 구성
+    messages = build_rag_messages(query, context, system_key)
+
+    # 5. LLM으로 응답 생성
+    client = get_openai_client()
+    started_at = time.perf_counter()
+    response = client.chat.completions.create(
+        model=settings.LLM_MODEL,
+        messages=messages,
+        temperature=0.3,
+        max_tokens=1000,
+    )
+    answer = response.choices[0].message.content
+    _record_prompt_usage(
+        system_key, query, context_tokens, answer, response.usage, started_at
+    )
+
+    result = {
+        "answer": _format_answer(answer),
+        "sources": [chunk["title"] for chunk in similar_chunks],
+    }
+    _store_semantic_cache(embedding, similar_chunks, system_key, result)
+    return result
+
+
+async def _generate_answer_async(query: str, system_key: str) -> Dict:
+    """
+    _generate_answer의 비동기 버전입니다.
+    """
+    # 1. 관련 청크 검색
+    similar_chunks, embedding = await _retrieve_async(query)
+
+    # 검색 결과가 없는 경우
+    if not similar_chunks:
+        return {"answer": NO_RESULT_MESSAGE, "sources": []}
+
+    # 2. 의미 캐시 확인
+    cached = _lookup_semantic_cache(embedding, similar_chunks, system_key)
+    if cached is not None:
+        return cached
+
+    # 3. 검색된 청크로부터 컨텍스트 구성 (설정 시 관련 문장만 남김)
+    context_chunks = await _compress_async(query, embedding, similar_chunks)
+    context, context_tokens = pack_context_from_chunks(context_chunks)
+
+    # 4. 메시지 구성
+    messages = build_rag_messages(query, context, system_key)
+
+    # 5. LLM으로 응답 생성
+    client = get_async_openai_client()
+    started_at = time.perf_counter()
+    response = await client.chat.completions.create(
+        model=settings.LLM_MODEL,
+        messages=messages,
+        temperature=0.3,
+        max_tokens=1000,
+    )
+    answer = response.choices[0].message.content
+    _record_prompt_usage(
+        system_key, query, context_tokens, answer, response.usage, started_at
+    )
+
+    result = {
+        "answer": _format_answer(answer),
+        "sources": [chunk["title"] for chunk in similar_chunks],
+    }
+    _store_semantic_cache(embedding, similar_chunks, system_key, result)
+    return result
+
+
 def generate_rag_response(query: str, system_key: str = "rag") -> str:
     """
     RAG 접근 방식을 사용하여 사용자 쿼리에 응답을 생성합니다.
 
+    같은 질문의 응답은 캐시에서 바로 반환하며, 같은 질문이 동시에 여러 번 들어오면
+    LLM 호출은 한 번만 수행하고 그 결과를 공유합니다.
+
     Args:
         query (str): 사용자 쿼리
         system_key (str, optional): 시스템 프롬프트 키. 기본값은 "rag".
@@ -99,36 +573,258 @@ def generate_rag_response(query: str, system_key: str = "rag") -> str:
         str: 생성된 응답
     """
     try:
-        # 1. 관련 청크 검색
-        similar_chunks = find_similar_chunks(query)
+        if not settings.ANSWER_CACHE_ENABLED:
+            return _generate_answer(query, system_key)["answer"]
 
-        # 검색 결과가 없는 경우
-        if not similar_chunks:
-            return "죄송합니다. 질문에 관련된 정보를 찾을 수 없습니다."
+        key = make_answer_cache_key(query, system_key)
+        result = _answer_cache.get(key)
+        if result is None:
+
+            def generate_and_cache():
+                result = _generate_answer(query, system_key)
+                _answer_cache.set(key, result)
+                return result
+
+            result = _answer_flight.run(key, generate_and_cache)
+
+        return result["answer"]
+
+    except Exception as e:
+        print(f"응답 생성 중 오류 발생: {str(e)}")
+        return f"죄송합니다. 응답을 생성하는 중에 오류가 발생했습니다: {str(e)}"
+
+
+async def generate_rag_response_async(query: str, system_key: str = "rag") -> str:
+    """
+    generate_rag_response의 비동기 버전입니다.
 
-        # 2. 검색된 청크로부터 컨텍스트 구성
-        context = format_context_from_chunks(similar_chunks)
+    검색은 워커 스레드에서, LLM 호출은 AsyncOpenAI 클라이언트로 수행하므로
+    하나의 uvicorn 워커가 여러 채팅 요청을 동시에 처리할 수 있습니다.
 
-        # 3. 프롬프트 로드
-        prompts = load_prompts()
+    Args:
+        query (str): 사용자 쿼리
+        system_key (str, optional): 시스템 프롬프트 키. 기본값은 "rag".
+
+    Returns:
+        str: 생성된 응답
+    """
+    try:
+        if not settings.ANSWER_CACHE_ENABLED:
+            return (await _generate_answer_async(query, system_key))["answer"]
+
+        key = make_answer_cache_key(query, system_key)
+        result = _answer_cache.get(key)
+        if result is None:
+
+            async def generate_and_cache():
+                result = await _generate_answer_async(query, system_key)
+                _answer_cache.set(key, result)
+                return result
+
+            result = await _answer_flight_async.run(key, generate_and_cache)
+
+        return result["answer"]
+
+    except Exception as e:
+        print(f"응답 생성 중 오류 발생: {str(e)}")
+        return f"죄송합니다. 응답을 생성하는 중에 오류가 발생했습니다: {str(e)}"
+
+
+async def stream_rag_response(
+    query: str, system_key: str = "rag"
+) -> AsyncIterator[Dict]:
+    """
+    RAG 응답을 토큰 단위로 스트리밍하는 비동기 제너레이터입니다.
+
+    다음 순서로 이벤트를 생성합니다.
+    1. "sources": 검색된 청크의 제목 목록
+    2. "delta": LLM이 생성한 응답 조각 (여러 번)
+    3. "done": 토큰 사용량, 캐시 사용 여부, 컨텍스트 토큰 수와 단계별 소요 시간(ms)
+    오류가 발생하면 "error" 이벤트를 보내고 종료합니다.
+
+    캐시된 응답이 있거나 같은 질문을 처리 중인 비스트리밍 요청이 있으면 그 결과를 한 번에 보냅니다.
+    같은 질문의 스트리밍 요청이 동시에 여러 번 들어오면 LLM 호출은 한 번만 수행하고,
+    나중에 들어온 요청은 먼저 들어온 요청의 이벤트를 처음부터 재생하여 받습니다.
+
+    Args:
+        query (str): 사용자 쿼리
+        system_key (str, optional): 시스템 프롬프트 키. 기본값은 "rag".
 
-        # 4. LLM으로 응답 생성
-        client = get_openai_client()
-        response = client.chat.completions.create(
+    Yields:
+        Dict: {"event": 이벤트 이름, "data": 이벤트 데이터} 형태의 딕셔너리
+    """
+    started_at = time.perf_counter()
+
+    if not settings.ANSWER_CACHE_ENABLED:
+        async for event in _stream_answer(query, system_key, None):
+            yield event
+        return
+
+    try:
+        # 0. 응답 캐시 확인
+        key = make_answer_cache_key(query, system_key)
+        cached = _answer_cache.get(key)
+        if cached is None and key not in _answer_stream_flight:
+            cached = await _answer_flight_async.wait(key)
+    except Exception as e:
+        print(f"스트리밍 응답 생성 중 오류 발생: {str(e)}")
+        yield {
+            "event": "error",
+            "data": {"message": f"응답을 생성하는 중에 오류가 발생했습니다: {str(e)}"},
+        }
+        return
+
+    if cached is not None:
+        yield {"event": "sources", "data": {"sources": cached["sources"]}}
+        yield {"event": "delta", "data": {"content": cached["answer"]}}
+        yield {
+            "event": "done",
+            "data": {
+                "usage": None,
+                "cached": True,
+                "timing": {
+                    "total_ms": round((time.perf_counter() - started_at) * 1000, 1)
+                },
+            },
+        }
+        return
+
+    # 같은 질문의 스트림이 진행 중이면 그 이벤트를 재생하고, 없으면 새로 시작
+    async for event in _answer_stream_flight.subscribe(
+        key, lambda: _stream_answer(query, system_key, key)
+    ):
+        yield event
+
+
+async def _stream_answer(
+    query: str, system_key: str, key: Optional[Tuple]
+) -> AsyncIterator[Dict]:
+    """
+    검색과 LLM 스트리밍 호출을 수행해 stream_rag_response의 이벤트를 생성합니다.
+    끝까지 생성된 응답은 key가 있으면 응답 캐시에 저장합니다.
+    """
+    started_at = time.perf_counter()
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started_at) * 1000, 1)
+
+    try:
+        # 1. 관련 청크 검색
+        similar_chunks, embedding = await _retrieve_async(query)
+        retrieval_ms = elapsed_ms()
+        sources = [chunk["title"] for chunk in similar_chunks]
+
+        yield {"event": "sources", "data": {"sources": sources}}
+
+        # 의미 캐시에 같은 문서로 답한 비슷한 질문이 있으면 그 응답을 사용
+        cached = _lookup_semantic_cache(embedding, similar_chunks, system_key)
+        if cached is not None:
+            if key is not None:
+                _answer_cache.set(key, cached)
+            yield {"event": "delta", "data": {"content": cached["answer"]}}
+            yield {
+                "event": "done",
+                "data": {
+                    "usage": None,
+                    "cached": True,
+                    "timing": {"retrieval_ms": retrieval_ms, "total_ms": elapsed_ms()},
+                },
+            }
+            return
+
+        # 검색 결과가 없는 경우
+        if not similar_chunks:
+            yield {"event": "delta", "data": {"content": NO_RESULT_MESSAGE}}
+            yield {
+                "event": "done",
+                "data": {
+                    "usage": None,
+                    "cached": False,
+                    "timing": {"retrieval_ms": retrieval_ms, "total_ms": elapsed_ms()},
+                },
+            }
+            return
+
+        # 2. 컨텍스트 및 메시지 구성
+        context_chunks = await _compress_async(query, embedding, similar_chunks)
+        context, context_tokens = pack_context_from_chunks(context_chunks)
+        messages = build_rag_messages(query, context, system_key)
+
+        # 3. LLM 응답 스트리밍
+        client = get_async_openai_client()
+        llm_started_at = time.perf_counter()
+        stream = await client.chat.completions.create(
             model=settings.LLM_MODEL,
-            messages=[
-                {"role": "system", "content": prompts["system_prompts"][system_key]},
-                {"role": "user", "content": f"컨텍스트: {context}\n\n질문: {query}"},
-            ],
+            messages=messages,
             temperature=0.3,
             max_tokens=1000,
+            stream=True,
+            stream_options={"include_usage": True},
         )
 
-        return response.choices[0].message.content
+        usage = None
+        first_token_ms = None
+        answer_parts = []
+        # 표는 마지막 행까지 받은 뒤 정렬하여 내보내고, 나머지 텍스트는 바로 내보냄
+        formatter = (
+            IncrementalTableFormatter() if settings.ANSWER_TABLE_FORMATTING_ENABLED else None
+        )
+        async for event in stream:
+            # include_usage 옵션의 마지막 청크는 choices가 비어 있고 usage만 포함합니다
+            if event.usage is not None:
+                usage = event.usage.model_dump()
+            if not event.choices:
+                continue
+
+            content = event.choices[0].delta.content
+            if content and formatter is not None:
+                content = formatter.feed(content)
+            if content:
+                if first_token_ms is None:
+                    first_token_ms = elapsed_ms()
+                answer_parts.append(content)
+                yield {"event": "delta", "data": {"content": content}}
+
+        remaining = formatter.flush() if formatter is not None else ""
+        if remaining:
+            answer_parts.append(remaining)
+            yield {"event": "delta", "data": {"content": remaining}}
+
+        # 끝까지 스트리밍된 응답만 캐시에 저장
+        result = {"answer": "".join(answer_parts), "sources": sources}
+        _record_prompt_usage(
+            system_key,
+            query,
+            context_tokens,
+            result["answer"],
+            usage,
+            llm_started_at,
+            stream=True,
+        )
+        if key is not None:
+            _answer_cache.set(key, result)
+        _store_semantic_cache(embedding, similar_chunks, system_key, result)
+
+        yield {
+            "event": "done",
+            "data": {
+                "usage": usage,
+                "cached": False,
+                "context_tokens": context_tokens,
+                "timing": {
+                    "retrieval_ms": retrieval_ms,
+                    "first_token_ms": first_token_ms,
+                    "total_ms": elapsed_ms(),
+                },
+            },
+        }
 
     except Exception as e:
-        print(f"응답 생성 중 오류 발생: {str(e)}")
-        return f"죄송합니다. 응답을 생성하는 중에 오류가 발생했습니다: {str(e)}"
+        print(f"스트리밍 응답 생성 중 오류 발생: {str(e)}")
+        yield {
+            "event": "error",
+            "data": {"message": f"응답을 생성하는 중에 오류가 발생했습니다: {str(e)}"},
+        }
 
 
 def chat_interface():
@@ -140,8 +836,7 @@ def chat_interface():
     print("-" * 50)
 
     # ChromaDB 확인
-    collection = get_or_create_collection()
-    count = collection.count()
+    count = get_collection_count()
 
     if count > 0:
         print(f"ChromaDB에서 {count}개의 청크가 로드되었습니다.")
@@ -0,0 +1,340 @@
+"""
+임베딩 벡터 저장 파일 형식
+
+임베딩을 JSON 텍스트 대신 바이너리로 저장하여 파일 크기를 줄이고, 메모리 매핑으로
+복사 없이 바로 불러올 수 있도록 합니다. 하나의 벡터 저장소는 다음 세 파일로 구성됩니다.
+
+- <base>.<generation>.vectors.npy: (청크 수, 차원) 크기의 float32 또는 float16 임베딩 행렬
+- <base>.<generation>.contents.bin: 청크 내용을 UTF-8로 이어 붙인 바이트열
+- <base>.meta.json: 형식/버전 헤더, 세대(generation) ID와 데이터 파일 이름,
+  청크 ID와 메타데이터, contents.bin의 바이트 오프셋
+
+저장할 때마다 새 세대 ID로 데이터 파일을 새로 쓰고, 다 쓴 뒤 그 파일을 가리키는 메타데이터
+파일 하나만 원자적으로 교체합니다. 데이터 파일은 쓰고 나면 바뀌지 않으므로, 읽는 쪽은
+메타데이터와 같은 세대의 데이터 파일만 엽니다. 직전 세대의 파일은 교체 직전에 메타데이터를
+읽은 쪽을 위해 남겨 두고, 그보다 오래된 세대는 삭제합니다.
+"""
+
+import glob
+import json
+import mmap
+import os
+import sys
+import tempfile
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+VECTOR_FILE_FORMAT = "hufs-ragbot-vectors"
+# 버전 2부터 데이터 파일 이름에 세대 ID가 붙습니다. (버전 1 파일도 읽을 수 있음)
+VECTOR_FILE_VERSION = 2
+SUPPORTED_DTYPES = ("float32", "float16")
+
+
+def vector_file_paths(path: str, generation: Optional[str] = None) -> Dict[str, str]:
+    """
+    벡터 저장소 경로로부터 구성 파일 경로를 만듭니다.
+    기존 JSON 파일 경로(예: data/vector_store.json)를 그대로 넘겨도 됩니다.
+
+    Args:
+        path (str): 벡터 저장소 경로 (확장자 .json은 무시)
+        generation (str, optional): 데이터 파일의 세대 ID. 없으면 버전 1의 파일 이름을 반환합니다.
+
+    Returns:
+        Dict[str, str]: embeddings, contents, metadata 파일 경로
+    """
+    base = path[: -len(".json")] if path.endswith(".json") else path
+    data_base = f"{base}.{generation}" if generation else base
+    return {
+        "embeddings": f"{data_base}.vectors.npy",
+        "contents": f"{data_base}.contents.bin",
+        "metadata": f"{base}.meta.json",
+    }
+
+
+def vector_file_exists(path: str) -> bool:
+    """
+    바이너리 형식의 벡터 저장소가 있는지 확인합니다.
+
+    Args:
+        path (str): 벡터 저장소 경로
+
+    Returns:
+        bool: 메타데이터 파일이 있으면 True
+    """
+    return os.path.exists(vector_file_paths(path)["metadata"])
+
+
+def _replace_atomically(path: str, write):
+    """
+    같은 디렉토리의 고유한 임시 파일에 쓴 뒤 os.replace로 교체합니다.
+    여러 프로세스가 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않습니다.
+    """
+    directory, name = os.path.split(path)
+    with tempfile.NamedTemporaryFile(
+        dir=directory or ".", prefix=name + ".", suffix=".tmp", delete=False
+    ) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def _read_generation(metadata_path: str) -> Optional[str]:
+    """현재 메타데이터 파일이 가리키는 세대 ID를 반환합니다. 없으면 None을 반환합니다."""
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("generation")
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _remove_old_generations(path: str, keep: Sequence[Optional[str]]):
+    """keep에 없는 세대의 데이터 파일을 삭제합니다."""
+    base = vector_file_paths(path)["metadata"][: -len(".meta.json")]
+    keep_paths = set()
+    for generation in keep:
+        if generation:
+            keep_paths.update(
+                os.path.abspath(p) for p in vector_file_paths(path, generation).values()
+            )
+
+    for suffix in (".vectors.npy", ".contents.bin"):
+        for file_path in glob.glob(f"{glob.escape(base)}.*{suffix}"):
+            if os.path.abspath(file_path) not in keep_paths:
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+
+
+def save_vector_file(
+    path: str,
+    embeddings,
+    documents: Sequence[str],
+    metadatas: Sequence[Dict],
+    ids: Optional[Sequence[str]] = None,
+    dtype: str = "float32",
+    header: Optional[Dict[str, Any]] = None,
+):
+    """
+    임베딩과 청크 정보를 바이너리 벡터 저장소 형식으로 저장합니다.
+
+    Args:
+        path (str): 벡터 저장소 경로
+        embeddings: (청크 수, 차원) 크기의 임베딩 행렬
+        documents (Sequence[str]): 청크 내용 목록
+        metadatas (Sequence[Dict]): 청크 메타데이터 목록
+        ids (Sequence[str], optional): 청크 ID 목록
+        dtype (str, optional): 임베딩 저장 형식 ("float32" 또는 "float16"). 기본값은 "float32".
+        header (Dict[str, Any], optional): 헤더에 함께 기록할 값 (예: 원본 컬렉션 이름)
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"지원하지 않는 임베딩 형식입니다: {dtype}")
+
+    matrix = np.ascontiguousarray(embeddings, dtype=dtype)
+    if matrix.ndim != 2 or matrix.shape[0] != len(documents):
+        raise ValueError("임베딩 행렬의 크기가 청크 수와 일치하지 않습니다.")
+
+    generation = uuid.uuid4().hex[:16]
+    paths = vector_file_paths(path, generation)
+    os.makedirs(os.path.dirname(paths["metadata"]) or ".", exist_ok=True)
+    previous_generation = _read_generation(paths["metadata"])
+
+    encoded = [document.encode("utf-8") for document in documents]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+
+    # 새 세대의 데이터 파일을 모두 쓴 뒤 메타데이터 파일을 교체
+    _replace_atomically(paths["embeddings"], lambda f: np.save(f, matrix))
+    _replace_atomically(paths["contents"], lambda f: f.writelines(encoded))
+
+    metadata = {
+        **(header or {}),
+        "format": VECTOR_FILE_FORMAT,
+        "version": VECTOR_FILE_VERSION,
+        "generation": generation,
+        "dtype": dtype,
+        "count": int(matrix.shape[0]),
+        "dimensions": int(matrix.shape[1]),
+        "offsets": offsets.tolist(),
+        "ids": list(ids) if ids is not None else None,
+        "metadatas": list(metadatas),
+    }
+    _replace_atomically(
+        paths["metadata"],
+        lambda f: f.write(json.dumps(metadata, ensure_ascii=False).encode("utf-8")),
+    )
+    _remove_old_generations(path, keep=[generation, previous_generation])
+
+
+def load_vector_file(path: str, mmap_mode: bool = True) -> Dict[str, Any]:
+    """
+    바이너리 벡터 저장소를 불러옵니다. 임베딩 행렬은 메모리 매핑으로 열어 복사하지 않습니다.
+    데이터 파일은 메타데이터에 기록된 세대의 파일을 사용합니다.
+
+    Args:
+        path (str): 벡터 저장소 경로
+        mmap_mode (bool, optional): 임베딩 행렬을 메모리 매핑으로 열지 여부. 기본값은 True.
+
+    Returns:
+        Dict[str, Any]: header, ids, embeddings, documents, metadatas를 포함한 딕셔너리
+    """
+    with open(vector_file_paths(path)["metadata"], "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    paths = vector_file_paths(path, metadata.get("generation"))
+
+    if metadata.get("format") != VECTOR_FILE_FORMAT:
+        raise ValueError(f"벡터 저장소 파일 형식이 아닙니다: {paths['metadata']}")
+    if metadata.get("version", 0) > VECTOR_FILE_VERSION:
+        raise ValueError(
+            f"지원하지 않는 벡터 저장소 버전입니다: {metadata.get('version')} "
+            f"(지원: {VECTOR_FILE_VERSION} 이하)"
+        )
+
+    embeddings = np.load(paths["embeddings"], mmap_mode="r" if mmap_mode else None)
+    if embeddings.shape != (metadata["count"], metadata["dimensions"]):
+        raise ValueError(f"임베딩 행렬 크기가 헤더와 일치하지 않습니다: {embeddings.shape}")
+
+    offsets = metadata.pop("offsets")
+    documents = []
+    if metadata["count"] and offsets[-1]:
+        with open(paths["contents"], "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+                documents = [
+                    contents[start:end].decode("utf-8")
+                    for start, end in zip(offsets, offsets[1:])
+                ]
+    else:
+        documents = [""] * metadata["count"]
+
+    ids = metadata.pop("ids")
+    metadatas = metadata.pop("metadatas")
+    return {
+        "header": metadata,
+        "ids": ids,
+        "embeddings": embeddings,
+        "documents": documents,
+        "metadatas": metadatas,
+    }
+
+
+def save_vector_chunks(path: str, chunks: List[Dict], dtype: str = "float32"):
+    """
+    'embedding' 필드가 포함된 청크 목록(기존 JSON 벡터 저장소 형식)을 바이너리 형식으로 저장합니다.
+
+    Args:
+        path (str): 벡터 저장소 경로
+        chunks (List[Dict]): title, content, source, embedding을 포함한 청크 목록
+        dtype (str, optional): 임베딩 저장 형식. 기본값은 "float32".
+    """
+    save_vector_file(
+        path,
+        embedding_matrix([chunk.get("embedding") for chunk in chunks]),
+        [chunk["content"] for chunk in chunks],
+        [
+            {"title": chunk["title"], "source": chunk.get("source", "출처 미상")}
+            for chunk in chunks
+        ],
+        ids=[chunk["id"] for chunk in chunks] if all("id" in c for c in chunks) else None,
+        dtype=dtype,
+    )
+
+
+def load_vector_chunks(path: str, mmap_mode: bool = True) -> List[Dict]:
+    """
+    바이너리 벡터 저장소를 기존 JSON 벡터 저장소와 같은 청크 목록 형태로 불러옵니다.
+    각 청크의 'embedding'은 메모리 매핑된 행렬의 행(복사 없는 뷰)입니다.
+
+    Args:
+        path (str): 벡터 저장소 경로
+        mmap_mode (bool, optional): 임베딩 행렬을 메모리 매핑으로 열지 여부. 기본값은 True.
+
+    Returns:
+        List[Dict]: title, content, source, embedding을 포함한 청크 목록
+    """
+    return vector_chunks(load_vector_file(path, mmap_mode=mmap_mode))
+
+
+def vector_chunks(records: Dict[str, Any]) -> List[Dict]:
+    """
+    load_vector_file로 불러온 레코드를 기존 JSON 벡터 저장소와 같은 청크 목록 형태로 바꿉니다.
+    각 청크의 'embedding'은 레코드 임베딩 행렬의 행(복사 없는 뷰)입니다.
+
+    Args:
+        records (Dict[str, Any]): load_vector_file의 반환값
+
+    Returns:
+        List[Dict]: title, content, source, embedding을 포함한 청크 목록
+    """
+    ids = records["ids"] or [None] * len(records["documents"])
+
+    chunks = []
+    for i, (chunk_id, document, metadata) in enumerate(
+        zip(ids, records["documents"], records["metadatas"])
+    ):
+        chunk = {
+            "title": metadata.get("title", "제목 없음"),
+            "content": document,
+            "source": metadata.get("source", "출처 미상"),
+            "embedding": records["embeddings"][i],
+        }
+        if chunk_id is not None:
+            chunk["id"] = chunk_id
+        chunks.append(chunk)
+    return chunks
+
+
+def convert_json_vector_store(
+    json_file: str, output_path: Optional[str] = None, dtype: str = "float32"
+) -> str:
+    """
+    기존 JSON 벡터 저장소(title, content, source, embedding 목록)를 바이너리 형식으로 변환합니다.
+
+    Args:
+        json_file (str): 기존 JSON 벡터 저장소 경로
+        output_path (str, optional): 저장할 벡터 저장소 경로. 기본값은 json_file과 같은 이름.
+        dtype (str, optional): 임베딩 저장 형식. 기본값은 "float32".
+
+    Returns:
+        str: 저장한 벡터 저장소 경로
+    """
+    if output_path is None:
+        output_path = json_file
+
+    with open(json_file, "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+
+    save_vector_chunks(output_path, chunks, dtype=dtype)
+    print(f"{json_file} -> {vector_file_paths(output_path)['metadata']} 변환 완료: {len(chunks)} 청크")
+    return output_path
+
+
+def embedding_matrix(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    임베딩 목록을 float32 행렬로 만듭니다. 생성에 실패한 빈 임베딩은 0 벡터로 채웁니다.
+
+    Args:
+        embeddings (Sequence[Sequence[float]]): 임베딩 목록
+
+    Returns:
+        np.ndarray: (청크 수, 차원) 크기의 행렬
+    """
+    dimensions = max((len(e) for e in embeddings if e is not None), default=0)
+    matrix = np.zeros((len(embeddings), dimensions), dtype=np.float32)
+    for i, embedding in enumerate(embeddings):
+        if embedding is not None and len(embedding) == dimensions:
+            matrix[i] = embedding
+    return matrix
+
+
+if __name__ == "__main__":
+    # 사용법: python -m app.services.vector_file data/vector_store.json [float16]
+    if len(sys.argv) < 2:
+        print("사용법: python -m app.services.vector_file <JSON 벡터 저장소> [float32|float16]")
+        sys.exit(1)
+    convert_json_vector_store(sys.argv[1], dtype=sys.argv[2] if len(sys.argv) > 2 else "float32")
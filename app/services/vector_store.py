@@ -0,0 +1,111 @@
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, runtime_checkable
+
+from app.core.config import settings
+
+
+@runtime_checkable
+class VectorStore(Protocol):
+    """
+    검색 백엔드가 구현해야 하는 공통 인터페이스
+
+    임베딩은 호출하는 쪽에서 만들어 전달하며(embed_texts), 검색 결과는
+    id/title/content/source/score(코사인 유사도) 키를 가진 청크 딕셔너리 목록입니다.
+    """
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ) -> None:
+        """새 청크를 추가합니다. 이미 있는 ID이면 ValueError를 발생시킵니다."""
+        ...
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ) -> None:
+        """청크를 추가하거나, 같은 ID가 있으면 교체합니다."""
+        ...
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """ID에 해당하는 청크를 삭제합니다. 없는 ID는 무시합니다."""
+        ...
+
+    def query(self, query_embedding: Sequence[float], top_k: int = 3) -> List[Dict]:
+        """쿼리 임베딩과 가장 유사한 청크 top_k개를 유사도 내림차순으로 반환합니다."""
+        ...
+
+    def query_batch(self, query_embeddings, top_k: int = 3) -> List[List[Dict]]:
+        """여러 쿼리 임베딩을 한 번에 검색합니다. 결과 순서는 입력 순서와 같습니다."""
+        ...
+
+    def count(self) -> int:
+        """저장된 청크 수를 반환합니다."""
+        ...
+
+
+# 검색 백엔드 이름 -> 서빙 컬렉션으로 벡터 저장소를 만드는(또는 캐시에서 가져오는) 함수
+VectorStoreFactory = Callable[[Any], VectorStore]
+_vector_store_factories: Dict[str, VectorStoreFactory] = {}
+
+
+def register_vector_store(name: str, factory: VectorStoreFactory):
+    """
+    검색 백엔드를 등록합니다. 등록한 이름을 RETRIEVAL_BACKEND 설정으로 선택할 수 있습니다.
+
+    Args:
+        name (str): 백엔드 이름
+        factory (VectorStoreFactory): ChromaDB 컬렉션을 받아 VectorStore를 반환하는 함수
+    """
+    _vector_store_factories[name] = factory
+
+
+def list_vector_stores() -> List[str]:
+    """
+    등록된 검색 백엔드 이름 목록을 반환합니다.
+
+    Returns:
+        List[str]: 백엔드 이름 목록
+    """
+    return list(_vector_store_factories)
+
+
+def get_vector_store(collection, backend: Optional[str] = None) -> VectorStore:
+    """
+    서빙 컬렉션에 대한 벡터 저장소를 반환합니다.
+
+    Args:
+        collection (chromadb.Collection): 서빙 중인 ChromaDB 컬렉션
+        backend (str, optional): 백엔드 이름. 기본값은 설정의 RETRIEVAL_BACKEND.
+
+    Returns:
+        VectorStore: 벡터 저장소
+    """
+    if backend is None:
+        backend = settings.RETRIEVAL_BACKEND
+
+    factory = _vector_store_factories.get(backend)
+    if factory is None:
+        raise ValueError(
+            f"알 수 없는 검색 백엔드입니다: {backend} "
+            f"(사용 가능: {', '.join(list_vector_stores())})"
+        )
+    return factory(collection)
+
+
+def _register_builtin_vector_stores():
+    from app.services.chroma_store import ChromaVectorStore
+    from app.services.faiss_store import get_faiss_store
+    from app.services.numpy_store import get_numpy_store
+
+    register_vector_store("chroma", ChromaVectorStore)
+    register_vector_store("numpy", get_numpy_store)
+    register_vector_store("faiss", get_faiss_store)
+
+
+_register_builtin_vector_stores()
@@ -26,54 +26,92 @@ document.addEventListener('DOMContentLoaded', function() {
         chatMessages.scrollTop = chatMessages.scrollHeight;
     }
 
-    async function addBotTypingEffectWithTable(text) {
-        const wrapper = document.createElement('div');
-        wrapper.classList.add('message-wrapper', 'bot');
-        const messageDiv = document.createElement('div');
-        messageDiv.classList.add('message', 'bot-message', 'markdown');
-        wrapper.appendChild(messageDiv);
-        chatMessages.insertBefore(wrapper, typingIndicator);
-
-        // 1. 코드블록(표) 구간 분리
+    function renderBotMarkdown(messageDiv, text) {
+        // ```markdown 코드블록(표)은 가로 스크롤 영역으로 감싸고, 나머지는 그대로 마크다운 렌더링
         const codeblockRegex = /```markdown([\s\S]*?)```/g;
         let lastIdx = 0, match;
-        let fragments = [];
+        let html = '';
 
-        // codeblock 외의 문단과 표를 분리해서 배열에 담기
         while ((match = codeblockRegex.exec(text)) !== null) {
             if (lastIdx < match.index) {
-                // 코드블록 앞의 텍스트
-                fragments.push({ type: "text", content: text.slice(lastIdx, match.index) });
+                html += marked.parse(text.slice(lastIdx, match.index));
             }
-            // 코드블록(표) 자체
-            fragments.push({ type: "table", content: match[1]});
+            html += `<div class="table-scroll">${marked.parse(match[1])}</div>`;
             lastIdx = codeblockRegex.lastIndex;
         }
         if (lastIdx < text.length) {
-            fragments.push({ type: "text", content: text.slice(lastIdx) });
+            html += marked.parse(text.slice(lastIdx));
         }
 
-        // 2. 실제 타이핑 효과 적용
-        let html = '';
-        for (let frag of fragments) {
-            if (frag.type === "table") {
-                // 표(코드블록)는 한 번에 출력
-                const tableHTML = marked.parse(frag.content);
-                html += `<div class="table-scroll">${tableHTML}</div>`;
-                messageDiv.innerHTML = html;
-                chatMessages.scrollTop = chatMessages.scrollHeight;
-            } else {
-                // 일반 텍스트(문단/목록)는 한글자씩 출력
-                for (let i = 0; i < frag.content.length; i++) {
-                    html += frag.content[i];
-                    messageDiv.innerHTML = marked.parse(html);
-                    chatMessages.scrollTop = chatMessages.scrollHeight;
-                    await new Promise(res => setTimeout(res, 13)); // 타이핑 속도 (조절 가능)
+        messageDiv.innerHTML = html;
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    }
+
+    function createBotMessage() {
+        const wrapper = document.createElement('div');
+        wrapper.classList.add('message-wrapper', 'bot');
+        const messageDiv = document.createElement('div');
+        messageDiv.classList.add('message', 'bot-message', 'markdown');
+        wrapper.appendChild(messageDiv);
+        chatMessages.insertBefore(wrapper, typingIndicator);
+        return messageDiv;
+    }
+
+    async function streamBotResponse(response) {
+        // text/event-stream 응답을 읽으며 delta 이벤트를 화면에 이어 붙입니다.
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let messageDiv = null;
+        let renderScheduled = false;
+
+        // 토큰마다 전체를 다시 그리지 않도록 프레임당 한 번만 렌더링
+        function scheduleRender() {
+            if (renderScheduled) return;
+            renderScheduled = true;
+            requestAnimationFrame(() => {
+                renderScheduled = false;
+                renderBotMarkdown(messageDiv, text);
+            });
+        }
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let eventName = 'message';
+                let data = '';
+                for (const line of rawEvent.split('\n')) {
+                    if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                }
+                const payload = data ? JSON.parse(data) : {};
+
+                if (eventName === 'delta') {
+                    if (!messageDiv) {
+                        hideTypingIndicator();
+                        messageDiv = createBotMessage();
+                    }
+                    text += payload.content;
+                    scheduleRender();
+                } else if (eventName === 'error') {
+                    throw new Error(payload.message);
                 }
             }
         }
-        messageDiv.innerHTML = marked.parse(html); // 마지막 렌더링(혹시 남은 거 있을 때)
-        chatMessages.scrollTop = chatMessages.scrollHeight;
+
+        if (!messageDiv) {
+            hideTypingIndicator();
+            messageDiv = createBotMessage();
+        }
+        renderBotMarkdown(messageDiv, text); // 마지막 렌더링
     }
 
 
@@ -99,7 +137,7 @@ document.addEventListener('DOMContentLoaded', function() {
             : "https://hufscomchatbot.duckdns.org";
 
         try {
-            const response = await fetch(`${BASE_URL}/api/chat`, {
+            const response = await fetch(`${BASE_URL}/api/chat/stream`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -109,10 +147,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
             if (!response.ok) throw new Error('API 응답 오류');
 
-            const data = await response.json();
-            hideTypingIndicator();
-
-            await addBotTypingEffectWithTable(data.response);
+            await streamBotResponse(response);
 
         } catch (error) {
             console.error('오류 발생:', error);
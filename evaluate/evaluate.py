@@ -107,7 +107,7 @@ def evaluate_rag_system(
     if run_all or run_top_k:
         logger.info("\n1. Top-k 문서 정확도 평가:")
         accuracy_results = evaluate_top_k_accuracy(
-            test_data["queries"], test_data["ground_truth_doc_ids"]
+            test_data["queries"], test_data["ground_truth_sections"]
         )
 
         for k, result in accuracy_results.items():
@@ -150,7 +150,7 @@ def evaluate_rag_system(
     if run_all or run_reranker:
         logger.info("\n3. Reranker 성능 평가:")
         reranker_results = evaluate_reranker_improvement(
-            test_data["queries"], test_data["ground_truth_doc_ids"]
+            test_data["queries"], test_data["ground_truth_sections"]
         )
 
         logger.info(
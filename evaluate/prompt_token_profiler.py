@@ -0,0 +1,211 @@
+"""
+프롬프트 토큰 사용량을 분석하는 모듈
+
+PROMPT_LOG_ENABLED로 기록한 요청 로그(JSONL)를 읽어 시스템 프롬프트 키별로 시스템 프롬프트,
+컨텍스트, 질문, 응답의 토큰 수 분포(평균/p50/p95)와 프롬프트 캐시 적중률을 집계합니다.
+prompts.yaml의 시스템 프롬프트별 토큰 수도 함께 보고하여, 매 호출마다 다시 보내는 고정
+프롬프트가 전체 프롬프트 토큰에서 차지하는 비중을 확인할 수 있습니다.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+
+# 프로젝트 루트를 추가하여 app 모듈에 접근할 수 있도록 합니다
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from app.core.config import settings
+from app.core.prompt_registry import get_prompt_registry
+
+# 분포를 집계할 토큰 항목
+TOKEN_FIELDS = [
+    "system_tokens",
+    "context_tokens",
+    "query_tokens",
+    "answer_tokens",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+]
+
+
+def load_prompt_log(log_file: str) -> List[Dict[str, Any]]:
+    """
+    요청 로그를 읽습니다. 읽을 수 없는 줄은 건너뜁니다.
+
+    Args:
+        log_file (str): 요청 로그(JSONL) 경로
+
+    Returns:
+        List[Dict[str, Any]]: 요청 기록 목록
+    """
+    records = []
+    with open(log_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    값 목록의 합계, 평균, p50, p95를 계산합니다.
+
+    Args:
+        values (List[float]): 값 목록
+
+    Returns:
+        Dict[str, float]: 통계
+    """
+    if not values:
+        return {"total": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0}
+    array = np.asarray(values, dtype=np.float64)
+    return {
+        "total": int(array.sum()),
+        "mean": round(float(array.mean()), 1),
+        "p50": round(float(np.percentile(array, 50)), 1),
+        "p95": round(float(np.percentile(array, 95)), 1),
+    }
+
+
+def profile_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    요청 기록을 시스템 프롬프트 키별로 집계합니다.
+
+    Args:
+        records (List[Dict[str, Any]]): 요청 기록 목록
+
+    Returns:
+        Dict[str, Any]: 키별 토큰 분포와 프롬프트 캐시 통계
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record.get("system_key", "unknown"), []).append(record)
+
+    profile = {}
+    for key, group in sorted(groups.items()):
+        tokens = {
+            field: summarize([record.get(field) or 0 for record in group])
+            for field in TOKEN_FIELDS
+        }
+        prompt_total = tokens["prompt_tokens"]["total"]
+        hits = sum(1 for record in group if record.get("cached_tokens"))
+        profile[key] = {
+            "requests": len(group),
+            "stream_requests": sum(1 for record in group if record.get("stream")),
+            "tokens": tokens,
+            "latency_ms": summarize(
+                [record["latency_ms"] for record in group if record.get("latency_ms") is not None]
+            ),
+            # 프롬프트 중 시스템 프롬프트/컨텍스트가 차지하는 비율
+            "system_share": round(tokens["system_tokens"]["total"] / (prompt_total or 1), 4),
+            "context_share": round(tokens["context_tokens"]["total"] / (prompt_total or 1), 4),
+            # 프롬프트 캐시에 적중한 요청 비율과 캐시된 프롬프트 토큰 비율
+            "cache_hit_rate": round(hits / len(group), 4),
+            "cached_token_ratio": round(
+                tokens["cached_tokens"]["total"] / (prompt_total or 1), 4
+            ),
+        }
+    return profile
+
+
+def run_profile(log_file: str = None) -> Dict[str, Any]:
+    """
+    요청 로그와 prompts.yaml을 분석합니다.
+
+    Args:
+        log_file (str, optional): 요청 로그 경로. 기본값은 settings.PROMPT_LOG_PATH.
+
+    Returns:
+        Dict[str, Any]: 분석 결과
+    """
+    log_file = log_file or settings.PROMPT_LOG_PATH
+    registry = get_prompt_registry()
+
+    results = {
+        "log_file": log_file,
+        "model": settings.LLM_MODEL,
+        "prompt_version": registry.version,
+        # 호출마다 다시 보내는 고정 시스템 프롬프트의 토큰 수
+        "system_prompt_tokens": registry.token_counts,
+        "requests": 0,
+        "profile": {},
+    }
+
+    if not os.path.exists(log_file):
+        print(f"요청 로그가 없습니다: {log_file} (PROMPT_LOG_ENABLED=true로 기록하세요)")
+        return results
+
+    records = load_prompt_log(log_file)
+    results["requests"] = len(records)
+    results["profile"] = profile_records(records)
+
+    print(f"요청 {len(records)}건 분석")
+    for key, stats in results["profile"].items():
+        tokens = stats["tokens"]
+        print(
+            f"  {key}: {stats['requests']}건, "
+            f"시스템 {tokens['system_tokens']['mean']} / "
+            f"컨텍스트 {tokens['context_tokens']['mean']} "
+            f"(p95 {tokens['context_tokens']['p95']}) / "
+            f"응답 {tokens['answer_tokens']['mean']} 토큰, "
+            f"캐시 적중률 {stats['cache_hit_rate']:.1%}, "
+            f"캐시된 프롬프트 토큰 {stats['cached_token_ratio']:.1%}"
+        )
+    return results
+
+
+def save_profile_results(
+    results: Dict[str, Any],
+    output_file: str = "evaluate/evaluation_results/prompt_token_profile.json",
+):
+    """
+    분석 결과를 JSON 파일로 저장합니다.
+
+    Args:
+        results (Dict[str, Any]): 분석 결과
+        output_file (str): 출력 파일 경로
+    """
+    # 디렉토리가 없으면 생성
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print(f"프롬프트 토큰 분석 결과가 {output_file}에 저장되었습니다.")
+
+
+def parse_arguments():
+    """
+    명령줄 인수를 파싱합니다.
+
+    Returns:
+        argparse.Namespace: 파싱된 인수
+    """
+    parser = argparse.ArgumentParser(description="프롬프트 토큰 사용량 분석")
+    parser.add_argument(
+        "--log", type=str, help="요청 로그 경로 (기본값: settings.PROMPT_LOG_PATH)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="evaluate/evaluation_results/prompt_token_profile.json",
+        help="결과 파일 경로",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    profile_results = run_profile(args.log)
+    save_profile_results(profile_results, args.output)
@@ -15,6 +15,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
 from app.services.embeddings import find_similar_chunks
+from evaluate.top_k_accuracy import matches_ground_truth
 
 # 로깅 설정
 logging.basicConfig(
@@ -120,14 +121,14 @@ def improved_search_with_reranker(
 
 
 def evaluate_reranker_improvement(
-    test_queries: List[str], ground_truth_docs: List[List[str]]
+    test_queries: List[str], ground_truth_sections: List[List[Dict[str, str]]]
 ) -> Dict[str, Any]:
     """
     Reranker의 성능 향상을 평가합니다.
 
     Args:
         test_queries (List[str]): 테스트 질의 목록
-        ground_truth_docs (List[List[str]]): 각 질의에 대한 정답 문서 ID 목록
+        ground_truth_sections (List[List[Dict[str, str]]]): 각 질의에 대한 정답 섹션 목록
 
     Returns:
         Dict[str, Any]: 평가 결과
@@ -140,12 +141,20 @@ def evaluate_reranker_improvement(
         # 기존 검색 방식
         standard_docs = find_similar_chunks(query, top_k=3)
         standard_ids = [doc["id"] for doc in standard_docs]
-        standard_hit = any(doc_id in standard_ids for doc_id in ground_truth_docs[i])
+        standard_hit = any(
+            matches_ground_truth(doc, section)
+            for doc in standard_docs
+            for section in ground_truth_sections[i]
+        )
 
         # Reranker 적용 (초기 10개 검색 후 상위 3개 선택)
         reranked_docs = improved_search_with_reranker(query, initial_k=10, final_k=3)
         reranked_ids = [doc["id"] for doc in reranked_docs]
-        reranked_hit = any(doc_id in reranked_ids for doc_id in ground_truth_docs[i])
+        reranked_hit = any(
+            matches_ground_truth(doc, section)
+            for doc in reranked_docs
+            for section in ground_truth_sections[i]
+        )
 
         # 개선 여부 확인
         improved = not standard_hit and reranked_hit
@@ -159,7 +168,7 @@ def evaluate_reranker_improvement(
         results["queries"].append(
             {
                 "query": query,
-                "ground_truth_docs": ground_truth_docs[i],
+                "ground_truth_sections": ground_truth_sections[i],
                 "standard_docs": standard_ids,
                 "reranked_docs": reranked_ids,
                 "standard_hit": standard_hit,
@@ -211,7 +220,7 @@ if __name__ == "__main__":
             test_data = json.load(f)
 
         reranker_results = evaluate_reranker_improvement(
-            test_data["queries"], test_data["ground_truth_doc_ids"]
+            test_data["queries"], test_data["ground_truth_sections"]
         )
 
         # 결과 출력
@@ -14,7 +14,8 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
 from app.services.embeddings import (find_similar_chunks,
-                                     get_or_create_collection)
+                                     find_similar_chunks_batch,
+                                     get_collection_count)
 
 
 def create_test_dataset() -> Dict[str, Any]:
@@ -24,7 +25,7 @@ def create_test_dataset() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: 테스트 데이터셋
     """
-    # 샘플 테스트 데이터 (실제 사용 시에는 이 데이터를 실제 문서 ID와 맞게 수정해야 함)
+    # 샘플 테스트 데이터
     test_data = {
         "queries": [
             "컴퓨터공학과 졸업요건은 어떻게 되나요?",
@@ -38,17 +39,85 @@ def create_test_dataset() -> Dict[str, Any]:
             "컴퓨터공학과 학과장은 누구인가요?",
             "졸업 프로젝트는 어떻게 진행되나요?",
         ],
-        "ground_truth_doc_ids": [
-            ["chunk_1", "chunk_2"],  # 첫 번째 질의에 대한 정답 문서 ID
-            ["chunk_3"],  # 두 번째 질의에 대한 정답 문서 ID
-            ["chunk_4", "chunk_5"],
-            ["chunk_6"],
-            ["chunk_7", "chunk_8"],
-            ["chunk_9"],
-            ["chunk_10", "chunk_11"],
-            ["chunk_12"],
-            ["chunk_13"],
-            ["chunk_14", "chunk_15"],
+        # 정답 섹션: (원본 파일, 섹션 제목). 청크 ID와 달리 재색인이나 청킹 설정 변경에도 유지됩니다.
+        "ground_truth_sections": [
+            [
+                {"source": "학부안내+구성원.md", "title": "졸업 후 진로"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "졸업에 필요한 서류들은 어디에 제출하나요?",
+                },
+                {"source": "라운_수업안내_학사안내_정리.markdown", "title": "졸업요건"},
+            ],
+            [
+                {"source": "라운_수업안내_학사안내_정리.markdown", "title": "이수체계도"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "이중전공과 부전공의 차이는 무엇인가요?",
+                },
+                {"source": "학부안내+구성원.md", "title": "교과영역 및 교과목 안내"},
+            ],
+            [
+                {"source": "학부안내+구성원.md", "title": "오시는 길"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "2025-1학기 실험실습조교 모집 (~2/24)",
+                },
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "신입생대상 코딩존 운영"},
+            ],
+            [
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "신입생대상 코딩존 운영"},
+                {"source": "학부안내+구성원.md", "title": "오시는 길"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "2025 ACPC (AWS x Codetree) 전국 대학생 프로그래밍 경진대회",
+                },
+            ],
+            [
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "정보산업연구소 조교 모집"},
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "장학생은 어떻게 선발하나요?"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "2025-1학기 공로장학생 모집 (~2/24)",
+                },
+            ],
+            [
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "공지사항에 실험실습조교는 무엇인가요?"},
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "정보산업연구소 조교 모집"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "2025-1 실험실습조교 배정결과 (2월 27일 기준)",
+                },
+            ],
+            [
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "장학생은 어떻게 선발하나요?"},
+                {"source": "라운_수업안내_학사안내_정리.markdown", "title": "장학정보"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "2025학년도 1학기 HUFS Dream 장학생 신청자 모집",
+                },
+            ],
+            [
+                {"source": "학부안내+구성원.md", "title": "수강신청 일정 및 지침"},
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "이수구분 변경신청서"},
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "2025-1학기 컴퓨터공학부 수강신청 안내",
+                },
+            ],
+            [
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "대학원 학과소개"},
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "신입생대상 코딩존 운영"},
+                {"source": "학부안내+구성원.md", "title": "오시는 길"},
+            ],
+            [
+                {
+                    "source": "대학원+공지사항+취업정보+자료실+FAQ.md",
+                    "title": "졸업에 필요한 서류들은 어디에 제출하나요?",
+                },
+                {"source": "라운_수업안내_학사안내_정리.markdown", "title": "졸업요건"},
+                {"source": "대학원+공지사항+취업정보+자료실+FAQ.md", "title": "2025년 1학기 졸업논문 제출 일정"},
+            ],
         ],
         "ground_truth_answers": [
             "컴퓨터공학과 졸업요건은 총 130학점 이상 이수, 전공 66학점 이상(필수 39학점, 선택 27학점), 교양 33학점 이상, 평균평점 1.75 이상입니다.",
@@ -86,7 +155,7 @@ def save_test_dataset(output_file: str = "evaluate/test_dataset.json"):
 
     print(f"테스트 데이터셋이 {output_file}에 저장되었습니다.")
     print(
-        "실제 평가를 위해서는 'ground_truth_doc_ids'를 현재 ChromaDB에 있는 문서 ID와 매핑해야 합니다."
+        "정답 섹션은 'ground_truth_sections'에 (원본 파일, 섹션 제목)으로 지정되어 있습니다."
     )
 
 
@@ -115,11 +184,12 @@ def find_best_match_for_answer(
     return doc_ids, chunks
 
 
-def auto_update_ground_truth_doc_ids(
+def auto_update_ground_truth_sections(
     test_dataset_path: str = "evaluate/test_dataset.json", top_k: int = 5
 ) -> Dict[str, Any]:
     """
-    테스트 데이터셋의 정답 문서 ID를 ChromaDB에서 자동으로 검색하여 업데이트합니다.
+    테스트 데이터셋의 정답 섹션을 ChromaDB에서 자동으로 검색하여 업데이트합니다.
+    검색된 청크의 (원본 파일, 제목)을 정답 섹션으로 저장합니다.
 
     Args:
         test_dataset_path (str): 테스트 데이터셋 파일 경로
@@ -128,11 +198,10 @@ def auto_update_ground_truth_doc_ids(
     Returns:
         Dict[str, Any]: 업데이트된 테스트 데이터셋
     """
-    print("ChromaDB에서 정답 문서 ID를 자동으로 검색하여 업데이트합니다...")
+    print("ChromaDB에서 정답 섹션을 자동으로 검색하여 업데이트합니다...")
 
     # ChromaDB 컬렉션 확인
-    collection = get_or_create_collection()
-    if collection.count() == 0:
+    if get_collection_count() == 0:
         print("ChromaDB 컬렉션이 비어 있습니다. 데이터를 먼저 추가해주세요.")
         return None
 
@@ -144,52 +213,52 @@ def auto_update_ground_truth_doc_ids(
         print(f"테스트 데이터셋 파일({test_dataset_path})을 찾을 수 없습니다.")
         return None
 
-    updated_doc_ids = []
+    updated_sections = []
     matching_details = []
 
-    # 각 질의/정답에 대해 정답 문서 ID 자동 검색
-    for i, (query, answer) in enumerate(
-        zip(test_data["queries"], test_data["ground_truth_answers"])
-    ):
+    # 모든 질의와 정답을 한 번에 검색
+    queries = test_data["queries"]
+    answers = test_data["ground_truth_answers"]
+    search_results = find_similar_chunks_batch(queries + answers, top_k=top_k)
+    query_results = search_results[: len(queries)]
+    answer_results = search_results[len(queries) :]
+
+    # 각 질의/정답에 대해 정답 섹션 자동 검색
+    for i, (query, answer) in enumerate(zip(queries, answers)):
         print(f"\n[{i+1}/{len(test_data['queries'])}] 질의: {query}")
 
-        # 1. 먼저 질의로 검색
-        query_ids, query_chunks = find_best_match_for_answer(query, top_k)
+        # 1. 질의 검색 결과
+        query_chunks = query_results[i]
 
-        # 2. 정답으로 검색
-        answer_ids, answer_chunks = find_best_match_for_answer(answer, top_k)
+        # 2. 정답 검색 결과
+        answer_chunks = answer_results[i]
 
         # 3. 중복 제거 및 병합 (질의 기반 결과 우선)
-        all_ids = []
-        seen_ids = set()
-
-        # 질의 결과 먼저 추가
-        for doc_id in query_ids:
-            if doc_id not in seen_ids:
-                all_ids.append(doc_id)
-                seen_ids.add(doc_id)
+        all_sections = []
+        seen_sections = set()
 
-        # 정답 결과 추가
-        for doc_id in answer_ids:
-            if doc_id not in seen_ids:
-                all_ids.append(doc_id)
-                seen_ids.add(doc_id)
+        for chunk in query_chunks + answer_chunks:
+            section = {"source": chunk.get("source", "출처 미상"), "title": chunk["title"]}
+            key = (section["source"], section["title"])
+            if key not in seen_sections:
+                all_sections.append(section)
+                seen_sections.add(key)
 
         # 상위 3개만 사용
-        final_ids = all_ids[:3]
-        updated_doc_ids.append(final_ids)
+        final_sections = all_sections[:3]
+        updated_sections.append(final_sections)
 
         # 결과 출력
-        print(f"  - 기존 정답 문서 ID: {test_data['ground_truth_doc_ids'][i]}")
-        print(f"  - 자동 검색된 문서 ID: {final_ids}")
+        print(f"  - 기존 정답 섹션: {test_data['ground_truth_sections'][i]}")
+        print(f"  - 자동 검색된 정답 섹션: {final_sections}")
 
         # 매칭 상세 정보 저장
         matching_details.append(
             {
                 "query": query,
                 "answer": answer,
-                "original_ids": test_data["ground_truth_doc_ids"][i],
-                "found_ids": final_ids,
+                "original_sections": test_data["ground_truth_sections"][i],
+                "found_sections": final_sections,
                 "query_search_results": [
                     {"id": c["id"], "title": c["title"]} for c in query_chunks[:3]
                 ],
@@ -200,7 +269,7 @@ def auto_update_ground_truth_doc_ids(
         )
 
     # 데이터셋 업데이트
-    test_data["ground_truth_doc_ids"] = updated_doc_ids
+    test_data["ground_truth_sections"] = updated_sections
 
     # 업데이트된 데이터셋 저장
     with open(test_dataset_path, "w", encoding="utf-8") as f:
@@ -219,15 +288,15 @@ def auto_update_ground_truth_doc_ids(
     return test_data
 
 
-def update_ground_truth_doc_ids(test_dataset_file: str = "evaluate/test_dataset.json"):
+def update_ground_truth_sections(test_dataset_file: str = "evaluate/test_dataset.json"):
     """
-    테스트 데이터셋의 정답 문서 ID를 실제 ChromaDB 문서 ID로 업데이트합니다.
+    테스트 데이터셋의 정답 섹션을 업데이트합니다.
     자동 또는 수동 업데이트를 선택할 수 있습니다.
 
     Args:
         test_dataset_file (str): 테스트 데이터셋 파일 경로
     """
-    print("정답 문서 ID 업데이트 방법을 선택하세요:")
+    print("정답 섹션 업데이트 방법을 선택하세요:")
     print("1. 자동 업데이트 (ChromaDB 검색 기반)")
     print("2. 수동 업데이트 (사용자 입력)")
 
@@ -235,7 +304,7 @@ def update_ground_truth_doc_ids(test_dataset_file: str = "evaluate/test_dataset.
         choice = input("선택 (1/2): ").strip()
 
         if choice == "1":
-            auto_update_ground_truth_doc_ids(test_dataset_file)
+            auto_update_ground_truth_sections(test_dataset_file)
             return
 
         elif choice == "2":
@@ -249,12 +318,18 @@ def update_ground_truth_doc_ids(test_dataset_file: str = "evaluate/test_dataset.
 
             for i, query in enumerate(test_data["queries"]):
                 print(f"\n질의: {query}")
-                print(f"현재 정답 문서 ID: {test_data['ground_truth_doc_ids'][i]}")
-                print("새 정답 문서 ID를 입력하세요 (쉼표로 구분):")
-                new_ids = input().strip()
-
-                if new_ids:
-                    test_data["ground_truth_doc_ids"][i] = new_ids.split(",")
+                print(f"현재 정답 섹션: {test_data['ground_truth_sections'][i]}")
+                print("새 정답 섹션을 '원본 파일|섹션 제목' 형식으로 한 줄에 하나씩 입력하세요 (빈 줄로 종료):")
+                new_sections = []
+                while True:
+                    line = input().strip()
+                    if not line:
+                        break
+                    source, _, title = line.partition("|")
+                    new_sections.append({"source": source.strip(), "title": title.strip()})
+
+                if new_sections:
+                    test_data["ground_truth_sections"][i] = new_sections
 
             # 업데이트된 데이터셋 저장
             with open(test_dataset_file, "w", encoding="utf-8") as f:
@@ -273,7 +348,7 @@ if __name__ == "__main__":
     # 테스트 데이터셋 생성 및 저장
     save_test_dataset()
 
-    # 정답 문서 ID 업데이트 (선택 사항)
-    print("\n정답 문서 ID를 업데이트하시겠습니까? (y/n)")
+    # 정답 섹션 업데이트 (선택 사항)
+    print("\n정답 섹션을 업데이트하시겠습니까? (y/n)")
     if input().lower() == "y":
-        update_ground_truth_doc_ids()
+        update_ground_truth_sections()
@@ -13,12 +13,33 @@ from typing import Any, Dict, List
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
-from app.services.embeddings import find_similar_chunks
+from app.services.embeddings import find_similar_chunks_batch
+
+
+def matches_ground_truth(chunk: Dict, section: Dict[str, str]) -> bool:
+    """
+    검색된 청크가 정답 섹션에 속하는지 확인합니다.
+
+    청크 ID는 원본 파일, 헤딩 경로, 내용 해시로 만들어지므로 문서를 고치거나 청킹 설정을 바꾸면
+    달라집니다. 그래서 정답은 (원본 파일, 섹션 제목)으로 지정하고, 청크의 원본 파일이 같고
+    헤딩 경로에 섹션 제목이 있으면 정답으로 봅니다. (섹션이 여러 청크로 나뉘어도 일치)
+
+    Args:
+        chunk (Dict): 검색된 청크 ('source', 'heading_path' 또는 'title' 포함)
+        section (Dict[str, str]): 정답 섹션 {'source': 원본 파일 이름, 'title': 섹션 제목}
+
+    Returns:
+        bool: 정답 섹션에 속하면 True
+    """
+    if chunk.get("source") != section["source"]:
+        return False
+    headings = (chunk.get("heading_path") or chunk.get("title") or "").split(" > ")
+    return section["title"].strip() in {heading.strip() for heading in headings}
 
 
 def evaluate_top_k_accuracy(
     test_queries: List[str],
-    ground_truth_docs: List[List[str]],
+    ground_truth_sections: List[List[Dict[str, str]]],
     k_values: List[int] = [1, 3, 5, 10],
 ) -> Dict[str, Any]:
     """
@@ -26,7 +47,8 @@ def evaluate_top_k_accuracy(
 
     Args:
         test_queries (List[str]): 테스트 질의 목록
-        ground_truth_docs (List[List[str]]): 각 질의에 대한 정답 문서 ID 목록
+        ground_truth_sections (List[List[Dict[str, str]]]): 각 질의에 대한 정답 섹션 목록
+            (matches_ground_truth 참고)
         k_values (List[int]): 평가할 k 값 목록 (기본값: [1, 3, 5, 10])
 
     Returns:
@@ -35,26 +57,35 @@ def evaluate_top_k_accuracy(
     total_queries = len(test_queries)
     results = {}
 
+    # 가장 큰 k로 모든 질의를 한 번에 검색한 뒤, 각 k에서는 상위 k개만 사용
+    all_retrieved = find_similar_chunks_batch(test_queries, top_k=max(k_values))
+
     # 각 k 값에 대해 정확도 계산
     for k in k_values:
         hit_count = 0
         query_results = []
 
         for i, query in enumerate(test_queries):
-            # 문서 검색
-            retrieved_docs = find_similar_chunks(query, top_k=k)
-            retrieved_ids = [doc["id"] for doc in retrieved_docs]
-
-            # 정답 문서가 검색된 문서에 포함되어 있는지 확인
-            hit = any(doc_id in retrieved_ids for doc_id in ground_truth_docs[i])
+            # 검색된 문서 중 상위 k개
+            retrieved = all_retrieved[i][:k]
+
+            # 정답 섹션의 청크가 검색된 문서에 포함되어 있는지 확인
+            hit = any(
+                matches_ground_truth(doc, section)
+                for doc in retrieved
+                for section in ground_truth_sections[i]
+            )
             hit_count += 1 if hit else 0
 
             # 개별 질의 결과 저장
             query_results.append(
                 {
                     "query": query,
-                    "ground_truth_docs": ground_truth_docs[i],
-                    "retrieved_docs": retrieved_ids,
+                    "ground_truth_sections": ground_truth_sections[i],
+                    "retrieved_docs": [
+                        {"id": doc["id"], "source": doc.get("source"), "title": doc["title"]}
+                        for doc in retrieved
+                    ],
                     "hit": hit,
                 }
             )
@@ -99,7 +130,7 @@ if __name__ == "__main__":
             test_data = json.load(f)
 
         accuracy_results = evaluate_top_k_accuracy(
-            test_data["queries"], test_data["ground_truth_doc_ids"]
+            test_data["queries"], test_data["ground_truth_sections"]
         )
 
         # 결과 출력
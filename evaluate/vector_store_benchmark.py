@@ -0,0 +1,355 @@
+"""
+검색 백엔드 적합성 및 성능을 평가하는 모듈
+
+이 모듈은 등록된 모든 검색 백엔드(VectorStore)를 같은 청크 집합으로 만들고,
+정확한 검색(NumPy brute-force) 대비 recall@k와 쿼리 지연 시간(p50/p99)을 측정합니다.
+또한 add/upsert/delete/query/query_batch/count가 인터페이스대로 동작하는지 확인합니다.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import chromadb
+import numpy as np
+
+# 프로젝트 루트를 추가하여 app 모듈에 접근할 수 있도록 합니다
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from app.services.chroma_store import ChromaVectorStore
+from app.services.embeddings import embed_texts, get_or_create_collection
+from app.services.faiss_store import FaissVectorStore
+from app.services.numpy_store import NumpyVectorStore
+from app.services.vector_store import VectorStore, get_vector_store, list_vector_stores
+
+
+def load_records(synthetic: int = 0, dim: int = 1536, seed: int = 0) -> Dict[str, Any]:
+    """
+    평가에 사용할 청크 집합을 불러옵니다.
+
+    Args:
+        synthetic (int): 0보다 크면 이 개수만큼 무작위 벡터를 생성하고, 0이면 서빙 중인 컬렉션 사용
+        dim (int): 무작위 벡터의 차원
+        seed (int): 난수 시드
+
+    Returns:
+        Dict: ids, embeddings, documents, metadatas를 포함한 딕셔너리
+    """
+    if synthetic:
+        rng = np.random.default_rng(seed)
+        ids = [f"chunk_{i}" for i in range(synthetic)]
+        return {
+            "ids": ids,
+            "embeddings": rng.standard_normal((synthetic, dim)).astype(np.float32),
+            "documents": [f"문서 {i}" for i in range(synthetic)],
+            "metadatas": [{"title": f"문서 {i}", "source": "synthetic"} for i in range(synthetic)],
+        }
+
+    records = get_or_create_collection().get(
+        include=["embeddings", "documents", "metadatas"]
+    )
+    if records["embeddings"] is None or len(records["ids"]) == 0:
+        raise ValueError("컬렉션이 비어있습니다. 벡터 저장소를 먼저 생성하거나 --synthetic을 사용하세요.")
+    records["embeddings"] = np.asarray(records["embeddings"], dtype=np.float32)
+    return records
+
+
+def make_queries(
+    records: Dict[str, Any],
+    num_queries: int = 100,
+    test_dataset: str = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    검색에 사용할 쿼리 임베딩을 만듭니다.
+
+    Args:
+        records (Dict): 청크 집합
+        num_queries (int): 생성할 쿼리 수 (test_dataset이 없을 때)
+        test_dataset (str): 주어지면 테스트 데이터셋의 질의를 임베딩하여 사용
+        seed (int): 난수 시드
+
+    Returns:
+        np.ndarray: (쿼리 수, 차원) 크기의 쿼리 임베딩
+    """
+    if test_dataset:
+        with open(test_dataset, "r", encoding="utf-8") as f:
+            queries = json.load(f)["queries"]
+        return np.asarray(embed_texts(queries), dtype=np.float32)
+
+    # 청크 임베딩에 잡음을 섞어 실제 질의와 비슷하게 정답 근처에 있는 쿼리를 생성
+    rng = np.random.default_rng(seed)
+    embeddings = records["embeddings"]
+    picks = rng.integers(0, len(embeddings), num_queries)
+    base = embeddings[picks] / np.linalg.norm(embeddings[picks], axis=1, keepdims=True)
+    noise = rng.standard_normal(base.shape).astype(np.float32)
+    noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+    return (base + 0.5 * noise).astype(np.float32)
+
+
+def make_builders(records: Dict[str, Any]) -> Dict[str, Callable[[], VectorStore]]:
+    """
+    같은 청크 집합으로 각 백엔드를 새로 만드는 함수 목록을 반환합니다.
+
+    기본 백엔드(chroma, numpy, faiss 인덱스 종류별)는 서빙 데이터 디렉토리를 건드리지 않도록
+    메모리에서 만들고, register_vector_store로 추가 등록된 백엔드는 임시 ChromaDB 컬렉션을
+    원본으로 등록된 함수를 호출합니다.
+
+    Args:
+        records (Dict): 청크 집합
+
+    Returns:
+        Dict[str, Callable[[], VectorStore]]: 백엔드 이름 -> 생성 함수
+    """
+    args = (
+        records["ids"],
+        records["embeddings"],
+        records["documents"],
+        records["metadatas"],
+    )
+
+    def build_chroma_collection(name: str):
+        client = chromadb.EphemeralClient()
+        try:
+            client.delete_collection(name)
+        except Exception:
+            pass
+        collection = client.create_collection(
+            name=name, embedding_function=None, metadata={"hnsw:space": "cosine"}
+        )
+        ChromaVectorStore(collection).add(*args)
+        return collection
+
+    builders = {
+        "numpy": lambda: NumpyVectorStore(*args),
+        "chroma": lambda: ChromaVectorStore(build_chroma_collection("benchmark")),
+        "faiss-flat": lambda: FaissVectorStore.build(*args, index_type="flat"),
+        "faiss-hnsw": lambda: FaissVectorStore.build(*args, index_type="hnsw"),
+        "faiss-ivfpq": lambda: FaissVectorStore.build(*args, index_type="ivfpq"),
+    }
+
+    for name in list_vector_stores():
+        if name not in ("chroma", "numpy", "faiss"):
+            builders[name] = lambda name=name: get_vector_store(
+                build_chroma_collection(f"benchmark-{name}"), backend=name
+            )
+
+    return builders
+
+
+def benchmark_store(
+    store: VectorStore,
+    queries: np.ndarray,
+    exact_ids: List[List[str]],
+    k: int,
+) -> Dict[str, Any]:
+    """
+    정확한 검색 결과 대비 recall@k와 쿼리 지연 시간을 측정합니다.
+
+    Args:
+        store (VectorStore): 평가할 벡터 저장소
+        queries (np.ndarray): 쿼리 임베딩
+        exact_ids (List[List[str]]): 쿼리별 정확한 top-k 청크 ID
+        k (int): 검색할 청크 수
+
+    Returns:
+        Dict: recall@k, 단건 검색 p50/p99(ms), 일괄 검색 쿼리당 시간(ms)
+    """
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, exact_ids):
+        start = time.perf_counter()
+        retrieved = store.query(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len({c["id"] for c in retrieved} & set(expected)) / len(expected))
+
+    start = time.perf_counter()
+    store.query_batch(queries, k)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        f"recall@{k}": float(np.mean(recalls)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "batch_ms_per_query": batch_ms / len(queries),
+    }
+
+
+def check_conformance(
+    store: VectorStore, records: Dict[str, Any], queries: np.ndarray, k: int
+) -> Dict[str, bool]:
+    """
+    벡터 저장소가 VectorStore 인터페이스대로 동작하는지 확인합니다. 저장소 내용을 변경합니다.
+
+    Args:
+        store (VectorStore): 확인할 벡터 저장소
+        records (Dict): 저장소를 만든 청크 집합
+        queries (np.ndarray): 쿼리 임베딩
+        k (int): 검색할 청크 수
+
+    Returns:
+        Dict[str, bool]: 항목별 통과 여부
+    """
+    ids = records["ids"]
+    embeddings = records["embeddings"]
+    total = len(ids)
+    checks = {"protocol": isinstance(store, VectorStore), "count": store.count() == total}
+
+    single = [store.query(q, k) for q in queries[:10]]
+    checks["query_format"] = all(
+        len(chunks) == min(k, total)
+        and all({"id", "title", "content", "source", "score"} <= set(c) for c in chunks)
+        and all(a["score"] >= b["score"] - 1e-6 for a, b in zip(chunks, chunks[1:]))
+        for chunks in single
+    )
+    batch = store.query_batch(queries[:10], k)
+    checks["query_batch"] = [[c["id"] for c in r] for r in batch] == [
+        [c["id"] for c in r] for r in single
+    ]
+
+    target = ids[0]
+    other = embeddings[-1]
+    store.delete([target])
+    checks["delete"] = store.count() == total - 1 and target not in {
+        c["id"] for c in store.query(embeddings[0], k)
+    }
+
+    # 삭제한 ID를 다른 벡터로 다시 넣으면 그 벡터로 검색했을 때 1순위여야 함
+    store.upsert([target], other[None, :], ["upsert"], [{"title": "upsert", "source": "test"}])
+    top = store.query(other, 2)
+    checks["upsert"] = store.count() == total and target in {c["id"] for c in top}
+
+    try:
+        store.add([target], other[None, :], ["dup"], [{"title": "dup", "source": "test"}])
+        checks["add_rejects_duplicates"] = False
+    except ValueError:
+        checks["add_rejects_duplicates"] = True
+
+    return checks
+
+
+def run_benchmark(
+    synthetic: int = 0,
+    dim: int = 1536,
+    num_queries: int = 100,
+    test_dataset: str = None,
+    k: int = 10,
+    backends: List[str] = None,
+) -> Dict[str, Any]:
+    """
+    모든 백엔드에 대해 성능 측정과 적합성 확인을 실행합니다.
+
+    Args:
+        synthetic (int): 무작위 청크 수 (0이면 서빙 중인 컬렉션 사용)
+        dim (int): 무작위 벡터의 차원
+        num_queries (int): 쿼리 수
+        test_dataset (str): 테스트 데이터셋 경로 (주어지면 실제 질의 사용)
+        k (int): 검색할 청크 수
+        backends (List[str]): 평가할 백엔드 이름 목록 (기본값: 전체)
+
+    Returns:
+        Dict: 백엔드별 결과
+    """
+    records = load_records(synthetic, dim)
+    queries = make_queries(records, num_queries, test_dataset)
+    k = min(k, len(records["ids"]))
+
+    exact = NumpyVectorStore(
+        records["ids"], records["embeddings"], records["documents"], records["metadatas"]
+    )
+    exact_ids = [[c["id"] for c in r] for r in exact.query_batch(queries, k)]
+
+    results = {
+        "chunks": len(records["ids"]),
+        "dimensions": int(records["embeddings"].shape[1]),
+        "queries": len(queries),
+        "k": k,
+        "backends": {},
+    }
+
+    for name, build in make_builders(records).items():
+        if backends and name not in backends:
+            continue
+
+        print(f"[{name}] 인덱스 생성 중...")
+        start = time.perf_counter()
+        store = build()
+        build_seconds = time.perf_counter() - start
+
+        result = benchmark_store(store, queries, exact_ids, k)
+        result["build_seconds"] = build_seconds
+        result["conformance"] = check_conformance(store, records, queries, k)
+        results["backends"][name] = result
+
+        print(
+            f"[{name}] recall@{k}: {result[f'recall@{k}']:.3f}, "
+            f"p50: {result['p50_ms']:.3f}ms, p99: {result['p99_ms']:.3f}ms, "
+            f"일괄 검색: {result['batch_ms_per_query']:.3f}ms/쿼리, "
+            f"적합성: {'통과' if all(result['conformance'].values()) else result['conformance']}"
+        )
+
+    return results
+
+
+def save_benchmark_results(
+    results: Dict[str, Any],
+    output_file: str = "evaluate/evaluation_results/vector_store_benchmark.json",
+):
+    """
+    백엔드 평가 결과를 JSON 파일로 저장합니다.
+
+    Args:
+        results (Dict[str, Any]): 평가 결과
+        output_file (str): 출력 파일 경로
+    """
+    # 디렉토리가 없으면 생성
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print(f"백엔드 평가 결과가 {output_file}에 저장되었습니다.")
+
+
+def parse_arguments():
+    """
+    명령줄 인수를 파싱합니다.
+
+    Returns:
+        argparse.Namespace: 파싱된 인수
+    """
+    parser = argparse.ArgumentParser(description="검색 백엔드 적합성 및 성능 평가")
+    parser.add_argument(
+        "--synthetic", type=int, default=0, help="무작위 청크 수 (0이면 서빙 중인 컬렉션 사용)"
+    )
+    parser.add_argument("--dim", type=int, default=1536, help="무작위 벡터의 차원")
+    parser.add_argument("--queries", type=int, default=100, help="쿼리 수")
+    parser.add_argument(
+        "--test-dataset", type=str, help="실제 질의로 평가할 테스트 데이터셋 경로"
+    )
+    parser.add_argument("-k", type=int, default=10, help="검색할 청크 수")
+    parser.add_argument("--backends", nargs="*", help="평가할 백엔드 이름 (기본값: 전체)")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="evaluate/evaluation_results/vector_store_benchmark.json",
+        help="결과 파일 경로",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    benchmark_results = run_benchmark(
+        synthetic=args.synthetic,
+        dim=args.dim,
+        num_queries=args.queries,
+        test_dataset=args.test_dataset,
+        k=args.k,
+        backends=args.backends,
+    )
+    save_benchmark_results(benchmark_results, args.output)
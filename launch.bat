@@ -25,7 +25,8 @@ echo 서비스가 시작되었습니다.
 echo FastAPI: http://localhost:8000
 echo FastAPI 문서: http://localhost:8000/docs
 echo 챗봇 인터페이스: http://localhost:8000/chat
-echo 벡터 저장소 업데이트: http://localhost:8000/api/update-vector-store
+echo 벡터 저장소 업데이트: curl -X POST http://localhost:8000/api/update-vector-store
+echo 업데이트 진행 상황: GET http://localhost:8000/api/update-vector-store/{job_id}
 echo ----------------------------------------
 echo 종료하려면 이 창을 닫으세요.
 
@@ -33,7 +33,8 @@ Write-Host "서비스가 시작되었습니다." -ForegroundColor $Green
 Write-Host "FastAPI: http://localhost:8000" -ForegroundColor $Yellow
 Write-Host "FastAPI 문서: http://localhost:8000/docs" -ForegroundColor $Yellow
 Write-Host "챗봇 인터페이스: http://localhost:8000/chat" -ForegroundColor $Yellow
-Write-Host "벡터 저장소 업데이트: http://localhost:8000/api/update-vector-store" -ForegroundColor $Yellow
+Write-Host "벡터 저장소 업데이트: Invoke-RestMethod -Method Post http://localhost:8000/api/update-vector-store" -ForegroundColor $Yellow
+Write-Host "업데이트 진행 상황: GET http://localhost:8000/api/update-vector-store/{job_id}" -ForegroundColor $Yellow
 Write-Host "----------------------------------------" -ForegroundColor $Blue
 Write-Host "종료하려면 Ctrl+C를 누르세요." -ForegroundColor $Yellow
 
@@ -31,7 +31,8 @@ echo -e "${GREEN}서비스가 시작되었습니다.${NC}"
 echo -e "${YELLOW}FastAPI:${NC} http://localhost:8000"
 echo -e "${YELLOW}FastAPI 문서:${NC} http://localhost:8000/docs"
 echo -e "${YELLOW}챗봇 인터페이스:${NC} http://localhost:8000/chat"
-echo -e "${YELLOW}벡터 저장소 업데이트:${NC} http://localhost:8000/api/update-vector-store"
+echo -e "${YELLOW}벡터 저장소 업데이트:${NC} curl -X POST http://localhost:8000/api/update-vector-store"
+echo -e "${YELLOW}업데이트 진행 상황:${NC} GET http://localhost:8000/api/update-vector-store/{job_id}"
 echo -e "${BLUE}----------------------------------------${NC}"
 echo -e "${YELLOW}종료하려면 Ctrl+C를 누르세요.${NC}"
 
@@ -1,5 +1,5 @@
-import json
 import os
+import sys
 from typing import Dict, List
 
 import numpy as np
@@ -8,6 +8,14 @@ from markdown_processor import process_markdown_documents
 from openai import OpenAI
 from utils import get_openai_client
 
+# 저장소 루트의 app 패키지(벡터 저장소 파일 형식)를 사용할 수 있도록 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.numpy_store import load_search_chunks, search_chunks
+from app.services.vector_file import (convert_json_vector_store,
+                                      save_vector_chunks, vector_file_exists,
+                                      vector_file_paths)
+
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
@@ -36,6 +44,25 @@ def generate_embedding(text: str) -> List[float]:
         return []
 
 
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    여러 텍스트의 임베딩 벡터를 한 번의 API 요청으로 생성합니다.
+
+    Args:
+        texts (List[str]): 임베딩할 텍스트 목록
+
+    Returns:
+        List[List[float]]: 입력 순서와 같은 임베딩 벡터 목록 (실패 시 빈 목록)
+    """
+    try:
+        client = get_openai_client()
+        response = client.embeddings.create(model="text-embedding-3-small", input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+    except Exception as e:
+        print(f"임베딩 생성 중 오류 발생: {str(e)}")
+        return []
+
+
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
     두 벡터 간의 코사인 유사도를 계산합니다.
@@ -71,23 +98,29 @@ def find_similar_chunks(
     Returns:
         List[Dict]: 상위 k개의 유사한 청크 목록
     """
-    # 쿼리에 대한 임베딩 생성
-    query_embedding = generate_embedding(query)
+    return find_similar_chunks_batch([query], vector_store, top_k)[0]
 
-    # 각 청크와의 유사도 계산
-    chunk_similarities = []
-    for chunk in vector_store:
-        chunk_embedding = chunk["embedding"]
-        similarity = cosine_similarity(query_embedding, chunk_embedding)
-        chunk_similarities.append((chunk, similarity))
 
-    # 유사도에 따라 내림차순 정렬
-    sorted_chunks = sorted(chunk_similarities, key=lambda x: x[1], reverse=True)
+def find_similar_chunks_batch(
+    queries: List[str], vector_store: List[Dict], top_k: int = 3
+) -> List[List[Dict]]:
+    """
+    여러 쿼리를 한 번에 검색합니다. 쿼리 임베딩은 한 번의 API 요청으로 만들고,
+    유사도는 미리 정규화한 임베딩 행렬과의 행렬 곱 한 번으로 계산합니다.
 
-    # 상위 k개 청크 반환
-    top_chunks = [chunk for chunk, _ in sorted_chunks[:top_k]]
+    Args:
+        queries (List[str]): 사용자 쿼리 목록
+        vector_store (List[Dict]): 벡터 저장소
+        top_k (int, optional): 쿼리마다 반환할 최상위 유사 청크 수. 기본값은 3.
+
+    Returns:
+        List[List[Dict]]: 쿼리별 상위 k개의 유사한 청크 목록
+    """
+    query_embeddings = generate_embeddings(queries)
+    if not query_embeddings:
+        return [[] for _ in queries]
 
-    return top_chunks
+    return search_chunks(vector_store, query_embeddings, top_k)
 
 
 def generate_embeddings_for_chunks(chunks: List[Dict[str, str]]) -> List[Dict]:
@@ -120,37 +153,40 @@ def generate_embeddings_for_chunks(chunks: List[Dict[str, str]]) -> List[Dict]:
 
 
 def save_vector_store(
-    chunks_with_embeddings: List[Dict], output_file: str = "vector_store.json"
+    chunks_with_embeddings: List[Dict],
+    output_file: str = "vector_store.json",
+    dtype: str = "float32",
 ):
     """
-    임베딩이 포함된 청크들을 JSON 파일로 저장합니다.
+    임베딩이 포함된 청크들을 바이너리 벡터 저장소 형식으로 저장합니다.
+    (vector_store.<세대>.vectors.npy, vector_store.<세대>.contents.bin, vector_store.meta.json)
 
     Args:
         chunks_with_embeddings (List[Dict]): 임베딩이 포함된 청크 목록
         output_file (str, optional): 저장할 파일 경로. 기본값은 'vector_store.json'.
+        dtype (str, optional): 임베딩 저장 형식 ("float32" 또는 "float16"). 기본값은 "float32".
     """
-    # JSON으로 저장하기 위해 NumPy 배열을 리스트로 변환
-    serializable_chunks = []
+    save_vector_chunks(output_file, chunks_with_embeddings, dtype=dtype)
 
-    for chunk in chunks_with_embeddings:
-        serializable_chunk = {
-            "title": chunk["title"],
-            "content": chunk["content"],
-            "source": chunk["source"],
-            "embedding": chunk["embedding"],  # 이미 리스트 형태로 반환됨
-        }
-        serializable_chunks.append(serializable_chunk)
+    print(f"벡터 저장소가 {vector_file_paths(output_file)['metadata']}에 저장되었습니다.")
 
-    # JSON 파일로 저장
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(serializable_chunks, f, ensure_ascii=False, indent=2)
 
-    print(f"벡터 저장소가 {output_file}에 저장되었습니다.")
+def vector_store_exists(input_file: str = "vector_store.json") -> bool:
+    """
+    저장된 벡터 저장소(바이너리 또는 기존 JSON)가 있는지 확인합니다.
+
+    Args:
+        input_file (str, optional): 벡터 저장소 경로. 기본값은 'vector_store.json'.
+
+    Returns:
+        bool: 벡터 저장소가 있으면 True
+    """
+    return vector_file_exists(input_file) or os.path.exists(input_file)
 
 
 def load_vector_store(input_file: str = "vector_store.json") -> List[Dict]:
     """
-    저장된 벡터 저장소를 로드합니다.
+    저장된 벡터 저장소를 로드합니다. 기존 JSON 파일만 있으면 바이너리 형식으로 한 번 변환합니다.
 
     Args:
         input_file (str, optional): 로드할 파일 경로. 기본값은 'vector_store.json'.
@@ -158,12 +194,15 @@ def load_vector_store(input_file: str = "vector_store.json") -> List[Dict]:
     Returns:
         List[Dict]: 로드된 청크 목록
     """
-    if not os.path.exists(input_file):
+    if not vector_store_exists(input_file):
         print(f"파일이 존재하지 않습니다: {input_file}")
         return []
 
-    with open(input_file, "r", encoding="utf-8") as f:
-        vector_store = json.load(f)
+    if not vector_file_exists(input_file):
+        convert_json_vector_store(input_file)
+
+    # 불러온 임베딩 행렬을 검색 행렬로 그대로 사용 (검색할 때마다 다시 만들지 않음)
+    vector_store = load_search_chunks(input_file)
 
     print(f"벡터 저장소 로드 완료: {len(vector_store)} 청크")
     return vector_store
@@ -3,10 +3,10 @@
 """
 
 import argparse
-import os
 
 from embeddings_generator import (generate_embeddings_for_chunks,
-                                  load_vector_store, save_vector_store)
+                                  load_vector_store, save_vector_store,
+                                  vector_store_exists)
 from markdown_processor import process_markdown_documents
 from rag_chatbot import chat_interface
 
@@ -23,7 +23,7 @@ def setup_pipeline(docs_dir="study_docs", rebuild=False):
     combined_md_path = "docs/combined_markdown.md"
 
     # 벡터 저장소가 이미 존재하고 rebuild 플래그가 False인 경우, 기존 벡터 저장소 사용
-    if os.path.exists(vector_store_path) and not rebuild:
+    if vector_store_exists(vector_store_path) and not rebuild:
         print(f"기존 벡터 저장소({vector_store_path})를 사용합니다.")
         return
 
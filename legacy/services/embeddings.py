@@ -1,4 +1,3 @@
-import json
 import os
 from typing import Dict, List
 
@@ -9,6 +8,10 @@ from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 from app.core.config import settings
 from app.core.utils import get_openai_client
 from app.services.markdown_processor import process_markdown_documents
+from app.services.numpy_store import load_search_chunks, search_chunks
+from app.services.vector_file import (convert_json_vector_store,
+                                      save_vector_chunks, vector_file_exists,
+                                      vector_file_paths)
 
 
 def get_chroma_client():
@@ -68,6 +71,25 @@ def generate_embedding(text: str) -> List[float]:
         return []
 
 
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    여러 텍스트의 임베딩 벡터를 한 번의 API 요청으로 생성합니다.
+
+    Args:
+        texts (List[str]): 임베딩할 텍스트 목록
+
+    Returns:
+        List[List[float]]: 입력 순서와 같은 임베딩 벡터 목록 (실패 시 빈 목록)
+    """
+    try:
+        client = get_openai_client()
+        response = client.embeddings.create(model=settings.EMBEDDING_MODEL, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+    except Exception as e:
+        print(f"임베딩 생성 중 오류 발생: {str(e)}")
+        return []
+
+
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
     두 벡터 간의 코사인 유사도를 계산합니다.
@@ -153,23 +175,29 @@ def find_similar_chunks_legacy(
     Returns:
         List[Dict]: 상위 k개의 유사한 청크 목록
     """
-    # 쿼리에 대한 임베딩 생성
-    query_embedding = generate_embedding(query)
+    return find_similar_chunks_legacy_batch([query], vector_store, top_k)[0]
+
 
-    # 각 청크와의 유사도 계산
-    chunk_similarities = []
-    for chunk in vector_store:
-        chunk_embedding = chunk["embedding"]
-        similarity = cosine_similarity(query_embedding, chunk_embedding)
-        chunk_similarities.append((chunk, similarity))
+def find_similar_chunks_legacy_batch(
+    queries: List[str], vector_store: List[Dict], top_k: int = 3
+) -> List[List[Dict]]:
+    """
+    여러 쿼리를 한 번에 검색합니다. 쿼리 임베딩은 한 번의 API 요청으로 만들고,
+    유사도는 미리 정규화한 임베딩 행렬과의 행렬 곱 한 번으로 계산합니다.
 
-    # 유사도에 따라 내림차순 정렬
-    sorted_chunks = sorted(chunk_similarities, key=lambda x: x[1], reverse=True)
+    Args:
+        queries (List[str]): 사용자 쿼리 목록
+        vector_store (List[Dict]): 벡터 저장소
+        top_k (int, optional): 쿼리마다 반환할 최상위 유사 청크 수. 기본값은 3.
 
-    # 상위 k개 청크 반환
-    top_chunks = [chunk for chunk, _ in sorted_chunks[:top_k]]
+    Returns:
+        List[List[Dict]]: 쿼리별 상위 k개의 유사한 청크 목록
+    """
+    query_embeddings = generate_embeddings(queries)
+    if not query_embeddings:
+        return [[] for _ in queries]
 
-    return top_chunks
+    return search_chunks(vector_store, query_embeddings, top_k)
 
 
 def generate_embeddings_for_chunks(chunks: List[Dict[str, str]]) -> List[Dict]:
@@ -226,7 +254,7 @@ def generate_embeddings_for_chunks(chunks: List[Dict[str, str]]) -> List[Dict]:
 
 def save_vector_store(chunks_with_embeddings: List[Dict], output_file: str = None):
     """
-    임베딩이 포함된 청크들을 JSON 파일로 저장합니다. (호환성 유지)
+    임베딩이 포함된 청크들을 바이너리 벡터 저장소 형식으로 저장합니다. (호환성 유지)
 
     Args:
         chunks_with_embeddings (List[Dict]): 임베딩이 포함된 청크 목록
@@ -235,31 +263,17 @@ def save_vector_store(chunks_with_embeddings: List[Dict], output_file: str = Non
     if output_file is None:
         output_file = settings.VECTOR_STORE_PATH
 
-    # 출력 디렉토리가 없으면 생성
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-    # JSON으로 저장하기 위해 NumPy 배열을 리스트로 변환
-    serializable_chunks = []
-
-    for chunk in chunks_with_embeddings:
-        serializable_chunk = {
-            "title": chunk["title"],
-            "content": chunk["content"],
-            "source": chunk.get("source", "출처 미상"),
-            "embedding": chunk["embedding"],  # 이미 리스트 형태로 반환됨
-        }
-        serializable_chunks.append(serializable_chunk)
-
-    # JSON 파일로 저장
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(serializable_chunks, f, ensure_ascii=False, indent=2)
+    save_vector_chunks(
+        output_file, chunks_with_embeddings, dtype=settings.VECTOR_STORE_DTYPE
+    )
 
-    print(f"벡터 저장소가 {output_file}에 저장되었습니다.")
+    print(f"벡터 저장소가 {vector_file_paths(output_file)['metadata']}에 저장되었습니다.")
 
 
 def load_vector_store(input_file: str = None) -> List[Dict]:
     """
-    벡터 저장소를 로드합니다. ChromaDB에서 로드하고, 실패 시 기존 JSON 파일을 사용합니다.
+    벡터 저장소를 로드합니다. ChromaDB에서 로드하고, 실패 시 바이너리 벡터 저장소를 사용합니다.
+    기존 JSON 파일만 있으면 바이너리 형식으로 한 번 변환한 뒤 로드합니다.
 
     Args:
         input_file (str, optional): 로드할 파일 경로. 기본값은 설정 파일의 경로.
@@ -279,20 +293,22 @@ def load_vector_store(input_file: str = None) -> List[Dict]:
     except Exception as e:
         print(f"ChromaDB 로드 중 오류 발생: {str(e)}")
 
-    # 실패하거나 컬렉션이 비어있으면 기존 JSON 파일 사용
+    # 실패하거나 컬렉션이 비어있으면 저장된 벡터 저장소 사용
     if input_file is None:
         input_file = settings.VECTOR_STORE_PATH
 
-    if not os.path.exists(input_file):
-        print(f"파일이 존재하지 않습니다: {input_file}")
-        return []
+    if not vector_file_exists(input_file):
+        if not os.path.exists(input_file):
+            print(f"파일이 존재하지 않습니다: {input_file}")
+            return []
+        convert_json_vector_store(input_file, dtype=settings.VECTOR_STORE_DTYPE)
 
-    with open(input_file, "r", encoding="utf-8") as f:
-        vector_store = json.load(f)
+    # 불러온 임베딩 행렬을 검색 행렬로 그대로 사용 (검색할 때마다 다시 만들지 않음)
+    vector_store = load_search_chunks(input_file)
 
-    print(f"JSON 벡터 저장소 로드 완료: {len(vector_store)} 청크")
+    print(f"벡터 저장소 로드 완료: {len(vector_store)} 청크")
 
-    # JSON 데이터를 ChromaDB로 마이그레이션 시도
+    # 벡터 저장소 데이터를 ChromaDB로 마이그레이션 시도
     try:
         migrate_json_to_chromadb(vector_store)
     except Exception as e:
@@ -14,7 +14,8 @@ from fastapi.templating import Jinja2Templates
 
 from app.api.routes import router as api_router
 from app.core.config import settings
-from app.services.embeddings import get_or_create_collection
+from app.core.prompt_registry import get_prompt_registry
+from app.services.embeddings import get_collection_count
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -41,12 +42,19 @@ app.include_router(api_router)
 app.mount("/client", StaticFiles(directory="client_web"), name="client")
 
 
+# 프롬프트 검증 - 필수 시스템 프롬프트가 없으면 서버를 시작하지 않음
+@app.on_event("startup")
+async def startup_prompts():
+    registry = get_prompt_registry()
+    print(f"프롬프트 로드 완료 (토큰 수): {registry.token_counts}")
+
+
 # ChromaDB 초기화 - 시작 시 ChromaDB 컬렉션이 있는지 확인
 @app.on_event("startup")
 async def startup_db_client():
     try:
-        collection = get_or_create_collection()
-        print(f"ChromaDB 초기화 완료: {collection.count()}개의 청크가 로드되었습니다.")
+        count = get_collection_count()
+        print(f"ChromaDB 초기화 완료: {count}개의 청크가 로드되었습니다.")
     except Exception as e:
         print(f"ChromaDB 초기화 중 오류 발생: {str(e)}")
 
@@ -106,7 +114,6 @@ async def root():
             <a href="/docs">API 문서 (Swagger UI)</a>
             <a href="/redoc">API 문서 (ReDoc)</a>
             <a href="/chat">ChatGPT 스타일 웹 인터페이스</a>
-            <a href="/api/update-vector-store">벡터 저장소 업데이트 (클릭하면 바로 실행)</a>
         </div>
         
         <p>자세한 정보는 API 문서를 참조하세요.</p>
@@ -0,0 +1,48 @@
+"""
+단일 실행(single-flight) 병합 테스트
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.cache import AsyncSingleFlight
+
+
+def test_leader_cancellation_is_not_shared_with_followers():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.create_task(flight.run("q", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run("q", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    # 리더가 취소되면 대기자가 새 리더가 되어 다시 실행
+    assert asyncio.run(main()) == 2
+
+
+def test_leader_exception_is_shared_with_followers():
+    flight = AsyncSingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("실패")
+
+    async def main():
+        return await asyncio.gather(
+            flight.run("q", work), flight.run("q", work), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
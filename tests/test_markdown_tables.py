@@ -0,0 +1,22 @@
+"""
+마크다운 표 정렬 테스트
+"""
+
+from app.services.markdown_tables import IncrementalTableFormatter, format_tables
+
+
+def test_trailing_newline_follows_input():
+    table = "| 학기 | 과목명 |\n|---|---|\n| 1 | 자료구조 |"
+
+    assert format_tables(table).endswith("```")
+    assert format_tables(table + "\n").endswith("```\n")
+
+
+def test_streamed_table_without_trailing_newline():
+    formatter = IncrementalTableFormatter()
+    chunks = ["표입니다.\n| 학기 |", " 과목명 |\n|---|---|\n", "| 1 | 자료구조 |"]
+
+    output = "".join(formatter.feed(chunk) for chunk in chunks) + formatter.flush()
+
+    assert output.startswith("표입니다.\n```markdown\n")
+    assert output.endswith("| 1    | 자료구조 |\n```")
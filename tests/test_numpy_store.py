@@ -0,0 +1,32 @@
+"""
+청크 목록 검색 테스트
+"""
+
+import numpy as np
+
+from app.services.numpy_store import (chunk_search_matrix, load_search_chunks,
+                                      search_chunks)
+from app.services.vector_file import save_vector_chunks
+
+
+def test_loaded_matrix_is_searched_without_copy(tmp_path):
+    embeddings = np.eye(4, dtype=np.float32)
+    path = str(tmp_path / "vector_store.json")
+    save_vector_chunks(
+        path,
+        [
+            {"title": str(i), "content": f"내용 {i}", "source": "a.md", "embedding": e}
+            for i, e in enumerate(embeddings)
+        ],
+    )
+
+    chunks = load_search_chunks(path)
+
+    assert isinstance(chunk_search_matrix(chunks), np.memmap)
+    assert [c["title"] for c in search_chunks(chunks, [embeddings[2]], 1)[0]] == ["2"]
+
+
+def test_dimension_mismatch_returns_empty_results():
+    chunks = [{"embedding": [1.0, 0.0]}, {"embedding": [0.0, 1.0]}]
+
+    assert search_chunks(chunks, [[1.0, 0.0, 0.0]], 1) == [[]]
@@ -0,0 +1,97 @@
+"""
+스트리밍 응답의 동시 요청 병합 테스트
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.services import rag
+
+
+class FakeStream:
+    """OpenAI 스트리밍 응답처럼 응답 조각을 하나씩 돌려주는 비동기 이터레이터"""
+
+    def __init__(self, parts):
+        self._parts = list(parts)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._parts:
+            raise StopAsyncIteration
+        # 다른 요청이 끼어들 수 있도록 조각마다 이벤트 루프에 양보
+        await asyncio.sleep(0.01)
+        content = self._parts.pop(0)
+        return SimpleNamespace(
+            usage=None,
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=content))],
+        )
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        return FakeStream(["한국외대 ", "컴퓨터공학부", "입니다."])
+
+
+def _patch_pipeline(monkeypatch, completions):
+    chunk = {"id": "c1", "title": "학과 소개", "content": "학과 소개 내용", "score": 0.9}
+
+    async def fake_retrieve(query):
+        await asyncio.sleep(0.01)
+        return [chunk], []
+
+    async def fake_compress(query, embedding, chunks):
+        return chunks
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(rag, "_retrieve_async", fake_retrieve)
+    monkeypatch.setattr(rag, "_compress_async", fake_compress)
+    monkeypatch.setattr(rag, "get_async_openai_client", lambda: client)
+    monkeypatch.setattr(rag, "build_rag_messages", lambda *args: [])
+    monkeypatch.setattr(rag, "_record_prompt_usage", lambda *args, **kwargs: None)
+    monkeypatch.setattr(rag, "get_index_version", lambda: 0)
+    monkeypatch.setattr(rag.settings, "ANSWER_CACHE_ENABLED", True)
+    monkeypatch.setattr(rag.settings, "ANSWER_TABLE_FORMATTING_ENABLED", False)
+    rag._answer_cache.clear()
+
+
+async def _collect(query):
+    return [event async for event in rag.stream_rag_response(query)]
+
+
+def test_concurrent_identical_streams_call_llm_once(monkeypatch):
+    completions = FakeCompletions()
+    _patch_pipeline(monkeypatch, completions)
+
+    async def main():
+        return await asyncio.gather(_collect("학과 소개"), _collect("학과 소개?"))
+
+    first, second = asyncio.run(main())
+
+    assert completions.calls == 1
+    assert first == second
+    answer = "".join(e["data"]["content"] for e in first if e["event"] == "delta")
+    assert answer == "한국외대 컴퓨터공학부입니다."
+    assert first[-1]["event"] == "done"
+
+
+def test_stream_continues_when_first_subscriber_disconnects(monkeypatch):
+    completions = FakeCompletions()
+    _patch_pipeline(monkeypatch, completions)
+
+    async def main():
+        leader = rag.stream_rag_response("학과 소개")
+        await leader.__anext__()  # sources 이벤트까지 받은 뒤 연결 종료
+        follower = asyncio.create_task(_collect("학과 소개"))
+        await leader.aclose()
+        return await follower
+
+    events = asyncio.run(main())
+
+    assert completions.calls == 1
+    assert events[-1]["event"] == "done"